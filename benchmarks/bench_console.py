@@ -0,0 +1,92 @@
+# 终端基准：ConsoleWidget 在输出洪流下每秒能显示的行数
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import dispose, get_app, result, setup_environment, wait_until
+
+if __name__ == "__main__":
+    setup_environment()
+
+from core import CommandExecutor, SettingsManager, SignalBus
+from core.settings_store import default_console_max_lines
+
+signal_bus = SignalBus.get_instance()
+
+LINE = "[vite] transforming (%d) docs/guide/构建与部署.md \x1b[32m✓\x1b[0m"
+
+# 模拟构建工具的假进程：尽快输出指定行数
+FAKE_PROCESS = ("import sys\n"
+                "w = sys.stdout.write\n"
+                "for i in range(int(sys.argv[1])):\n"
+                "    w(%r %% i + '\\n')\n" % LINE)
+
+
+def _console(virtual=False):
+    from components import ConsoleWidget
+    get_app()
+    settings_manager = SettingsManager.get_instance()
+    settings_manager.console_virtual_view = virtual
+    # 虚拟列表视图用于大量输出，回滚上限设为足以容纳全部输出
+    settings_manager.console_max_lines = 10_000_000 if virtual else default_console_max_lines
+    console = ConsoleWidget()
+    console.resize(800, 600)
+    console.show()
+    return console
+
+
+def _drained(console):
+    return not console._pending and not console.flush_timer.isActive()
+
+
+def bench_signal_flood(lines, batch=1, virtual=False):
+    """直接发出 output_received，只测量控制台的缓冲与渲染"""
+    console = _console(virtual)
+    wait_until(lambda: _drained(console))
+    chunk = "\n".join(LINE % i for i in range(batch))
+    start = time.perf_counter()
+    for _ in range(lines // batch):
+        signal_bus.output_received.emit(chunk, "output", "")
+    emitted = time.perf_counter() - start
+    wait_until(lambda: _drained(console))
+    elapsed = time.perf_counter() - start
+    blocks = console.console_view.model.rowCount() if virtual else console.console_output.blockCount()
+    dispose(console)
+    return result("console_signal_flood", {"lines": lines, "batch": batch, "virtual": virtual},
+                  lines_per_sec=lines / elapsed, emit_ms=emitted * 1000, total_ms=elapsed * 1000,
+                  blocks=blocks)
+
+
+def bench_process_flood(lines):
+    """通过 CommandExecutor 运行假进程，测量从提交到全部输出显示完毕的吞吐量"""
+    console = _console()
+    executor = CommandExecutor.get_instance()
+    finished = []
+    signal_bus.process_finished.connect(lambda job_id, code: finished.append(code))
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False, encoding="utf-8") as f:
+        f.write(FAKE_PROCESS)
+    command = subprocess.list2cmdline([sys.executable, f.name, str(lines)])
+    start = time.perf_counter()
+    executor.submit(command, "flood")
+    wait_until(lambda: finished and _drained(console), 600.0)
+    elapsed = time.perf_counter() - start
+    os.remove(f.name)
+    dispose(console)
+    return result("console_process_flood", {"lines": lines},
+                  lines_per_sec=lines / elapsed, total_ms=elapsed * 1000, exit_code=finished[0])
+
+
+def run(lines=200_000):
+    return [
+        bench_signal_flood(lines // 4, batch=1),
+        bench_signal_flood(lines, batch=100),
+        bench_signal_flood(lines, batch=100, virtual=True),
+        bench_process_flood(lines),
+    ]
+
+
+if __name__ == "__main__":
+    for item in run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000):
+        print(item)
@@ -0,0 +1,34 @@
+# 设置读写基准：SettingsManager 的加载与单项修改后保存、SettingsStore（settings.json）的加载与原子写入延迟
+import sys
+
+from common import median_time, result, setup_environment
+
+if __name__ == "__main__":
+    setup_environment()
+
+from core import SettingsManager, SettingsStore
+
+
+def _save_one(settings):
+    """修改一项设置并立即保存（只发出这一项的 setting_changed）"""
+    settings.editor_path = "" if settings.editor_path else "editor"
+    settings.save()
+
+
+def run(repeat=50):
+    settings = SettingsManager.get_instance()
+    store = SettingsStore()
+    store.save()
+    return [
+        result("settings_manager", {"repeat": repeat},
+               load_ms=median_time(settings.load, repeat) * 1000,
+               save_one_ms=median_time(lambda: _save_one(settings), repeat) * 1000),
+        result("settings_store", {"repeat": repeat},
+               load_ms=median_time(store.load, repeat) * 1000,
+               save_ms=median_time(store.save, repeat) * 1000),
+    ]
+
+
+if __name__ == "__main__":
+    for item in run(int(sys.argv[1]) if len(sys.argv) > 1 else 50):
+        print(item)
@@ -0,0 +1,195 @@
+# 文件树基准：目录扫描、MarkdownFilterProxy 过滤耗时、文件树从启动到可用的耗时、切换工作区的耗时
+import os
+import shutil
+import sys
+import time
+
+from common import DEFAULT_WORK_DIR, dispose, get_app, result, setup_environment, wait_until
+
+if __name__ == "__main__":
+    setup_environment()
+
+from PySide6.QtWidgets import QFileSystemModel
+
+from core import MarkdownFilterProxy, ScanCache, scan_markdown_dirs
+from core.markdown_index import exclude_dirs
+from core.utils import user_config_dir
+
+# 过滤基准中最多创建的文件行数（目录行全部创建）
+MAX_FILE_ROWS = 20000
+
+
+def clear_caches():
+    """删除扫描缓存与文章索引，模拟首次打开"""
+    for name in ("scan_cache", "post_index"):
+        shutil.rmtree(os.path.join(user_config_dir(), name), ignore_errors=True)
+
+
+def bench_scan(root, params):
+    start = time.perf_counter()
+    index = scan_markdown_dirs(root, exclude_dirs)
+    cold = time.perf_counter() - start
+    # 带缓存的校验扫描：目录 mtime 未变化时复用上次的条目
+    cache = ScanCache()
+    cache.save(root, exclude_dirs, index.entries)
+    start = time.perf_counter()
+    entries = cache.load(root, exclude_dirs)
+    scan_markdown_dirs(root, exclude_dirs, cached_entries=entries)
+    warm = time.perf_counter() - start
+    return result("scan_markdown_dirs", params, cold_ms=cold * 1000, warm_ms=warm * 1000,
+                  markdown_dirs=sum(1 for _ in index.markdown_dirs()),
+                  markdown_files=sum(1 for _ in index.markdown_files()))
+
+
+def bench_proxy_filter(root, params):
+    """对所有目录行与部分文件行逐一调用 filterAcceptsRow，并测量映射全部行后 invalidateRowsFilter 的耗时"""
+    get_app()
+    model = QFileSystemModel()
+    proxy = MarkdownFilterProxy(root)
+    proxy.setSourceModel(model)
+    model.setRootPath(root)
+    proxy.set_markdown_index(scan_markdown_dirs(root, exclude_dirs))
+
+    dirs, files = [], []
+    for directory, subdirs, names in os.walk(root):
+        dirs.extend(os.path.join(directory, name) for name in subdirs)
+        files.extend(os.path.join(directory, name) for name in names)
+    step = max(1, len(files) // MAX_FILE_ROWS)
+    paths = dirs + files[::step]
+
+    start = time.perf_counter()
+    source_indexes = [model.index(path) for path in paths]
+    create = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accepted = sum(proxy.filterAcceptsRow(index.row(), index.parent()) for index in source_indexes)
+    filtering = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for index in source_indexes:
+        proxy.mapFromSource(index)
+    mapping = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proxy.invalidateRowsFilter()
+    invalidate = time.perf_counter() - start
+    dispose(proxy)
+    dispose(model)
+    return result("proxy_filter", params, rows=len(source_indexes), accepted=accepted,
+                  filter_ms=filtering * 1000, us_per_row=filtering / len(source_indexes) * 1e6,
+                  create_rows_ms=create * 1000, map_ms=mapping * 1000, invalidate_ms=invalidate * 1000)
+
+
+def bench_tree_usable(root, params, cold=True, timeout=600.0):
+    """
+    FileTreeWidget 从 start() 到可用的耗时：
+    first_rows_ms 根目录下首次出现行，scan_ms 扫描完成（过滤准确），post_index_ms 文章索引同步完成
+    """
+    from components import FileTreeWidget
+    from core import SettingsManager
+
+    get_app()
+    if cold:
+        clear_caches()
+    settings = SettingsManager.get_instance()
+    settings.blog_root = root
+    tree = FileTreeWidget()
+    tree.resize(400, 800)
+    tree.show()
+    marks = {}
+    start = time.perf_counter()
+
+    def usable():
+        elapsed = time.perf_counter() - start
+        root_index = tree.rootIndex()
+        if "first_rows" not in marks and root_index.isValid() and tree.proxy_model.rowCount(root_index) > 0:
+            marks["first_rows"] = elapsed
+        if "scan" not in marks and tree.markdown_index is not None:
+            marks["scan"] = elapsed
+        return "first_rows" in marks and "scan" in marks
+
+    tree.start()
+    wait_until(usable, timeout)
+    usable_time = time.perf_counter() - start
+    wait_until(lambda: not tree.active_index.post_updaters and tree.proxy_model.post_metadata, timeout)
+    post_index = time.perf_counter() - start
+    visible_rows = tree.proxy_model.rowCount(tree.rootIndex())
+    tree._shutdown()
+    dispose(tree)
+    return result("tree_usable", dict(params, cache="cold" if cold else "warm"),
+                  first_rows_ms=marks["first_rows"] * 1000, scan_ms=marks["scan"] * 1000,
+                  usable_ms=usable_time * 1000, post_index_ms=post_index * 1000, visible_rows=visible_rows)
+
+
+def bench_workspace_switch(root, params, warm=True, timeout=600.0):
+    """
+    切换到另一个工作区再切回后，文件树恢复到扫描完成且带有文章元数据的耗时
+    warm 时索引常驻内存；否则常驻数为 1，切回时从扫描缓存与文章数据库重新加载
+    """
+    from components import FileTreeWidget
+    from core import SettingsManager
+    from synthetic_tree import generate_tree
+
+    get_app()
+    other_root = os.path.join(os.path.dirname(root), "switch-other")
+    generate_tree(other_root, 10, "wide")
+    settings = SettingsManager.get_instance()
+    settings.blog_root = root
+    settings.warm_workspaces = 3 if warm else 1
+    for name in ("bench-a", "bench-b"):
+        if name not in settings.workspace_names():
+            settings.add_workspace(name, root)
+    first = settings.workspace
+    settings.switch_workspace("bench-a")
+    settings.blog_root = root
+    settings.switch_workspace("bench-b")
+    settings.blog_root = other_root
+    settings.switch_workspace("bench-a")
+    tree = FileTreeWidget()
+    tree.resize(400, 800)
+    tree.show()
+
+    def ready():
+        return tree.markdown_index is not None and bool(tree.proxy_model.post_metadata) \
+            and not tree.active_index.post_updaters
+
+    tree.start()
+    wait_until(ready, timeout)
+    settings.switch_workspace("bench-b")
+    wait_until(ready, timeout)
+    start = time.perf_counter()
+    settings.switch_workspace("bench-a")
+    wait_until(ready, timeout)
+    switch_time = time.perf_counter() - start
+    visible_rows = tree.proxy_model.rowCount(tree.rootIndex())
+    tree._shutdown()
+    dispose(tree)
+    settings.switch_workspace(first)
+    for name in ("bench-a", "bench-b"):
+        settings.remove_workspace(name)
+    settings.save()
+    return result("workspace_switch", dict(params, index="warm" if warm else "persisted"),
+                  switch_ms=switch_time * 1000, visible_rows=visible_rows)
+
+
+def run(tree_roots):
+    """tree_roots: [(root, params)]"""
+    results = []
+    for root, params in tree_roots:
+        results.append(bench_scan(root, params))
+        results.append(bench_proxy_filter(root, params))
+        results.append(bench_tree_usable(root, params, cold=True))
+        results.append(bench_tree_usable(root, params, cold=False))
+        results.append(bench_workspace_switch(root, params, warm=True))
+        results.append(bench_workspace_switch(root, params, warm=False))
+    return results
+
+
+if __name__ == "__main__":
+    from synthetic_tree import generate_tree
+
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    root = os.path.join(DEFAULT_WORK_DIR, "trees", f"wide-{files}")
+    generate_tree(root, files, "wide")
+    for item in run([(root, {"files": files, "shape": "wide"})]):
+        print(item)
@@ -0,0 +1,71 @@
+# 基准测试公共工具：隔离配置目录、离屏 Qt、等待条件与结果格式
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# 基准测试的默认工作目录，生成的博客目录树会保留以便重复运行
+DEFAULT_WORK_DIR = os.path.join(tempfile.gettempdir(), "sba_bench")
+
+
+def setup_environment(work_dir=DEFAULT_WORK_DIR):
+    """
+    必须在导入 PySide6 与 core 之前调用：
+    使用离屏平台，并把配置目录（扫描缓存、文章索引、settings.json、QSettings）指向工作目录，
+    不影响真实的用户配置
+    """
+    config_dir = os.path.join(work_dir, "config")
+    os.makedirs(config_dir, exist_ok=True)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["XDG_CONFIG_HOME"] = config_dir
+    os.environ["APPDATA"] = config_dir
+    if sys.platform == "darwin":
+        os.environ["HOME"] = config_dir
+    return config_dir
+
+
+def get_app():
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def wait_until(predicate, timeout=300.0):
+    """处理 Qt 事件直到条件成立，返回耗时（秒），超时抛出 TimeoutError"""
+    from PySide6.QtCore import QCoreApplication, QEventLoop
+    start = time.perf_counter()
+    while not predicate():
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError(f"等待超过 {timeout} 秒")
+        QCoreApplication.processEvents(QEventLoop.AllEvents, 5)
+    return time.perf_counter() - start
+
+
+def dispose(obj):
+    """立即删除 Qt 对象，断开它与全局信号的连接（没有运行事件循环时 deleteLater 不会执行）"""
+    from PySide6.QtCore import QCoreApplication, QEvent
+    if hasattr(obj, "hide"):
+        obj.hide()
+    obj.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def result(benchmark, params, **metrics):
+    """一条基准结果：benchmark + params 唯一确定一项，用于跨提交对比"""
+    return {"benchmark": benchmark, "params": params,
+            "metrics": {key: round(value, 4) if isinstance(value, float) else value
+                        for key, value in metrics.items()}}
+
+
+def median_time(func, repeat):
+    """重复执行并返回耗时中位数（秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2]
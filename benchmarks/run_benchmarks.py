@@ -0,0 +1,132 @@
+"""
+基准测试套件：生成合成博客目录树，在离屏 Qt 下运行各项基准，结果输出为 JSON 便于跨提交对比
+
+    python benchmarks/run_benchmarks.py                          全部基准（1k/10k/100k，wide/deep）
+    python benchmarks/run_benchmarks.py --sizes 1000 --only tree
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from common import DEFAULT_WORK_DIR, ROOT_DIR, setup_environment
+
+SUITES = ("tree", "console", "decode", "settings")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _metadata():
+    import PySide6
+    from PySide6.QtCore import qVersion
+    return {
+        "commit": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pyside6": getattr(PySide6, "__version__", None),
+        "qt": qVersion(),
+        "platform": platform.platform(),
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+    }
+
+
+def run_suites(args):
+    results = []
+    if "tree" in args.only:
+        import bench_tree
+        from synthetic_tree import generate_tree
+        roots = []
+        for shape in args.shapes:
+            for files in args.sizes:
+                root = os.path.join(args.work_dir, "trees", f"{shape}-{files}")
+                print(f"生成目录树 {shape} {files} ...", file=sys.stderr)
+                info = generate_tree(root, files, shape)
+                roots.append((root, {"files": files, "shape": shape, "markdown_files": info["markdown_files"]}))
+        for root, params in roots:
+            print(f"文件树基准 {params['shape']} {params['files']} ...", file=sys.stderr)
+            results.extend(bench_tree.run([(root, params)]))
+    if "console" in args.only:
+        import bench_console
+        from core import SettingsManager
+        # 假进程在博客根目录下运行，使用工作目录避免依赖真实配置
+        SettingsManager.get_instance().blog_root = args.work_dir
+        print("终端基准 ...", file=sys.stderr)
+        results.extend(bench_console.run(args.console_lines))
+    if "decode" in args.only:
+        import bench_decode
+        from common import result
+        print("解码基准 ...", file=sys.stderr)
+        for item in bench_decode.run():
+            results.append(result("decode", {"decoder": item["name"]}, mb_per_sec=item["mb_per_sec"],
+                                  seconds=item["seconds"], replacement_chars=item["replacement_chars"]))
+    if "settings" in args.only:
+        import bench_settings
+        print("设置读写基准 ...", file=sys.stderr)
+        results.extend(bench_settings.run())
+    return results
+
+
+def _key(item):
+    return item["benchmark"], json.dumps(item["params"], sort_keys=True, ensure_ascii=False)
+
+
+def compare(old_path, new_path):
+    """逐项对比两次运行的指标，输出新旧数值与比值"""
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = {_key(item): item for item in json.load(f)["results"]}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    for item in new:
+        previous = old.get(_key(item))
+        print(f"{item['benchmark']} {json.dumps(item['params'], ensure_ascii=False)}")
+        for metric, value in item["metrics"].items():
+            before = previous["metrics"].get(metric) if previous else None
+            if isinstance(value, (int, float)) and isinstance(before, (int, float)) and before:
+                print(f"    {metric:<20} {before:>14.3f} → {value:>14.3f}  ×{value / before:.2f}")
+            else:
+                print(f"    {metric:<20} {'-':>14} → {value!s:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StaticBlogAssistant 基准测试")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="目录树文件数，逗号分隔")
+    parser.add_argument("--shapes", default="wide,deep", help="目录树形状：wide,deep")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"运行的基准：{','.join(SUITES)}")
+    parser.add_argument("--console-lines", type=int, default=200_000, help="终端洪流的行数")
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help="目录树与隔离配置所在目录")
+    parser.add_argument("--output", "-o", help="结果 JSON 路径，默认为工作目录下 results/bench-<提交>-<时间>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="对比两次运行的结果")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    args.sizes = [int(size) for size in args.sizes.split(",") if size]
+    args.shapes = [shape for shape in args.shapes.split(",") if shape]
+    args.only = {suite for suite in args.only.split(",") if suite}
+    setup_environment(args.work_dir)
+    from common import get_app
+    get_app()
+    data = {"meta": _metadata(), "results": run_suites(args)}
+    output = args.output
+    if not output:
+        os.makedirs(os.path.join(args.work_dir, "results"), exist_ok=True)
+        output = os.path.join(args.work_dir, "results",
+                              f"bench-{data['meta']['commit'] or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
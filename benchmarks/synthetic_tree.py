@@ -0,0 +1,103 @@
+# 生成可复现的博客目录树：指定文件数与形状（wide 宽而浅 / deep 窄而深），混入 node_modules 等干扰文件
+import argparse
+import json
+import os
+import random
+import shutil
+
+# 干扰文件占总文件数的比例（node_modules、.git、图片等，其中也有 .md，应被排除）
+NOISE_RATIO = 0.3
+# 普通目录中 Markdown 与其他文件的比例
+MARKDOWN_RATIO = 0.7
+MARKER = ".sba_bench_tree.json"
+
+TAGS = ["vue", "python", "笔记", "随笔", "前端", "linux", "算法", "读书"]
+WORDS = ["静态", "博客", "构建", "部署", "markdown", "vitepress", "hexo", "主题", "插件", "性能",
+         "索引", "缓存", "目录", "文章", "标签", "搜索", "component", "render", "layout", "config"]
+
+
+def _post(rng, index):
+    title = f"文章 {index} {rng.choice(WORDS)}{rng.choice(WORDS)}"
+    tags = ", ".join(rng.sample(TAGS, rng.randint(0, 3)))
+    body = "\n\n".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80)))
+                       for _ in range(rng.randint(1, 5)))
+    return (f"---\ntitle: {title}\ndate: 20{rng.randint(15, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}\n"
+            f"tags: [{tags}]\n---\n# {title}\n\n{body}\n")
+
+
+def _content_dirs(root, count, shape, rng):
+    """生成放置文章的目录列表"""
+    if shape == "wide":
+        # 两层：每个分类约 50 个文件
+        sections = max(1, count // 50)
+        return [os.path.join(root, f"section{i // 20:03d}", f"topic{i:05d}") for i in range(sections)]
+    # deep：每条分支嵌套 12 层，每层少量文件
+    dirs = []
+    branches = max(1, count // 120)
+    for branch in range(branches):
+        path = os.path.join(root, f"branch{branch:04d}")
+        for depth in range(12):
+            path = os.path.join(path, f"level{depth:02d}-{rng.randint(0, 9)}")
+            dirs.append(path)
+    return dirs
+
+
+def generate_tree(root, files, shape="wide", seed=0):
+    """生成目录树，返回描述信息；已存在相同参数生成的目录时直接复用"""
+    params = {"files": files, "shape": shape, "seed": seed}
+    marker = os.path.join(root, MARKER)
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if info["params"] == params:
+            return info
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # 参数不同或上次生成中断时重新生成；不是本脚本生成的非空目录不会被删除
+    if os.path.isdir(root) and os.listdir(root):
+        if not os.path.exists(marker) and not os.path.exists(marker + ".partial"):
+            raise FileExistsError(f"{root} 不是空目录，也不是生成的基准目录树")
+        shutil.rmtree(root)
+    os.makedirs(root, exist_ok=True)
+    open(marker + ".partial", "w").close()
+    rng = random.Random(seed)
+    noise_files = int(files * NOISE_RATIO)
+    content_files = files - noise_files
+    dirs = _content_dirs(root, content_files, shape, rng)
+    markdown = 0
+    for index in range(content_files):
+        directory = dirs[index % len(dirs)]
+        os.makedirs(directory, exist_ok=True)
+        if rng.random() < MARKDOWN_RATIO:
+            with open(os.path.join(directory, f"post-{index:06d}.md"), "w", encoding="utf-8") as f:
+                f.write(_post(rng, index))
+            markdown += 1
+        else:
+            with open(os.path.join(directory, f"asset-{index:06d}.png"), "wb") as f:
+                f.write(b"\x89PNG" + bytes(rng.getrandbits(8) for _ in range(64)))
+
+    # 干扰：node_modules 中大量 js 与少量 README.md
+    for index in range(noise_files):
+        package = os.path.join(root, "node_modules", f"pkg{index // 40:05d}", "lib" if index % 3 else "")
+        os.makedirs(package, exist_ok=True)
+        name = "README.md" if index % 40 == 0 else f"module{index:06d}.js"
+        with open(os.path.join(package, name), "w", encoding="utf-8") as f:
+            f.write(f"module.exports = {index};\n")
+
+    info = {"params": params, "markdown_files": markdown, "content_dirs": len(set(dirs)),
+            "noise_files": noise_files}
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    os.remove(marker + ".partial")
+    return info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成基准测试用的博客目录树")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--shape", choices=("wide", "deep"), default="wide")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(generate_tree(args.root, args.files, args.shape, args.seed), ensure_ascii=False))
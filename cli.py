@@ -0,0 +1,357 @@
+"""
+StaticBlogAssistant 命令行入口，不加载图形界面，可用于 git hooks、定时任务与 CI
+
+    python cli.py list                      列出脚本及其依赖
+    python cli.py run 脚本 [脚本 ...]        依次运行脚本（连同依赖），任一失败即停止
+    python cli.py new 标题 [--dir 目录]      按默认模板新建文章
+    python cli.py import 文件 [--dir 目录]   从 CSV/JSON 批量生成文章（每行一篇）
+    python cli.py index                     同步文章索引
+    python cli.py search 关键字              全文检索文章
+    python cli.py posts [--tag 标签]         按元数据列出文章
+    python cli.py backlinks 路径             列出引用该文件或目录的文章
+    python cli.py mv 源 [源 ...] 目标         移动或重命名，并更新引用它们的链接
+    python cli.py history [脚本 ...]         脚本的运行历史与耗时趋势
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+
+from core.pipeline import PipelineError, PipelinePlan, parse_list
+from core.settings_store import load_settings
+
+_write_lock = threading.Lock()
+
+
+def _write(text, stream=None):
+    with _write_lock:
+        (stream or sys.stdout).write(text)
+        (stream or sys.stdout).flush()
+
+
+def _print_json(data):
+    _write(json.dumps(data, ensure_ascii=False, indent=2) + "\n")
+
+
+def _depends_map(settings):
+    return {name: parse_list(options.get("depends")) for name, options in settings.script_options.items()}
+
+
+def cmd_list(settings, args):
+    scripts = []
+    for name, command in settings.script_commands.items():
+        scripts.append({
+            "name": name,
+            "command": command,
+            "depends": parse_list(settings.script_option(name, "depends")),
+            "exclusive": bool(settings.script_option(name, "exclusive", False)),
+            "cached": bool(parse_list(settings.script_option(name, "inputs"))),
+        })
+    if args.json:
+        _print_json(scripts)
+        return 0
+    for script in scripts:
+        flags = [flag for flag, on in (("独占", script["exclusive"]), ("缓存", script["cached"])) if on]
+        depends = f"  ← {', '.join(script['depends'])}" if script["depends"] else ""
+        flags = f"  [{'/'.join(flags)}]" if flags else ""
+        _write(f"{script['name']}{depends}{flags}\n    {script['command']}\n")
+    return 0
+
+
+def cmd_run(settings, args):
+    from core.process_runner import run_plan
+
+    depends_map = _depends_map(settings)
+    try:
+        plans = [PipelinePlan(target, settings.script_commands, depends_map) for target in args.scripts]
+    except PipelineError as e:
+        _write(f"{e}\n", sys.stderr)
+        return 2
+    for plan in plans:
+        prefixed = len(plan.stages) > 1
+
+        def on_output(stage, text, msg_type):
+            if args.quiet and msg_type == "output":
+                return
+            if prefixed:
+                text = "".join(f"[{stage}] {line}" for line in text.splitlines(keepends=True))
+            _write(text, sys.stderr if msg_type == "error" else sys.stdout)
+
+        if prefixed:
+            _write(f"[流水线] {' → '.join(plan.stages)}\n")
+        if not run_plan(plan, settings.blog_root, settings.script_option, on_output, force=args.force):
+            failed = [stage for stage in plan.stages if plan.state[stage] == "failed"]
+            _write(f"[失败] {'、'.join(failed)}\n", sys.stderr)
+            return 1
+    return 0
+
+
+def cmd_new(settings, args):
+    from core.utils import create_post
+
+    target_dir = os.path.join(settings.blog_root, args.dir) if args.dir else settings.blog_root
+    if not os.path.isdir(target_dir):
+        _write(f"目录不存在：{target_dir}\n", sys.stderr)
+        return 1
+    _write(create_post(target_dir, args.title, settings.default_content) + "\n")
+    return 0
+
+
+def cmd_import(settings, args):
+    from core.post_import import import_posts, read_rows
+
+    target_dir = os.path.join(settings.blog_root, args.dir) if args.dir else settings.blog_root
+    if not os.path.isdir(target_dir):
+        _write(f"目录不存在：{target_dir}\n", sys.stderr)
+        return 1
+    try:
+        rows = read_rows(args.source)
+    except (OSError, ValueError) as e:
+        _write(f"读取失败：{e}\n", sys.stderr)
+        return 1
+    result = import_posts(rows, target_dir, settings.default_content, workers=args.workers,
+                          progress=None if args.json else lambda done, total: _write(
+                              f"\r已写入 {done}/{total}", sys.stderr))
+    if args.json:
+        _print_json({"created": result.created, "errors": [{"row": n, "error": e} for n, e in result.errors]})
+    else:
+        _write(f"\n已生成 {len(result.created)} 篇文章\n", sys.stderr)
+        for number, message in result.errors:
+            _write(f"第 {number} 行：{message}\n", sys.stderr)
+    return 1 if result.errors else 0
+
+
+def _open_index(settings):
+    from core.post_index import PostIndex
+    return PostIndex(settings.blog_root)
+
+
+def _sync_index(settings, index):
+    from core.markdown_index import scan_markdown_dirs
+    return index.sync(scan_markdown_dirs(settings.blog_root).markdown_files())
+
+
+def _meta_dict(meta, root):
+    return {"path": os.path.relpath(meta.path, root), "title": meta.title, "date": meta.date, "tags": list(meta.tags)}
+
+
+def _print_posts(posts, root, as_json):
+    if as_json:
+        _print_json([_meta_dict(meta, root) for meta in posts])
+        return
+    for meta in posts:
+        tags = f"  #{' #'.join(meta.tags)}" if meta.tags else ""
+        _write(f"{meta.date[:10] or '----------'}  {meta.title}{tags}\n    {os.path.relpath(meta.path, root)}\n")
+
+
+def cmd_index(settings, args):
+    index = _open_index(settings)
+    try:
+        changed = _sync_index(settings, index)
+        total = len(index.all_metadata())
+    finally:
+        index.close()
+    _write(f"已索引 {total} 篇文章，更新 {len(changed)} 篇\n")
+    return 0
+
+
+def cmd_search(settings, args):
+    index = _open_index(settings)
+    try:
+        if args.sync:
+            _sync_index(settings, index)
+        results = index.search(" ".join(args.query), args.limit)
+    finally:
+        index.close()
+    _print_posts(results, settings.blog_root, args.json)
+    return 0 if results else 1
+
+
+def cmd_posts(settings, args):
+    index = _open_index(settings)
+    try:
+        if args.sync:
+            _sync_index(settings, index)
+        posts = list(index.all_metadata().values())
+    finally:
+        index.close()
+    if args.tag:
+        tag = args.tag.lower()
+        posts = [meta for meta in posts if any(t.lower() == tag for t in meta.tags)]
+    if args.sort == "date":
+        posts.sort(key=lambda meta: meta.date, reverse=True)
+    else:
+        posts.sort(key=lambda meta: getattr(meta, args.sort).lower())
+    _print_posts(posts[:args.limit] if args.limit else posts, settings.blog_root, args.json)
+    return 0
+
+
+def cmd_backlinks(settings, args):
+    root = settings.blog_root
+    index = _open_index(settings)
+    try:
+        if args.sync:
+            _sync_index(settings, index)
+        sources = index.backlinks(os.path.abspath(args.path))
+    finally:
+        index.close()
+    if args.json:
+        _print_json([os.path.relpath(source, root) for source in sources])
+    else:
+        for source in sources:
+            _write(os.path.relpath(source, root) + "\n")
+    return 0 if sources else 1
+
+
+def cmd_mv(settings, args):
+    import shutil
+    from core.links import LinkUpdater
+
+    sources = [os.path.abspath(path) for path in args.sources]
+    target = os.path.abspath(args.target)
+    if len(sources) > 1 and not os.path.isdir(target):
+        _write(f"移动多个项目时目标必须是已存在的目录：{args.target}\n", sys.stderr)
+        return 2
+    index = _open_index(settings)
+    try:
+        if args.sync:
+            _sync_index(settings, index)
+        links = LinkUpdater(settings.blog_root, index)
+        links.collect(sources)
+        moves = []
+        status = 0
+        for source in sources:
+            destination = os.path.join(target, os.path.basename(source)) if os.path.isdir(target) else target
+            if os.path.lexists(destination):
+                _write(f"目标已存在：{destination}\n", sys.stderr)
+                status = 1
+                continue
+            try:
+                shutil.move(source, destination)
+            except OSError as e:
+                _write(f"无法移动 {source}：{e}\n", sys.stderr)
+                status = 1
+                continue
+            moves.append((source, destination, os.path.isdir(destination)))
+        # 重写链接后只刷新移动与重写的文章，不必重新同步整个站点
+        rewritten, count, errors = links.apply(moves) if moves else ([], 0, [])
+    finally:
+        index.close()
+    _write(f"已移动 {len(moves)} 项，更新了 {len(rewritten)} 篇文章中的 {count} 个链接\n")
+    for path, message in errors:
+        _write(f"{path}：{message}\n", sys.stderr)
+    return 1 if errors else status
+
+
+def cmd_history(settings, args):
+    import time
+    from core.resource_usage import format_bytes
+    from core.run_history import RunHistory, describe_trend
+
+    history = RunHistory()
+    root = settings.blog_root
+    names = args.scripts or list(settings.script_commands)
+    if args.json:
+        _print_json({name: {"trend": history.trend(root, name), "runs": history.runs(root, name, args.limit)}
+                     for name in names})
+        return 0
+    for name in names:
+        _write(describe_trend(name, history.trend(root, name)) + "\n")
+        for run in history.runs(root, name, args.limit):
+            started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started_at"]))
+            cpu = "-" if run["cpu_time"] is None else f"{run['cpu_time']:.1f}s"
+            rss = "-" if run["peak_rss"] is None else format_bytes(run["peak_rss"])
+            _write(f"    {started}  退出码 {run['exit_code']:<3}  用时 {run['wall_time']:.1f}s  CPU {cpu}  "
+                   f"内存 {rss}  [{run['source']}]\n")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="StaticBlogAssistant 命令行")
+    parser.add_argument("--root", help="博客根目录，默认使用设置中的目录")
+    parser.add_argument("--workspace", help="使用指定工作区的根目录、脚本与模板，默认为当前工作区")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="列出脚本")
+    list_parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    list_parser.set_defaults(func=cmd_list)
+
+    run_parser = commands.add_parser("run", help="运行脚本（连同依赖），多个脚本依次执行")
+    run_parser.add_argument("scripts", nargs="+", metavar="脚本")
+    run_parser.add_argument("--force", action="store_true", help="忽略构建缓存")
+    run_parser.add_argument("--quiet", action="store_true", help="不输出命令的标准输出")
+    run_parser.set_defaults(func=cmd_run)
+
+    new_parser = commands.add_parser("new", help="按默认模板新建文章")
+    new_parser.add_argument("title", metavar="标题")
+    new_parser.add_argument("--dir", help="相对博客根目录的目标目录")
+    new_parser.set_defaults(func=cmd_new)
+
+    import_parser = commands.add_parser("import", help="从 CSV/JSON 批量生成文章")
+    import_parser.add_argument("source", metavar="文件", help="CSV（首行为列名）或 JSON（对象数组）")
+    import_parser.add_argument("--dir", help="相对博客根目录的目标目录")
+    import_parser.add_argument("--workers", type=int, default=8, help="写入文件的线程数")
+    import_parser.add_argument("--json", action="store_true", help="以 JSON 输出生成的文件")
+    import_parser.set_defaults(func=cmd_import)
+
+    index_parser = commands.add_parser("index", help="同步文章索引")
+    index_parser.set_defaults(func=cmd_index)
+
+    search_parser = commands.add_parser("search", help="全文检索文章")
+    search_parser.add_argument("query", nargs="+", metavar="关键字")
+    search_parser.add_argument("--limit", type=int, default=20)
+    search_parser.add_argument("--sync", action="store_true", help="检索前先同步索引")
+    search_parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    search_parser.set_defaults(func=cmd_search)
+
+    posts_parser = commands.add_parser("posts", help="按元数据列出文章")
+    posts_parser.add_argument("--tag", help="只列出带有该标签的文章")
+    posts_parser.add_argument("--sort", choices=("date", "title", "path"), default="date")
+    posts_parser.add_argument("--limit", type=int, default=0)
+    posts_parser.add_argument("--sync", action="store_true", help="列出前先同步索引")
+    posts_parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    posts_parser.set_defaults(func=cmd_posts)
+
+    backlinks_parser = commands.add_parser("backlinks", help="列出引用该文件或目录的文章")
+    backlinks_parser.add_argument("path", metavar="路径")
+    backlinks_parser.add_argument("--sync", action="store_true", help="查询前先同步索引")
+    backlinks_parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    backlinks_parser.set_defaults(func=cmd_backlinks)
+
+    mv_parser = commands.add_parser("mv", help="移动或重命名，并更新引用它们的链接")
+    mv_parser.add_argument("sources", nargs="+", metavar="源")
+    mv_parser.add_argument("target", metavar="目标", help="已存在的目录，或只有一个源时的新路径")
+    mv_parser.add_argument("--sync", action="store_true", help="移动前先同步索引")
+    mv_parser.set_defaults(func=cmd_mv)
+
+    history_parser = commands.add_parser("history", help="脚本的运行历史与耗时趋势")
+    history_parser.add_argument("scripts", nargs="*", metavar="脚本", help="默认列出全部脚本")
+    history_parser.add_argument("--limit", type=int, default=5, help="每个脚本列出的记录数")
+    history_parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    history_parser.set_defaults(func=cmd_history)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    settings = load_settings()
+    if args.workspace:
+        try:
+            settings.select_workspace(args.workspace)
+        except KeyError:
+            _write(f"工作区不存在：{args.workspace}，可用的工作区：{'、'.join(settings.workspaces)}\n", sys.stderr)
+            return 2
+    if args.root:
+        settings.blog_root = args.root
+    if not os.path.isdir(settings.blog_root):
+        _write(f"博客根目录不存在：{settings.blog_root}，请在设置中配置或使用 --root\n", sys.stderr)
+        return 2
+    try:
+        return args.func(settings, args)
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
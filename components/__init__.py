@@ -1,4 +1,10 @@
 from.console_tab import ConsoleWidget
+from.console_view import ConsoleView
 from.file_tree import FileTreeWidget
 from.setting_tab import SettingTab
-from.script_tab import CommandsButtonWidget
\ No newline at end of file
+from.script_tab import CommandsButtonWidget
+from.search_box import PostSearchWidget
+from.lazy_tab import LazyTab
+from.diagnostics_tab import DiagnosticsWidget
+from.workspace_bar import WorkspaceBar
+from.main_window import MainWindow
@@ -1,8 +1,24 @@
-import re
-from PySide6.QtCore import Signal, Qt
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QPlainTextEdit
-from core import SignalBus,CommandExecutor
+from PySide6.QtCore import Signal, Qt, QTimer
+from PySide6.QtGui import QColor, QFont, QTextCharFormat, QTextCursor
+from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QComboBox, QPushButton,
+                               QFileDialog)
+from core import SignalBus,CommandExecutor,SettingsManager
+from core.ansi import DEFAULT_STYLE, AnsiParser, is_plain
+from core.line_store import LineStore
+from core.run_log import log_dir
+from .console_view import COLORS, ConsoleView
+from .log_viewer import LogViewer
 signal_bus = SignalBus.get_instance()
+settings_manager = SettingsManager.get_instance()
+
+# 控制台背景色（反色显示时作为前景色）
+CONSOLE_BACKGROUND = "#1E1E1E"
+# 缓存的 QTextCharFormat 上限（24 位真彩色输出可能产生大量不同样式）
+MAX_CACHED_FORMATS = 4096
+# 输出刷新间隔（毫秒），期间收到的输出合并为一次插入
+FLUSH_INTERVAL = 33
+# 最多保留的已结束任务通道数
+MAX_FINISHED_CHANNELS = 20
 class ConsoleWidget(QWidget):
     command_triggered = Signal(str)
     def __init__(self):
@@ -14,6 +30,8 @@ class ConsoleWidget(QWidget):
         # 输出区域
         self.console_output = QPlainTextEdit()
         self.console_output.setReadOnly(True)
+        # 只读输出不需要撤销栈，否则每次插入都会额外记录一份
+        self.console_output.setUndoRedoEnabled(False)
         self.console_output.setStyleSheet("""
                         QPlainTextEdit {
                             background-color: #1E1E1E;
@@ -37,10 +55,56 @@ class ConsoleWidget(QWidget):
                     """)
         self.console_input.keyPressEvent = self._console_input_key_handler
 
+        # 输出通道选择：全部输出或单个任务
+        channel_layout = QHBoxLayout()
+        channel_layout.setContentsMargins(5, 5, 5, 0)
+        self.channel_selector = QComboBox()
+        self.channel_selector.addItem("全部输出", "")
+        self.channel_selector.currentIndexChanged.connect(self._on_channel_changed)
+        self.stop_btn = QPushButton("⏹ 停止")
+        self.stop_btn.setToolTip("停止当前通道的任务（全部输出时停止所有任务）")
+        self.stop_btn.clicked.connect(self._stop_current_channel)
+        self.log_btn = QPushButton("📄 日志")
+        self.log_btn.setToolTip("在日志查看器中打开当前通道任务的完整输出（全部输出时选择日志文件）")
+        self.log_btn.clicked.connect(self._open_log)
+        channel_layout.addWidget(self.channel_selector, 1)
+        channel_layout.addWidget(self.log_btn)
+        channel_layout.addWidget(self.stop_btn)
+
         # 载入
+        layout.addLayout(channel_layout)
         layout.addWidget(self.console_output, 3)
+        # 虚拟列表视图（设置中启用），与 console_output 同一时间只显示一个
+        self.console_view = ConsoleView()
+        layout.addWidget(self.console_view, 3)
         layout.addWidget(self.console_input, 1)
 
+        # 回滚上限：控件只保留最近的行，每次插入后由 _trim_document 从文档头部删除多余的块
+        self.scrollback = LineStore(settings_manager.console_max_lines, settings_manager.console_spill_log)
+        self._spill_notified = False
+        signal_bus.subscribe("setting_changed", self._on_setting_changed)
+        # 退出时删除淘汰输出的临时日志
+        QApplication.instance().aboutToQuit.connect(self.scrollback.close)
+
+        # 每个任务独立的输出通道 job_id -> LineStore
+        self.channels = {}
+        self.finished_channels = []
+        self.current_channel = ""
+
+        # 输出缓冲，由定时器批量刷新到控件
+        self._pending = []
+        self._formats = {}
+        self._parsers = {}
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_INTERVAL)
+        self.flush_timer.timeout.connect(self._flush_console)
+
+        self.virtual_view = settings_manager.console_virtual_view
+        self.console_output.setVisible(not self.virtual_view)
+        self.console_view.setVisible(self.virtual_view)
+        self.console_view.set_store(self.scrollback)
+
         self._append_console("欢迎使用StaticBlogAssistant！", "system")
         self._append_console(f"", "system")
 
@@ -49,9 +113,11 @@ class ConsoleWidget(QWidget):
         self.current_process = None
         self.command_history = []
         self.history_index = -1
-        self.command_executor = CommandExecutor()
+        self.command_executor = CommandExecutor.get_instance()
         # 信号连接
-        signal_bus.output_received.connect(self._append_console)
+        signal_bus.subscribe("output_received", self._append_console)
+        signal_bus.subscribe("job_started", self._add_channel)
+        signal_bus.subscribe("process_finished", self._finish_channel)
 
     def _console_input_key_handler(self, event):
         """处理控制台输入框的键盘事件"""
@@ -66,7 +132,7 @@ class ConsoleWidget(QWidget):
             return
         # 终止进程处理（Ctrl+C 或 ESC）
         if event.key() == Qt.Key_Escape or (event.modifiers() == Qt.ControlModifier and event.key() == Qt.Key_C):
-            signal_bus.stop_command.emit()
+            self._stop_current_channel()
             self.console_input.clear()
             return
         # 上下箭头切换历史命令
@@ -87,24 +153,231 @@ class ConsoleWidget(QWidget):
             self.console_input.setPlainText(self.command_history[self.history_index])
     def clear_console(self):
         """清空控制台"""
+        self._pending.clear()
+        self.scrollback.clear()
+        for channel in self.channels.values():
+            channel.clear()
+        self.console_output.clear()
+        self.console_view.refresh()
+
+    def _stop_current_channel(self):
+        signal_bus.stop_command.emit(self.current_channel)
+
+    def _open_log(self):
+        """打开当前任务的运行日志；全部输出时从日志目录选择"""
+        path = self.command_executor.log_path(self.current_channel) if self.current_channel else None
+        if not path:
+            path, _ = QFileDialog.getOpenFileName(self, "打开运行日志", log_dir(), "日志 (*.log *.log.gz);;所有文件 (*)")
+        if path:
+            LogViewer(path, self).show()
+
+    def _add_channel(self, job_id, label):
+        """新任务开始时创建输出通道"""
+        self.channels[job_id] = LineStore(settings_manager.console_max_lines)
+        self.channel_selector.addItem(label, job_id)
+
+    def _finish_channel(self, job_id, exit_code):
+        """任务结束后标记通道，并淘汰过多的已结束通道"""
+        self._flush_console()
+        self._parsers.pop((job_id, "output"), None)
+        self._parsers.pop((job_id, "error"), None)
+        index = self.channel_selector.findData(job_id)
+        if index >= 0:
+            self.channel_selector.setItemText(index, f"{self.channel_selector.itemText(index)}（已结束 {exit_code}）")
+        self.finished_channels.append(job_id)
+        while len(self.finished_channels) > MAX_FINISHED_CHANNELS:
+            stale = self.finished_channels.pop(0)
+            if stale == self.current_channel:
+                self.finished_channels.append(stale)
+                break
+            self.channels.pop(stale, None)
+            self.channel_selector.removeItem(self.channel_selector.findData(stale))
+
+    def _on_channel_changed(self, index):
+        """切换通道时从该通道的缓冲区重新渲染"""
+        self._flush_console()
+        self.current_channel = self.channel_selector.itemData(index) or ""
+        buffer = self.channels.get(self.current_channel, self.scrollback)
+        if self.virtual_view:
+            self.console_view.set_store(buffer)
+            return
+        runs = []
+        for row in range(len(buffer)):
+            text = buffer.text(row)
+            segments = [(text, DEFAULT_STYLE)]
+            line_runs = buffer.style_runs(row)
+            if line_runs:
+                segments = []
+                position = 0
+                for length, style in line_runs:
+                    segments.append((text[position:position + length], style))
+                    position += length
+            self._add_segments(runs, segments, buffer.type_of(row))
         self.console_output.clear()
+        self._insert_runs(runs)
+
+    def _append_console(self, text, msg_type="output", job_id=""):
+        """添加格式化输出（先进入缓冲区，定时批量刷新）"""
+        self._pending.append((text, msg_type, job_id))
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def _char_format(self, msg_type, style=DEFAULT_STYLE):
+        """按 (类型, ANSI 样式) 缓存 QTextCharFormat，样式切换不会每次创建新的格式"""
+        key = (msg_type, style)
+        char_format = self._formats.get(key)
+        if char_format is None:
+            if len(self._formats) >= MAX_CACHED_FORMATS:
+                self._formats.clear()
+            foreground = style.fg or COLORS.get(msg_type, "#FFFFFF")
+            background = style.bg
+            if style.inverse:
+                foreground, background = background or CONSOLE_BACKGROUND, foreground
+            color = QColor(foreground)
+            if style.dim:
+                color.setAlphaF(0.6)
+            char_format = QTextCharFormat()
+            char_format.setForeground(color)
+            if background:
+                char_format.setBackground(QColor(background))
+            if style.bold:
+                char_format.setFontWeight(QFont.Bold)
+            if style.italic:
+                char_format.setFontItalic(True)
+            if style.underline:
+                char_format.setFontUnderline(True)
+            self._formats[key] = char_format
+        return char_format
+
+    def _parser(self, job_id, msg_type):
+        """每个任务的 stdout / stderr 各用一个 ANSI 解析器，跨块截断的转义序列才能正确拼接"""
+        parser = self._parsers.get((job_id, msg_type))
+        if parser is None:
+            parser = self._parsers[(job_id, msg_type)] = AnsiParser()
+        return parser
+
+    @staticmethod
+    def _add_segments(runs, segments, msg_type):
+        """把一条输出的片段加入待插入的 [([文本], (类型, 样式))]，格式相同的相邻片段合并"""
+        for text, style in segments:
+            key = (msg_type, style)
+            if runs and runs[-1][1] == key:
+                runs[-1][0].append(text)
+            else:
+                runs.append(([text], key))
+        runs[-1][0].append("\n")
+
+    @staticmethod
+    def _skip_lines(segments, count):
+        """去掉片段中的前 count 行"""
+        for index, (text, style) in enumerate(segments):
+            position = -1
+            while count:
+                position = text.find("\n", position + 1)
+                if position < 0:
+                    break
+                count -= 1
+            if not count:
+                return [(text[position + 1:], style)] + segments[index + 1:]
+        return [("", DEFAULT_STYLE)]
+
+    def _tail_runs(self, shown):
+        """只渲染最后 max_lines 行，一次刷新中超出回滚上限的行插入后也会立即被淘汰"""
+        budget = self.scrollback.max_lines
+        start = len(shown)
+        while start > 0 and budget > 0:
+            start -= 1
+            budget -= shown[start][1]
+        runs = []
+        for index in range(start, len(shown)):
+            segments, _, msg_type = shown[index]
+            if index == start and budget < 0:
+                segments = self._skip_lines(segments, -budget)
+            self._add_segments(runs, segments, msg_type)
+        return runs
+
+    def _flush_console(self):
+        """将缓冲区内容一次性写入控件，相同格式的连续输出合并为一次插入"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        shown = []
+        for text, msg_type, job_id in pending:
+            # 一次扫描解析 ANSI 样式；只收到半个转义序列时本次没有可显示的内容
+            segments = self._parser(job_id, msg_type).feed(text) if text else [("", DEFAULT_STYLE)]
+            if not segments:
+                continue
+            last, style = segments[-1]
+            if last.endswith("\n"):
+                segments[-1] = (last[:-1], style)
+            if len(segments) == 1:
+                lines = segments[0][0].split("\n")
+                styled = style is not DEFAULT_STYLE
+            else:
+                lines = "".join(part for part, _ in segments).split("\n")
+                styled = not is_plain(segments)
+            self.scrollback.append_lines(lines, msg_type, segments if styled else None)
+            channel = self.channels.get(job_id)
+            if channel is not None:
+                channel.append_lines(lines, msg_type, segments if styled else None)
+            if self.virtual_view or self.current_channel and job_id != self.current_channel:
+                continue  # 不属于当前通道的输出只写入缓冲区
+            shown.append((segments, len(lines), msg_type))
+        if self.virtual_view:
+            self.console_view.refresh()
+        else:
+            self._insert_runs(self._tail_runs(shown))
+
+        if self.scrollback.spill_path and not self._spill_notified:
+            self._spill_notified = True
+            self._append_console(f"更早的输出已写入临时日志（退出时删除）：{self.scrollback.spill_path}", "system")
+
+    def _insert_runs(self, runs):
+        """一次编辑块内插入多段文本，每段使用同一格式"""
+        if not runs:
+            return
+        scrollbar = self.console_output.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        cursor = QTextCursor(self.console_output.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for texts, key in runs:
+            cursor.insertText("".join(texts), self._char_format(*key))
+        self._trim_document(cursor)
+        cursor.endEditBlock()
+
+        # 仅当原本停留在底部时自动滚动
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def _trim_document(self, cursor=None):
+        """
+        删除超出回滚上限的旧行；一次选中并删除全部多余的块，
+        比 setMaximumBlockCount 在每次插入后逐块删除快得多
+        """
+        document = self.console_output.document()
+        excess = document.blockCount() - self.scrollback.max_lines
+        if excess <= 0:
+            return
+        cursor = cursor or QTextCursor(document)
+        cursor.setPosition(0)
+        cursor.setPosition(document.findBlockByNumber(excess).position(), QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
 
-    def _append_console(self, text, msg_type="output"):
-        """添加格式化输出"""
-        cursor = self.console_output.textCursor()
-        ansi_escape = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
-        clean_text = ansi_escape.sub('', text)
-        # 类型颜色映射
-        colors = {
-            "input": "#569CD6",  # 蓝色
-            "output": "#D4D4D4",  # 白色
-            "error": "#F44747",  # 红色
-            "system": "#43B581"  # 绿色
-        }
-
-        # 添加HTML格式内容
-        html = f'<span style="color:{colors.get(msg_type, "#FFFFFF")}">{clean_text}</span>'
-        cursor.insertHtml(html + "<br>")
-
-        # 自动滚动到底部
-        self.console_output.ensureCursorVisible()
\ No newline at end of file
+    def _on_setting_changed(self, key, old, new):
+        """只处理控制台相关的设置项"""
+        if key == "console_spill_log":
+            self.scrollback.spill_to_file = new
+        elif key == "console_max_lines":
+            self.scrollback.resize(new)
+            for channel in self.channels.values():
+                channel.resize(new)
+            self._trim_document()
+            if self.virtual_view:
+                self.console_view.refresh()
+        elif key == "console_virtual_view" and new != self.virtual_view:
+            # 切换视图后从缓冲区重新渲染当前通道
+            self.virtual_view = new
+            self.console_output.setVisible(not self.virtual_view)
+            self.console_view.setVisible(self.virtual_view)
+            self._on_channel_changed(self.channel_selector.currentIndex())
@@ -0,0 +1,236 @@
+import re
+from array import array
+from bisect import bisect_left
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+from PySide6.QtGui import QColor, QFont, QKeySequence, QShortcut
+from PySide6.QtWidgets import (QAbstractItemView, QCheckBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit,
+                               QTableView, QVBoxLayout, QWidget)
+
+from core.line_store import TYPES
+from core.log_index import compile_search
+
+# 类型颜色映射
+COLORS = {
+    "input": "#569CD6",  # 蓝色
+    "output": "#D4D4D4",  # 白色
+    "error": "#F44747",  # 红色
+    "system": "#43B581"  # 绿色
+}
+TYPE_LABELS = {"input": "输入", "output": "输出", "error": "错误", "system": "系统"}
+
+
+class ConsoleLinesModel(QAbstractListModel):
+    """
+    LineStore 之上的只读模型，视图只为可见的行取数据
+    按类型过滤时 visible 保存匹配行的绝对序号（evicted + 行号），淘汰与追加都只处理变化的部分
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = None
+        self.codes = frozenset(range(len(TYPES)))
+        self.visible = None  # 未过滤时为 None
+        self._rows = 0
+        self._evicted = 0
+        self._scanned = 0  # 已检查过类型的绝对序号
+        self._colors = [QColor(COLORS[name]) for name in TYPES]
+        self._ansi_colors = {}
+
+    @property
+    def filtered(self):
+        return len(self.codes) < len(TYPES)
+
+    def set_store(self, store):
+        self.store = store
+        self.reset()
+
+    def set_types(self, names):
+        self.codes = frozenset(TYPES.index(name) for name in names)
+        self.reset()
+
+    def reset(self):
+        self.beginResetModel()
+        self.visible = None
+        self._rows = 0
+        if self.store is not None:
+            self._evicted = self._scanned = self.store.evicted
+            if self.filtered:
+                self.visible = array("Q")
+            else:
+                self._rows = len(self.store)
+        self.endResetModel()
+        self.refresh()
+
+    def refresh(self):
+        """把 store 的变化（头部淘汰、尾部追加）同步为行的删除与插入"""
+        store = self.store
+        if store is None:
+            return
+        if self.visible is None:
+            removed = min(store.evicted - self._evicted, self._rows)
+            added = len(store) - (self._rows - removed)
+        else:
+            removed = bisect_left(self.visible, store.evicted)
+            start = max(self._scanned, store.evicted)
+            new_rows = store.rows_of_types(self.codes, start - store.evicted)
+            added = len(new_rows)
+        self._evicted = store.evicted
+        if removed:
+            self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+            if self.visible is None:
+                self._rows -= removed
+            else:
+                del self.visible[:removed]
+            self.endRemoveRows()
+        if self.visible is not None:
+            self._scanned = store.evicted + len(store)
+        if added > 0:
+            rows = self.rowCount()
+            self.beginInsertRows(QModelIndex(), rows, rows + added - 1)
+            if self.visible is None:
+                self._rows += added
+            else:
+                self.visible.extend(store.evicted + row for row in new_rows)
+            self.endInsertRows()
+
+    def store_row(self, row):
+        return row if self.visible is None else self.visible[row] - self.store.evicted
+
+    def model_row(self, store_row):
+        """store 行号对应的模型行号（过滤时为其后第一个可见行）"""
+        if self.visible is None:
+            return store_row
+        return bisect_left(self.visible, self.store.evicted + store_row)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._rows if self.visible is None else len(self.visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.store is None:
+            return None
+        if role == Qt.DisplayRole:
+            return self.store.text(self.store_row(index.row()))
+        if role == Qt.ForegroundRole:
+            row = self.store_row(index.row())
+            # 整行只有一种 ANSI 颜色时使用该颜色，否则按消息类型着色
+            runs = self.store.style_runs(row)
+            if runs and len(runs) == 1 and runs[0][1].fg:
+                color = self._ansi_colors.get(runs[0][1].fg)
+                if color is None:
+                    color = self._ansi_colors[runs[0][1].fg] = QColor(runs[0][1].fg)
+                return color
+            return self._colors[self.store.type_code(row)]
+        return None
+
+
+class ConsoleView(QWidget):
+    """
+    虚拟化的控制台输出：只绘制可见的行，几十万行以上也能流畅滚动
+    支持按消息类型过滤与增量检索（直接在 LineStore 的缓冲区上匹配）
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        toolbar = QHBoxLayout()
+        toolbar.setContentsMargins(5, 2, 5, 2)
+        self.type_checks = {}
+        for name in ("output", "error", "input", "system"):
+            check = QCheckBox(TYPE_LABELS[name])
+            check.setChecked(True)
+            check.setStyleSheet(f"QCheckBox {{ color: {COLORS[name]}; }}")
+            check.toggled.connect(self._on_types_changed)
+            self.type_checks[name] = check
+            toolbar.addWidget(check)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("检索（回车查找下一个，Shift+回车查找上一个）")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(lambda: self.find(incremental=True))
+        self.search_edit.returnPressed.connect(lambda: self.find())
+        self.regex_check = QCheckBox("正则")
+        self.regex_check.toggled.connect(lambda: self.find(incremental=True))
+        self.status_label = QLabel()
+        toolbar.addWidget(self.search_edit, 1)
+        toolbar.addWidget(self.regex_check)
+        toolbar.addWidget(self.status_label)
+        layout.addLayout(toolbar)
+
+        # 与日志查看器相同，使用行高统一的 QTableView，行数多时插入与滚动的开销不随行数增长
+        self.model = ConsoleLinesModel(self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setShowGrid(False)
+        self.view.setWordWrap(False)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.horizontalHeader().hide()
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.verticalHeader().hide()
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.Monospace)
+        font.setPointSize(10)
+        self.view.setFont(font)
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(self.view.fontMetrics().height() + 2)
+        self.view.setStyleSheet("QTableView { background-color: #1E1E1E; color: #D4D4D4; border: none; }")
+        layout.addWidget(self.view)
+
+        QShortcut(QKeySequence.Find, self, self.search_edit.setFocus)
+        QShortcut(QKeySequence("F3"), self, lambda: self.find())
+        QShortcut(QKeySequence("Shift+F3"), self, lambda: self.find(backward=True))
+        QShortcut(QKeySequence("Shift+Return"), self.search_edit, lambda: self.find(backward=True))
+
+    def set_store(self, store):
+        self.model.set_store(store)
+        self.view.scrollToBottom()
+
+    def reset(self):
+        self.model.reset()
+
+    def refresh(self):
+        """store 有新内容后调用；原本停留在底部时自动滚动"""
+        scrollbar = self.view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 1
+        self.model.refresh()
+        if at_bottom:
+            self.view.scrollToBottom()
+
+    def _on_types_changed(self):
+        self.model.set_types([name for name, check in self.type_checks.items() if check.isChecked()])
+        self.view.scrollToBottom()
+
+    def find(self, backward=False, incremental=False):
+        """
+        incremental 为 True（输入检索文本时）从当前行开始查找，否则从当前行的下一行（或上一行）开始
+        没有选中行时向后从头、向前从末尾开始
+        """
+        store = self.model.store
+        text = self.search_edit.text()
+        self.status_label.clear()
+        if store is None or not text:
+            return
+        try:
+            pattern = compile_search(text, self.regex_check.isChecked())
+        except re.error as e:
+            self.status_label.setText(f"正则无效：{e}")
+            return
+        index = self.view.currentIndex()
+        if index.isValid():
+            start = self.model.store_row(index.row())
+            if not backward and not incremental:
+                start += 1
+        else:
+            start = len(store) if backward else 0
+        row = store.find(pattern, start, backward, self.model.codes if self.model.filtered else None)
+        if row is None:
+            self.status_label.setText("未找到")
+            return
+        model_index = self.model.index(self.model.model_row(row), 0)
+        self.view.setCurrentIndex(model_index)
+        self.view.scrollTo(model_index, QAbstractItemView.PositionAtCenter)
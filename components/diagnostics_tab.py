@@ -0,0 +1,172 @@
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (QCheckBox, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QMessageBox,
+                               QPlainTextEdit, QPushButton, QTabWidget, QTreeWidget, QTreeWidgetItem, QVBoxLayout,
+                               QWidget)
+
+from core.bus_trace import BUCKETS_US, bus_tracer
+from core.profiler import startup_profiler
+from core.stall_detector import stall_detector
+
+# 直方图的字符画
+SPARKS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(buckets):
+    peak = max(buckets)
+    if not peak:
+        return ""
+    return "".join(" " if not n else SPARKS[min(len(SPARKS) - 1, n * len(SPARKS) // (peak + 1))] for n in buckets)
+
+
+class DiagnosticsWidget(QWidget):
+    """诊断标签页：信号总线的发出次数与槽函数耗时分布、界面卡顿位置，以及启动耗时"""
+
+    def __init__(self):
+        super().__init__()
+        self.sections = QTabWidget()
+        self.sections.addTab(self._create_bus_page(), "信号总线")
+        self.sections.addTab(self._create_stall_page(), "界面卡顿")
+        # 启动耗时
+        self.startup_view = QPlainTextEdit()
+        self.startup_view.setReadOnly(True)
+        self.startup_view.setStyleSheet("font-family: Consolas, monospace;")
+        self.sections.addTab(self.startup_view, "启动耗时")
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.sections)
+
+        # 显示时每秒刷新
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def _create_bus_page(self):
+        page = QWidget()
+        layout = QVBoxLayout(page)
+        toolbar = QHBoxLayout()
+        self.trace_check = QCheckBox("启用信号追踪")
+        self.trace_check.setToolTip("统计信号发出次数与槽函数耗时；关闭时没有额外开销")
+        self.trace_check.setChecked(bus_tracer.enabled)
+        self.trace_check.toggled.connect(self._set_tracing)
+        reset_btn = QPushButton("重置")
+        reset_btn.clicked.connect(self._reset)
+        export_json_btn = QPushButton("导出 JSON")
+        export_json_btn.clicked.connect(lambda: self._export("json"))
+        export_trace_btn = QPushButton("导出 Chrome Trace")
+        export_trace_btn.clicked.connect(lambda: self._export("trace"))
+        toolbar.addWidget(self.trace_check)
+        toolbar.addStretch(1)
+        toolbar.addWidget(reset_btn)
+        toolbar.addWidget(export_json_btn)
+        toolbar.addWidget(export_trace_btn)
+        layout.addLayout(toolbar)
+
+        # 信号 -> 槽函数
+        self.stats_tree = QTreeWidget()
+        self.stats_tree.setHeaderLabels(["信号 / 槽函数", "次数", "每秒", "总耗时 ms", "平均 µs", "最大 µs", "耗时分布"])
+        self.stats_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.stats_tree)
+        return page
+
+    def _create_stall_page(self):
+        page = QWidget()
+        layout = QVBoxLayout(page)
+        toolbar = QHBoxLayout()
+        self.stall_label = QLabel()
+        reset_btn = QPushButton("清空")
+        reset_btn.clicked.connect(self._reset_stalls)
+        toolbar.addWidget(self.stall_label)
+        toolbar.addStretch(1)
+        toolbar.addWidget(reset_btn)
+        layout.addLayout(toolbar)
+
+        # 位置 -> 卡顿最久一次的调用栈
+        self.stall_tree = QTreeWidget()
+        self.stall_tree.setHeaderLabels(["位置 / 调用栈", "次数", "累计 ms", "最长 ms"])
+        self.stall_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.stall_tree)
+        return page
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def _set_tracing(self, enabled):
+        bus_tracer.set_enabled(enabled)
+        self.refresh()
+
+    def _reset(self):
+        bus_tracer.reset()
+        self.refresh()
+
+    def _reset_stalls(self):
+        stall_detector.reset()
+        self.refresh()
+
+    def refresh(self):
+        self._refresh_bus()
+        self._refresh_stalls()
+        self.startup_view.setPlainText(startup_profiler.report())
+
+    @staticmethod
+    def _expanded_rows(tree):
+        return {tree.topLevelItem(i).text(0) for i in range(tree.topLevelItemCount())
+                if tree.topLevelItem(i).isExpanded()}
+
+    def _refresh_stalls(self):
+        if stall_detector.running:
+            self.stall_label.setText(f"主线程超过 {stall_detector.threshold * 1000:.0f} ms 未响应时记录调用栈")
+        else:
+            self.stall_label.setText("卡顿检测已关闭（设置 → 界面卡顿阈值）")
+        expanded = self._expanded_rows(self.stall_tree)
+        self.stall_tree.clear()
+        for where, stats in stall_detector.worst():
+            row = QTreeWidgetItem([where, str(stats["count"]), f"{stats['total_ms']:.0f}", f"{stats['max_ms']:.0f}"])
+            for frame in stats["stack"]:
+                location, *code = frame.strip().splitlines()
+                child = QTreeWidgetItem([location])
+                child.setToolTip(0, code[0].strip() if code else location)
+                row.addChild(child)
+            self.stall_tree.addTopLevelItem(row)
+            row.setExpanded(where in expanded)
+
+    def _refresh_bus(self):
+        expanded = self._expanded_rows(self.stats_tree)
+        snapshot = bus_tracer.snapshot()
+        self.stats_tree.clear()
+        for signal, data in sorted(snapshot["signals"].items(), key=lambda item: -item[1]["emissions"]):
+            slots = data["slots"]
+            total = sum(stats["total_ms"] for stats in slots.values())
+            row = QTreeWidgetItem([signal, str(data["emissions"]), f"{data['per_sec']:.1f}", f"{total:.1f}"])
+            for name, stats in sorted(slots.items(), key=lambda item: -item[1]["total_ms"]):
+                buckets = list(stats["histogram_us"].values())
+                child = QTreeWidgetItem([name, str(stats["count"]), "", f"{stats['total_ms']:.1f}",
+                                         f"{stats['mean_us']:.0f}", f"{stats['max_us']:.0f}", sparkline(buckets)])
+                child.setToolTip(6, "\n".join(f"{label} µs: {n}" for label, n in stats["histogram_us"].items()))
+                row.addChild(child)
+            self.stats_tree.addTopLevelItem(row)
+            row.setExpanded(signal in expanded)
+        if not snapshot["signals"]:
+            hint = "勾选「启用信号追踪」开始统计" if not snapshot["enabled"] else "暂无信号"
+            self.stats_tree.addTopLevelItem(QTreeWidgetItem([hint]))
+        self.stats_tree.headerItem().setToolTip(6, "桶上限（µs）：" + " / ".join(map(str, BUCKETS_US)))
+
+    def _export(self, kind):
+        if kind == "json":
+            path, _ = QFileDialog.getSaveFileName(self, "导出统计", "bus_stats.json", "JSON (*.json)")
+        else:
+            path, _ = QFileDialog.getSaveFileName(self, "导出 Chrome Trace", "bus_trace.json",
+                                                  "Chrome Trace (*.json)")
+        if not path:
+            return
+        try:
+            if kind == "json":
+                bus_tracer.export_json(path)
+            else:
+                bus_tracer.export_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"导出失败：{e}")
@@ -1,15 +1,16 @@
 import os
 import subprocess
-import re
-import shutil
-from datetime import datetime
 
 from PySide6.QtCore import QDir, QUrl, Qt
 from PySide6.QtGui import QDesktopServices
-from PySide6.QtWidgets import QTreeView, QFileSystemModel, QMenu, QMessageBox, QApplication
+from PySide6.QtWidgets import (QTreeView, QFileSystemModel, QMenu, QMessageBox, QApplication, QFileDialog,
+                               QProgressDialog, QAbstractItemView, QInputDialog)
 
-from core.utils import lord_model
-from core import MarkdownFilterProxy, SettingsManager, SignalBus
+from core.file_ops import COPY, DELETE, MOVE, RENAME, TRASH, FileOperation
+from core.profiler import startup_profiler
+from core.utils import create_post
+from core import (FileOperationQueue, MarkdownFilterProxy, PostImporter, RootIndexPool, SettingsManager, SignalBus,
+                  plan_operations, validate_filename)
 
 signal_bus = SignalBus.get_instance()
 settings_manager = SettingsManager.get_instance()
@@ -26,13 +27,25 @@ class FileTreeWidget(QTreeView):
 
         self.proxy_model = MarkdownFilterProxy(self.settings.blog_root)
         self.proxy_model.setSourceModel(self.source_model)
+        # 每个工作区根目录的索引常驻内存（按最近使用保留 warm_workspaces 个），切换工作区时直接复用
+        self.indexes = RootIndexPool(self.settings.warm_workspaces, self.proxy_model.exclude_dirs, self)
+        self.indexes.created.connect(self._connect_index)
+        self.active_index = None
 
         self.setModel(self.proxy_model)
-        self.source_model.setRootPath(self.settings.blog_root)
+        # 按住 Ctrl/Shift 多选，批量删除、移动与复制
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        # 文件操作在后台线程中排队执行，结束后一次性更新索引
+        self.file_ops = FileOperationQueue(self)
+        self.file_ops.batch_started.connect(self._on_file_ops_started)
+        self.file_ops.progress.connect(self._on_file_ops_progress)
+        self.file_ops.batch_finished.connect(self._on_file_ops_finished)
+        self.file_ops_dialog = None
 
         # 初始加载根路径
         self.source_model.directoryLoaded.connect(self._update_root_index)
-        signal_bus.settings_changed.connect(self._update_root_index)
+        signal_bus.subscribe("setting_changed", self._on_setting_changed)
+        QApplication.instance().aboutToQuit.connect(self._shutdown)
         # 隐藏其他列并设置宽度
         for column in range(1, 4):
             self.setColumnHidden(column, True)
@@ -46,11 +59,78 @@ class FileTreeWidget(QTreeView):
         # 右键
         self.customContextMenuRequested.connect(self._show_context_menu)
 
+    def start(self):
+        """开始加载目录并扫描索引（由主窗口在首次绘制后调用，不拖慢窗口显示）"""
+        with startup_profiler.phase("启动文件树扫描"):
+            self.source_model.setRootPath(self.settings.blog_root)
+            self._activate(self.settings.blog_root)
+
+    @property
+    def markdown_index(self):
+        return self.active_index.markdown_index if self.active_index is not None else None
+
+    def _connect_index(self, index):
+        """只有当前显示的根目录的索引更新时才刷新文件树"""
+        index.index_ready.connect(lambda markdown_index, flipped: self._on_index_ready(index, markdown_index, flipped))
+        index.scan_finished.connect(lambda _: self._on_scan_finished(index))
+        index.paths_changed.connect(lambda paths: self._on_paths_changed(index, paths))
+        index.metadata_ready.connect(lambda metadata: self._on_metadata_ready(index, metadata))
+
+    def _activate(self, root_path):
+        """显示根目录：已常驻的索引与文章元数据立即生效，否则等待扫描（先用扫描缓存）"""
+        self.active_index = self.indexes.acquire(root_path)
+        self.proxy_model.set_root_path(root_path)
+        if self.active_index.current_index is not None:
+            self.proxy_model.set_markdown_index(self.active_index.current_index)
+        if self.active_index.post_metadata:
+            self.proxy_model.set_post_metadata(self.active_index.post_metadata)
+        self._update_root_index()
+
+    def _on_index_ready(self, index, markdown_index, flipped):
+        if index is not self.active_index:
+            return
+        if index.markdown_index is None:
+            startup_profiler.mark("文件树显示缓存索引")
+        self.proxy_model.set_markdown_index(markdown_index, flipped)
+
+    def _on_scan_finished(self, index):
+        if index is self.active_index:
+            startup_profiler.mark("文件树扫描完成")
+
+    def _on_paths_changed(self, index, paths):
+        """只重新过滤受影响的行"""
+        if index is self.active_index:
+            self.proxy_model.refresh_paths(paths)
+
+    def _on_metadata_ready(self, index, metadata):
+        if index is self.active_index:
+            self.proxy_model.set_post_metadata(metadata)
+
+    def _shutdown(self):
+        """退出前停止所有后台线程"""
+        self.file_ops.close()
+        self.indexes.close()
+
+    def _apply_changes(self, changes):
+        """将文件变化增量应用到当前根目录的索引"""
+        if self.active_index is not None:
+            self.active_index.apply_changes(changes)
+
+    def _reload(self):
+        """重新扫描并刷新文件树"""
+        self.proxy_model.set_root_path(self.settings.blog_root)
+        self._update_root_index()
+        self.active_index.reload()
+
+    def _on_setting_changed(self, key, old, new):
+        """博客根目录变化（包括切换工作区）时切换到对应的索引"""
+        if key == "blog_root" and self.active_index is not None:
+            self._activate(new)
+        elif key == "warm_workspaces":
+            self.indexes.resize(new)
+
     def _update_root_index(self):
         """更新根目录索引"""
-        self.proxy_model = MarkdownFilterProxy(self.settings.blog_root)
-        self.proxy_model.setSourceModel(self.source_model)
-        self.setModel(self.proxy_model)
         root_index = self.source_model.index(self.settings.blog_root)
         self.setRootIndex(self.proxy_model.mapFromSource(root_index))
         self.source_model.setRootPath(self.settings.blog_root)
@@ -69,22 +149,63 @@ class FileTreeWidget(QTreeView):
 
         add_page = menu.addAction("🖊 新增文章")
         add_page.triggered.connect(self._add_page)
+        import_posts = menu.addAction("📥 从 CSV/JSON 批量生成文章")
+        import_posts.triggered.connect(self._import_posts)
 
         # 打开所在文件夹
         open_folder_action = menu.addAction("📂 在资源管理器中显示")
         open_folder_action.triggered.connect(self._reveal_in_explorer)
 
-        # 删除操作
-        delete_action = menu.addAction("🗑️ 删除")
+        # 文件操作（对所有选中项执行）
+        count = len(self._selected_paths())
+        suffix = f"（{count} 项）" if count > 1 else ""
+        trash_action = menu.addAction(f"🗑️ 移到回收站{suffix}")
+        trash_action.triggered.connect(self._trash_selected)
+        delete_action = menu.addAction(f"❌ 永久删除{suffix}")
         delete_action.triggered.connect(self._delete_selected_item)
+        move_action = menu.addAction(f"✂️ 移动到...{suffix}")
+        move_action.triggered.connect(lambda: self._transfer_selected(MOVE))
+        copy_action = menu.addAction(f"📄 复制到...{suffix}")
+        copy_action.triggered.connect(lambda: self._transfer_selected(COPY))
+        if count == 1:
+            rename_action = menu.addAction("✏️ 重命名")
+            rename_action.triggered.connect(self._rename_selected)
 
         # 扩展：可添加更多操作
         copy_path_action = menu.addAction("📋 复制路径")
         copy_path_action.triggered.connect(self._copy_path_to_clipboard)
         copy_path_action = menu.addAction("🔄 刷新")
-        copy_path_action.triggered.connect(self._update_root_index)
+        copy_path_action.triggered.connect(self._reload)
+
+        # 按文章元数据排序与筛选
+        sort_menu = menu.addMenu("↕ 排序方式")
+        for field, label in (("name", "文件名"), ("title", "标题"), ("date", "日期（最新在前）")):
+            action = sort_menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(self.proxy_model.sort_field == field)
+            action.triggered.connect(lambda checked=False, f=field: self._set_sort_field(f))
+        filter_action = menu.addAction("🔍 按标题/标签筛选")
+        filter_action.triggered.connect(self._filter_by_metadata)
+        if self.proxy_model.meta_query:
+            clear_filter_action = menu.addAction("✖ 清除筛选")
+            clear_filter_action.triggered.connect(lambda: self.proxy_model.set_meta_query(""))
         menu.exec(self.viewport().mapToGlobal(pos))
 
+    def _set_sort_field(self, field):
+        order = Qt.DescendingOrder if field == "date" else Qt.AscendingOrder
+        self.proxy_model.set_sort_field(field, order)
+
+    def _filter_by_metadata(self):
+        """输入筛选条件：文本匹配标题，tag:xxx 匹配标签"""
+        query, ok = QInputDialog.getText(
+            self,
+            "筛选文章",
+            "标题关键字，或 tag:标签名：",
+            text=self.proxy_model.meta_query
+        )
+        if ok:
+            self.proxy_model.set_meta_query(query)
+
     def _reveal_in_explorer(self):
         """在文件资源管理器中显示"""
         if hasattr(self, "_current_context_path"):
@@ -99,6 +220,18 @@ class FileTreeWidget(QTreeView):
         path = self.source_model.filePath(source_index)
         self.open_in_editor(path)
 
+    def reveal_path(self, path):
+        """在文件树中定位并选中指定文件"""
+        proxy_index = self.proxy_model.mapFromSource(self.source_model.index(path))
+        if proxy_index.isValid():
+            self.setCurrentIndex(proxy_index)
+            self.scrollTo(proxy_index)
+
+    def open_post(self, path):
+        """定位并打开文章（搜索结果激活时调用）"""
+        self.reveal_path(path)
+        self.open_in_editor(path)
+
     def open_in_editor(self, path):
         if os.path.isfile(path):
             if os.path.exists(settings_manager.editor_path):
@@ -106,16 +239,13 @@ class FileTreeWidget(QTreeView):
             else:
                 # 未配置编辑器时使用系统默认方式
                 QDesktopServices.openUrl(QUrl.fromLocalFile(path))
-                signal_bus.output_received.emit("未配置编辑器，使用系统默认程序打开", "warning")
+                signal_bus.output_received.emit("未配置编辑器，使用系统默认程序打开", "warning", "")
 
     def _add_page(self):
         """在选中目录创建新文章"""
         if hasattr(self, "_current_context_path"):
-            target_dir = os.path.dirname(self._current_context_path) \
-                if os.path.isfile(self._current_context_path) \
-                else self._current_context_path
+            target_dir = self._context_dir()
             # 弹出输入对话框
-            from PySide6.QtWidgets import QInputDialog
             title, ok = QInputDialog.getText(
                 self,
                 "新建文章",
@@ -126,63 +256,168 @@ class FileTreeWidget(QTreeView):
             if not ok:
                 return  # 用户取消输入
 
-            # 生成安全文件名
-
-            safe_name = re.sub(r'[\\/*?:"<>|]', "", title.strip())  # 去除非法字符
-            if not safe_name:
-                safe_name = datetime.now().strftime("新建文章-%Y%m%d%H%M.md")
+            full_path = create_post(target_dir, title, settings_manager.default_content)
 
-            counter = 1
-            base_name = safe_name
-            while os.path.exists(os.path.join(target_dir, f"{safe_name}.md")):
-                safe_name = f"{base_name}-{counter}"
-                counter += 1
-
-            full_path = os.path.join(target_dir, f"{safe_name}.md")
+            # 刷新文件树（立即更新索引，监听线程随后的事件是幂等的）
+            self._apply_changes([("created", full_path, None, False)])
+            signal_bus.output_received.emit(f"已创建新文章：{full_path}", "system", "")
+            self.open_in_editor(full_path)
 
-            # 创建文件并写入初始内容
-            with open(full_path, 'w', encoding='utf-8') as f:
-                content = lord_model(title,settings_manager.default_content)
-                print(content)
-                f.write(content)
 
-            # 刷新文件树
-            self.source_model.setRootPath(self.settings.blog_root)
-            signal_bus.output_received.emit(f"已创建新文章：{full_path}", "system")
-            self.open_in_editor(full_path)
+    def _context_dir(self):
+        return os.path.dirname(self._current_context_path) \
+            if os.path.isfile(self._current_context_path) else self._current_context_path
 
+    def _import_posts(self):
+        """按默认内容模板，为 CSV/JSON 的每一行在选中目录生成一篇文章（后台写入，可取消）"""
+        if not hasattr(self, "_current_context_path"):
+            return
+        source, _ = QFileDialog.getOpenFileName(self, "选择文章数据", "", "CSV / JSON (*.csv *.json)")
+        if not source:
+            return
+        importer = PostImporter(source, self._context_dir(), settings_manager.default_content, self)
+        dialog = QProgressDialog("正在生成文章...", "取消", 0, 0, self)
+        dialog.setWindowTitle("批量生成文章")
+        dialog.setMinimumDuration(300)
+        dialog.canceled.connect(importer.requestInterruption)
+        importer.progress.connect(lambda done, total: self._show_import_progress(dialog, done, total))
+        importer.failed.connect(lambda message: QMessageBox.warning(self, "读取失败", message))
+        importer.import_finished.connect(self._on_import_finished)
+        importer.finished.connect(dialog.reset)
+        importer.finished.connect(importer.deleteLater)
+        importer.start()
+
+    @staticmethod
+    def _show_import_progress(dialog, done, total):
+        dialog.setMaximum(total)
+        dialog.setValue(done)
+
+    def _on_import_finished(self, result):
+        """立即把新文件加入索引（监听线程随后的事件是幂等的），错误输出到终端"""
+        self._apply_changes([("created", path, None, False) for path in result.created])
+        signal_bus.output_received.emit(
+            f"已生成 {len(result.created)} 篇文章" + (f"，{len(result.errors)} 行失败" if result.errors else ""),
+            "system", "")
+        for number, message in result.errors[:20]:
+            signal_bus.output_received.emit(f"第 {number} 行：{message}", "error", "")
 
     def _copy_path_to_clipboard(self):
         """复制完整路径到剪贴板"""
         if hasattr(self, "_current_context_path"):
             QApplication.clipboard().setText(self._current_context_path)
 
-    def _delete_selected_item(self):
-        """删除选中项"""
-        if not hasattr(self, "_current_context_path"):
+    def keyPressEvent(self, event):
+        """Delete 移到回收站，Shift+Delete 永久删除，F2 重命名"""
+        if event.key() in (Qt.Key_Delete, Qt.Key_F2) and self.currentIndex().isValid():
+            self._current_context_path = self.source_model.filePath(self.proxy_model.mapToSource(self.currentIndex()))
+            if event.key() == Qt.Key_F2:
+                self._rename_selected()
+            elif event.modifiers() & Qt.ShiftModifier:
+                self._delete_selected_item()
+            else:
+                self._trash_selected()
+            return
+        super().keyPressEvent(event)
+
+    def _selected_paths(self):
+        """选中的所有项；右键的项不在选中范围内时只取该项"""
+        paths = [self.source_model.filePath(self.proxy_model.mapToSource(index))
+                 for index in self.selectionModel().selectedRows()]
+        current = getattr(self, "_current_context_path", None)
+        if current is not None and current not in paths:
+            return [current]
+        return paths
+
+    @staticmethod
+    def _describe(paths):
+        names = "\n".join(paths[:10])
+        return names + (f"\n... 等 {len(paths)} 项" if len(paths) > 10 else "")
+
+    def _trash_selected(self):
+        """把选中项移到回收站"""
+        paths = self._selected_paths()
+        if not paths:
             return
+        confirm = QMessageBox.question(self, "确认删除", f"确定要将以下项目移到回收站吗？\n{self._describe(paths)}")
+        if confirm == QMessageBox.Yes:
+            self._submit_file_ops("移到回收站", plan_operations(TRASH, paths))
 
-        path = self._current_context_path
+    def _delete_selected_item(self):
+        """永久删除选中项"""
+        paths = self._selected_paths()
+        if not paths:
+            return
         confirm = QMessageBox.question(
             self,
             "确认删除",
-            f"确定要永久删除以下项目吗？\n{path}",
+            f"确定要永久删除以下项目吗？\n{self._describe(paths)}",
             QMessageBox.Yes | QMessageBox.No
         )
-
         if confirm == QMessageBox.Yes:
-            try:
-                # 删除目录或文件
-                if os.path.isdir(path):
-                    shutil.rmtree(path)
-                else:
-                    os.remove(path)
-
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "删除失败",
-                    f"无法删除：{str(e)}",
-                    QMessageBox.Ok
-                )
+            self._submit_file_ops("永久删除", plan_operations(DELETE, paths))
 
+    def _transfer_selected(self, kind):
+        """把选中项移动或复制到另一个目录"""
+        paths = self._selected_paths()
+        if not paths:
+            return
+        label = "移动" if kind == MOVE else "复制"
+        target_dir = QFileDialog.getExistingDirectory(self, f"{label}到", self._context_dir())
+        if target_dir:
+            self._submit_file_ops(label, plan_operations(kind, paths, target_dir))
+
+    def _rename_selected(self):
+        """重命名选中的一项"""
+        paths = self._selected_paths()
+        if len(paths) != 1:
+            return
+        path = paths[0]
+        name, ok = QInputDialog.getText(self, "重命名", "新名称：", text=os.path.basename(path))
+        if not ok or name == os.path.basename(path):
+            return
+        try:
+            name = validate_filename(name)
+        except ValueError as e:
+            QMessageBox.warning(self, "无法重命名", str(e))
+            return
+        destination = os.path.join(os.path.dirname(path), name)
+        self._submit_file_ops("重命名", [FileOperation(RENAME, path, destination)])
+
+    def _submit_file_ops(self, description, operations):
+        """加入后台队列；执行期间暂存监听线程的事件，结束后与操作结果一起应用到索引"""
+        if self.active_index is not None:
+            self.active_index.hold_changes()
+        link_root = settings_manager.blog_root if settings_manager.rewrite_links else None
+        self.file_ops.submit(description, operations, self.active_index, link_root)
+
+    def _on_file_ops_started(self, description, pending):
+        if self.file_ops_dialog is None:
+            self.file_ops_dialog = QProgressDialog(self)
+            self.file_ops_dialog.setWindowTitle("文件操作")
+            self.file_ops_dialog.setCancelButtonText("取消")
+            self.file_ops_dialog.setMinimumDuration(300)
+            self.file_ops_dialog.setAutoReset(False)
+            self.file_ops_dialog.canceled.connect(self.file_ops.cancel)
+        self.file_ops_dialog.setLabelText(f"正在{description}..." + (f"（另有 {pending} 项排队）" if pending else ""))
+        self.file_ops_dialog.setRange(0, 0)
+        self.file_ops_dialog.setValue(0)
+
+    def _on_file_ops_progress(self, done, total, path):
+        if self.file_ops_dialog is not None:
+            self.file_ops_dialog.setMaximum(total)
+            self.file_ops_dialog.setValue(done)
+
+    def _on_file_ops_finished(self, description, result, index):
+        """一次性应用整批变化，错误输出到终端"""
+        if index is not None:
+            index.release_changes(result.changes)
+        if not self.file_ops.pending and self.file_ops_dialog is not None:
+            self.file_ops_dialog.reset()
+        status = "已取消" if result.cancelled else "完成"
+        if result.links:
+            status += f"，更新了 {len(result.rewritten)} 篇文章中的 {result.links} 个链接"
+        signal_bus.output_received.emit(
+            f"{description}{status}" + (f"，{len(result.errors)} 项失败" if result.errors else ""),
+            "warning" if result.cancelled or result.errors else "system", "")
+        for path, message in result.errors[:20]:
+            signal_bus.output_received.emit(f"{path}：{message}", "error", "")
@@ -0,0 +1,22 @@
+from PySide6.QtWidgets import QVBoxLayout, QWidget
+
+from core.profiler import startup_profiler
+
+
+class LazyTab(QWidget):
+    """标签页占位控件，调用 ensure_widget 时才构建真正的内容（由主窗口在切换到该页时调用）"""
+
+    def __init__(self, factory, name=""):
+        super().__init__()
+        self.factory = factory
+        self.name = name
+        self.widget = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def ensure_widget(self):
+        if self.widget is None:
+            with startup_profiler.phase(f"构建标签页：{self.name}"):
+                self.widget = self.factory()
+                self.layout().addWidget(self.widget)
+        return self.widget
@@ -0,0 +1,268 @@
+import os
+import re
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QThread, Qt, Signal
+from PySide6.QtGui import QColor, QFont, QKeySequence, QShortcut
+from PySide6.QtWidgets import (QAbstractItemView, QCheckBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit,
+                               QPushButton, QTableView, QVBoxLayout, QWidget)
+
+from core.log_index import ERROR_PATTERN, LogFile, compile_search, decompress_to_temp
+from core.pipeline_runner import TaskThread
+from core.resource_usage import format_bytes
+
+
+class LogIndexer(QThread):
+    """后台分块建立行索引，每块完成后发出 progress(已索引行数)"""
+    progress = Signal(int)
+
+    def __init__(self, log_file, parent=None):
+        super().__init__(parent)
+        self.log_file = log_file
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+        self.wait()
+
+    def run(self):
+        while not self._stopped:
+            done = self.log_file.index_chunk()
+            self.progress.emit(len(self.log_file))
+            if done:
+                break
+
+
+class LogLinesModel(QAbstractListModel):
+    """只在视图请求时从 mmap 读取并解码可见的行"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.log_file = None
+        self.rows = 0
+        self._error_color = QColor("#F44747")
+
+    def set_log_file(self, log_file):
+        self.beginResetModel()
+        self.log_file = log_file
+        self.rows = 0
+        self.endResetModel()
+
+    def update_rows(self, rows):
+        if rows > self.rows:
+            self.beginInsertRows(QModelIndex(), self.rows, rows - 1)
+            self.rows = rows
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.log_file is None:
+            return None
+        if role == Qt.DisplayRole:
+            return self.log_file.line(index.row())
+        if role == Qt.ForegroundRole:
+            start, end = self.log_file.line_range(index.row())
+            if ERROR_PATTERN.search(self.log_file.map, start, end):
+                return self._error_color
+        return None
+
+
+class LogViewer(QWidget):
+    """
+    日志查看器：mmap 映射日志并在后台建立行索引，打开数百 MB 的日志也无需等待
+    支持检索（正则/区分大小写）与跳转到错误行；gzip 日志先在后台解压到临时文件
+    """
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle(f"日志 - {os.path.basename(path)}")
+        self.resize(1000, 700)
+        self.path = path
+        self.log_file = None
+        self.temp_path = None
+        self.indexer = None
+        self.search_thread = None
+        self._init_ui()
+        self._open()
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+        toolbar = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("检索（回车查找下一个，Shift+回车查找上一个）")
+        self.search_edit.returnPressed.connect(lambda: self.find(backward=False))
+        self.regex_check = QCheckBox("正则")
+        self.case_check = QCheckBox("区分大小写")
+        prev_btn = QPushButton("◀")
+        prev_btn.setToolTip("上一个（Shift+F3）")
+        prev_btn.clicked.connect(lambda: self.find(backward=True))
+        next_btn = QPushButton("▶")
+        next_btn.setToolTip("下一个（F3）")
+        next_btn.clicked.connect(lambda: self.find(backward=False))
+        prev_error_btn = QPushButton("上一个错误")
+        prev_error_btn.clicked.connect(lambda: self.find_error(backward=True))
+        next_error_btn = QPushButton("下一个错误")
+        next_error_btn.setToolTip("跳到下一处 error / failed / exception 等（F8）")
+        next_error_btn.clicked.connect(lambda: self.find_error(backward=False))
+        reload_btn = QPushButton("🔄")
+        reload_btn.setToolTip("重新读取（日志仍在写入时）")
+        reload_btn.clicked.connect(self.reload)
+        for widget in (self.regex_check, self.case_check, prev_btn, next_btn, prev_error_btn, next_error_btn,
+                       reload_btn):
+            toolbar.addWidget(widget)
+        toolbar.insertWidget(0, self.search_edit, 1)
+        layout.addLayout(toolbar)
+
+        self.model = LogLinesModel(self)
+        # QListView 每次布局都要逐行回调模型，百万行时插入一次就要数秒；
+        # QTableView 的行高由表头统一给出，插入与滚动的开销与行数无关
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setShowGrid(False)
+        self.view.setWordWrap(False)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.horizontalHeader().hide()
+        self.view.horizontalHeader().setStretchLastSection(True)
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.Monospace)
+        self.view.setFont(font)
+        header = self.view.verticalHeader()
+        header.setSectionResizeMode(QHeaderView.Fixed)
+        header.setDefaultSectionSize(self.view.fontMetrics().height() + 2)
+        self.view.setStyleSheet("QTableView { background-color: #1E1E1E; color: #D4D4D4; }")
+        layout.addWidget(self.view)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        QShortcut(QKeySequence.Find, self, self.search_edit.setFocus)
+        QShortcut(QKeySequence("F3"), self, lambda: self.find(backward=False))
+        QShortcut(QKeySequence("Shift+F3"), self, lambda: self.find(backward=True))
+        QShortcut(QKeySequence("F8"), self, lambda: self.find_error(backward=False))
+        QShortcut(QKeySequence("Shift+F8"), self, lambda: self.find_error(backward=True))
+        QShortcut(QKeySequence("Shift+Return"), self.search_edit, lambda: self.find(backward=True))
+
+    def _open(self):
+        if self.path.endswith(".gz"):
+            self.status_label.setText("正在解压…")
+            self._start_task(self._on_decompressed, decompress_to_temp, self.path)
+        else:
+            self._load(self.path)
+
+    def _on_decompressed(self, temp_path):
+        self.temp_path = temp_path
+        self._load(temp_path)
+
+    def _load(self, path):
+        try:
+            self.log_file = LogFile(path)
+        except OSError as e:
+            self.status_label.setText(f"无法打开日志：{e}")
+            return
+        self.model.set_log_file(self.log_file)
+        self._start_indexer()
+
+    def _start_indexer(self):
+        self.indexer = LogIndexer(self.log_file, self)
+        self.indexer.progress.connect(self._on_indexed)
+        self.indexer.finished.connect(self._update_status)
+        self.indexer.start()
+
+    def _on_indexed(self, rows):
+        self.model.update_rows(rows)
+        self._update_status()
+
+    def _update_status(self):
+        if self.log_file is None:
+            return
+        state = "" if self.log_file.complete else f"，正在建立索引 {self.log_file.indexed / max(self.log_file.size, 1):.0%}"
+        self.status_label.setText(f"{self.path}    {len(self.log_file):,} 行，{format_bytes(self.log_file.size)}{state}")
+
+    def reload(self):
+        """日志仍在写入时读取新增的内容（gzip 日志重新解压）"""
+        if self.log_file is None or self._busy():
+            return
+        if self.temp_path is not None:
+            self._close_log()
+            self._open()
+            return
+        if self.log_file.remap():
+            self._start_indexer()
+
+    def _busy(self):
+        return any(thread is not None and thread.isRunning() for thread in (self.indexer, self.search_thread))
+
+    def _start_task(self, callback, func, *args):
+        self.search_thread = TaskThread(func, *args, parent=self)
+        self.search_thread.result_ready.connect(callback)
+        self.search_thread.failed.connect(self.status_label.setText)
+        self.search_thread.start()
+
+    def _current_offset(self, backward):
+        """从当前选中行之后（或之前）开始检索"""
+        index = self.view.currentIndex()
+        if not index.isValid():
+            return 0 if not backward else self.log_file.size
+        start, end = self.log_file.line_range(index.row())
+        return start if backward else end
+
+    def find(self, backward=False):
+        text = self.search_edit.text()
+        if not text:
+            return
+        try:
+            pattern = compile_search(text, self.regex_check.isChecked(), self.case_check.isChecked())
+        except re.error as e:
+            self.status_label.setText(f"正则表达式无效：{e}")
+            return
+        self._search(pattern, backward, f"未找到「{text}」")
+
+    def find_error(self, backward=False):
+        self._search(ERROR_PATTERN, backward, "没有更多错误")
+
+    def _search(self, pattern, backward, not_found):
+        if self.log_file is None or (self.search_thread is not None and self.search_thread.isRunning()):
+            return
+        self.status_label.setText("检索中…")
+        self._start_task(lambda offset: self._on_found(offset, not_found),
+                         self.log_file.search, pattern, self._current_offset(backward), backward)
+
+    def _on_found(self, offset, not_found):
+        if offset is None:
+            self.status_label.setText(not_found)
+            return
+        row = self.log_file.row_at(offset)
+        if row >= self.model.rows:
+            # 匹配位于尚未建立索引的部分
+            self.status_label.setText("匹配位于尚未建立索引的部分，请稍后再试")
+            return
+        index = self.model.index(row, 0)
+        self.view.setCurrentIndex(index)
+        self.view.scrollTo(index, QAbstractItemView.PositionAtCenter)
+        self._update_status()
+
+    def _close_log(self):
+        for thread in (self.indexer, self.search_thread):
+            if thread is not None:
+                if isinstance(thread, LogIndexer):
+                    thread.stop()
+                else:
+                    thread.wait()
+        self.indexer = self.search_thread = None
+        self.model.set_log_file(None)
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+        if self.temp_path is not None:
+            try:
+                os.remove(self.temp_path)
+            except OSError:
+                pass
+            self.temp_path = None
+
+    def closeEvent(self, event):
+        self._close_log()
+        super().closeEvent(event)
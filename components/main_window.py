@@ -0,0 +1,223 @@
+# 主窗口：左侧工作区、搜索框与文件树，右侧状态栏与按需构建的标签页
+import os
+import sys
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QKeySequence, QShortcut
+from PySide6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout,
+    QSplitter, QTabWidget, QLabel, QStatusBar
+)
+from core import SettingsManager, SignalBus
+from core.profiler import profiling_requested, startup_profiler
+from core.stall_detector import stall_detector
+from .console_tab import ConsoleWidget
+from .diagnostics_tab import DiagnosticsWidget
+from .file_tree import FileTreeWidget
+from .lazy_tab import LazyTab
+from .script_tab import CommandsButtonWidget
+from .search_box import PostSearchWidget
+from .setting_tab import SettingTab
+from .workspace_bar import WorkspaceBar
+
+signal_bus = SignalBus.get_instance()
+settings_manager = SettingsManager.get_instance()
+class MainWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self._first_painted = False
+        with startup_profiler.phase("构建主窗口"):
+            self.init_ui()
+        # Ctrl+Alt+P 输出启动耗时
+        QShortcut(QKeySequence("Ctrl+Alt+P"), self, self.show_startup_profile)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_painted:
+            self._first_painted = True
+            startup_profiler.mark("首次绘制")
+            QTimer.singleShot(0, self._after_first_paint)
+
+    def _after_first_paint(self):
+        """窗口显示后再构建当前标签页、开始扫描文件树"""
+        self.file_tree.start()
+        self.file_tree.active_index.scan_finished.connect(self._on_startup_finished)
+        self._on_tab_changed(self.workspace_tabs.currentIndex())
+        # 终端需要尽早接收任务输出
+        self.console_tab.ensure_widget()
+        self.workspace_tabs.currentChanged.connect(self._on_tab_changed)
+        # 界面卡顿检测，阈值修改后重新启动
+        stall_detector.start(settings_manager.stall_threshold_ms)
+        signal_bus.subscribe("setting_changed", self._on_setting_changed)
+        if not os.path.exists(settings_manager.blog_root):
+            self.workspace_tabs.setCurrentWidget(self.setting_tab)
+            self.setting_tab.ensure_widget().prompt_blog_root()
+
+    def _on_setting_changed(self, key, old, new):
+        if key == "stall_threshold_ms":
+            stall_detector.start(new)
+
+    def _on_tab_changed(self, index):
+        tab = self.workspace_tabs.widget(index)
+        if isinstance(tab, LazyTab):
+            tab.ensure_widget()
+
+    def _on_startup_finished(self):
+        if startup_profiler.finished:
+            return
+        startup_profiler.finished = True
+        if profiling_requested():
+            self.show_startup_profile()
+
+    def show_startup_profile(self):
+        """在终端与标准错误输出启动耗时，并写入 JSON"""
+        report = startup_profiler.report()
+        try:
+            report += f"\n已写入 {startup_profiler.dump()}"
+        except OSError:
+            pass
+        print(report, file=sys.stderr)
+        signal_bus.output_received.emit(report, "system", "")
+
+    def init_ui(self):
+        # self.setWindowTitle("StaticBlogAssistant")
+        # self.resize(1024, 768)
+        #
+        # # 居中窗口
+        # screen_geometry = QApplication.primaryScreen().availableGeometry()
+        # self.move(
+        #     (screen_geometry.width() - self.width()) // 2,
+        #     (screen_geometry.height() - self.height()) // 2
+        # )
+        #
+        # # 主布局
+        # main_widget = QWidget()
+        # self.setCentralWidget(main_widget)
+        # main_layout = QVBoxLayout(main_widget)
+        # main_layout.setContentsMargins(0, 0, 0, 0)
+        #
+        # # 水平分割器
+        # content_splitter = QSplitter(Qt.Horizontal)
+        # main_layout.addWidget(content_splitter)
+        #
+        # # 左侧文件树
+        # self.file_tree = FileTreeWidget()
+        # content_splitter.addWidget(self.file_tree)
+        #
+        # # 右侧标签页
+        #
+        # self.workspace_tabs = QTabWidget()
+        # content_splitter.addWidget(self.workspace_tabs)
+        #
+        # # 添加标签页
+        # self.setting_tab = SettingTab()
+        # self.console_widget = ConsoleWidget()
+        # self.doc_tab = CommandsButtonWidget()
+        #
+        # self.workspace_tabs.addTab(self.doc_tab, "脚本")
+        # self.workspace_tabs.addTab(self.console_widget, "终端")
+        # self.workspace_tabs.addTab(self.setting_tab, "设置")
+        #
+        # # 分割比例
+        # content_splitter.setSizes([400, 800])
+
+        self.setWindowTitle("PureContent")
+        self.resize(1024, 768)
+
+        # 居中窗口
+        screen_geometry = QApplication.primaryScreen().availableGeometry()
+        self.move(
+            (screen_geometry.width() - self.width()) // 2,
+            (screen_geometry.height() - self.height()) // 2
+        )
+
+        # 主布局
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        main_layout = QVBoxLayout(main_widget)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+
+        # 水平分割器
+        content_splitter = QSplitter(Qt.Horizontal)
+        main_layout.addWidget(content_splitter)
+
+        # 左侧：工作区 + 搜索框 + 文件树
+        left_widget = QWidget()
+        left_layout = QVBoxLayout(left_widget)
+        left_layout.setContentsMargins(0, 0, 0, 0)
+        left_layout.setSpacing(0)
+        self.workspace_bar = WorkspaceBar()
+        left_layout.addWidget(self.workspace_bar)
+        with startup_profiler.phase("构建搜索框"):
+            self.search_box = PostSearchWidget()
+        left_layout.addWidget(self.search_box)
+        with startup_profiler.phase("构建文件树"):
+            self.file_tree = FileTreeWidget()
+        left_layout.addWidget(self.file_tree)
+        self.search_box.post_activated.connect(self.file_tree.open_post)
+        content_splitter.addWidget(left_widget)
+
+        # ================== 右侧区域 ==================
+        right_widget = QWidget()  # 新增右侧容器
+        right_layout = QVBoxLayout(right_widget)
+        right_layout.setContentsMargins(0, 0, 0, 0)
+
+        # 1. 添加状态栏（在标签页上方）
+        self.status_bar = QStatusBar()  # 使用 QStatusBar 组件
+        self.status_bar.setSizeGripEnabled(False)  # 隐藏右下角调整手柄
+        self.status_bar.showMessage("就绪")  # 默认消息
+        signal_bus.subscribe("message_sent", self.status_bar.showMessage)  # 连接信号
+        right_layout.addWidget(self.status_bar)
+
+        # 2. 添加标签页
+        self.workspace_tabs = QTabWidget()
+        right_layout.addWidget(self.workspace_tabs)  # 将标签页放在状态栏下方
+
+        # 将右侧容器添加到分割器
+        content_splitter.addWidget(right_widget)
+        # =============================================
+
+        # 添加标签页内容（首次切换到该页时才构建）
+        self.doc_tab = LazyTab(CommandsButtonWidget, "脚本")
+        self.console_tab = LazyTab(ConsoleWidget, "终端")
+        self.setting_tab = LazyTab(SettingTab, "设置")
+        self.diagnostics_tab = LazyTab(DiagnosticsWidget, "诊断")
+
+        self.workspace_tabs.addTab(self.doc_tab, "脚本")
+        self.workspace_tabs.addTab(self.console_tab, "终端")
+        self.workspace_tabs.addTab(self.setting_tab, "设置")
+        self.workspace_tabs.addTab(self.diagnostics_tab, "诊断")
+
+        # 分割比例
+        content_splitter.setSizes([400, 800])
+
+        # 全局样式
+        self.setStyleSheet("""
+            QPushButton {
+                border-radius: 10px;
+                padding: 5px 12px;
+                background: white;
+                color: black;
+                border: 1px solid rgba(255,255,255,0.1);
+            }
+            QPushButton:hover {
+                background-color: #f0f0f0;
+            }
+            QTextEdit, QPlainTextEdit {
+                border-radius: 10px;
+                border: 2px solid #CCCCCC;
+                padding: 5px;
+                background: white;
+            }
+            QTabWidget::pane {
+                border-radius: 12px;
+                border: 1px solid #AAAAAA;
+                margin: 5px;
+            }
+            QTreeView {
+                border-radius: 12px;
+                border: 1px solid #AAAAAA;
+                margin: 5px;
+                background: #FFFFFF;
+            }
+        """)
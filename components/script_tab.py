@@ -1,6 +1,10 @@
-from PySide6.QtWidgets import QListWidget, QListWidgetItem, QWidget, QVBoxLayout, QPushButton
-from PySide6.QtCore import Qt
-from core import SettingsManager, SignalBus
+from PySide6.QtWidgets import (QListWidget, QListWidgetItem, QWidget, QVBoxLayout, QPushButton,
+                               QTreeWidget, QTreeWidgetItem, QHeaderView, QMenu)
+from PySide6.QtCore import Qt, QTimer
+from core import PipelineRunner, SettingsManager, SignalBus
+from core.pipeline import parse_list
+from core.resource_usage import format_bytes
+from core.run_history import TREND_TOLERANCE, describe_trend
 
 signal_bus = SignalBus.get_instance()
 
@@ -9,14 +13,20 @@ class CommandsButtonWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.settings = SettingsManager.get_instance()
+        self.pipeline_runner = PipelineRunner.get_instance()
+        self._shown_pipeline = None
         self._init_ui()
-        signal_bus.settings_changed.connect(self._update_commands)
+        signal_bus.subscribe("setting_changed", self._on_setting_changed)
+        signal_bus.subscribe("run_recorded", self._update_trend)
+        self.pipeline_runner.pipeline_updated.connect(self._show_pipeline)
 
     def _init_ui(self):
         self.main_layout = QVBoxLayout(self)
         # 使用QListWidget替代原有布局
         self.commands_list = QListWidget()
         self.commands_list.itemClicked.connect(self._on_item_clicked)
+        self.commands_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.commands_list.customContextMenuRequested.connect(self._show_context_menu)
         self.commands_list.setStyleSheet("""
             QListWidget {
                 border: none;
@@ -32,6 +42,25 @@ class CommandsButtonWidget(QWidget):
         """)
         self.main_layout.addWidget(self.commands_list)
 
+        # 最近一次流水线的阶段状态与耗时
+        self.stages_tree = QTreeWidget()
+        self.stages_tree.setHeaderLabels(["阶段", "状态", "耗时"])
+        self.stages_tree.setRootIsDecorated(False)
+        self.stages_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.stages_tree.setMaximumHeight(160)
+        self.stages_tree.hide()
+        self.main_layout.addWidget(self.stages_tree)
+
+        self.resume_btn = QPushButton("▶ 从失败处继续")
+        self.resume_btn.clicked.connect(self._resume_pipeline)
+        self.resume_btn.hide()
+        self.main_layout.addWidget(self.resume_btn)
+
+        # 运行中定时刷新耗时
+        self.stage_timer = QTimer(self)
+        self.stage_timer.setInterval(500)
+        self.stage_timer.timeout.connect(lambda: self._show_pipeline(self._shown_pipeline))
+
         # 刷新按钮
         self.refresh_btn = QPushButton("🔄 刷新命令列表")
         self.refresh_btn.clicked.connect(self._update_commands)
@@ -41,14 +70,123 @@ class CommandsButtonWidget(QWidget):
 
     def _on_item_clicked(self, item):
         """列表项点击事件处理"""
-        command = item.data(Qt.UserRole)  # 从数据角色获取命令
-        signal_bus.execute_command.emit(command)
+        name = item.data(Qt.UserRole + 1)
+        # 按依赖关系运行（没有依赖时即单个阶段）
+        self.pipeline_runner.run(name)
+
+    def _show_context_menu(self, pos):
+        item = self.commands_list.itemAt(pos)
+        if item is None:
+            return
+        name = item.data(Qt.UserRole + 1)
+        menu = QMenu(self)
+        menu.addAction("运行").triggered.connect(lambda: self.pipeline_runner.run(name))
+        menu.addAction("忽略缓存运行").triggered.connect(lambda: self.pipeline_runner.run(name, force=True))
+        menu.exec(self.commands_list.mapToGlobal(pos))
+
+    def _resume_pipeline(self):
+        if self._shown_pipeline:
+            self.pipeline_runner.resume(self._shown_pipeline)
+
+    def _show_pipeline(self, target):
+        """展示流水线各阶段的状态与耗时"""
+        plan = self.pipeline_runner.plan(target)
+        if plan is None:
+            return
+        self._shown_pipeline = target
+        labels = {"pending": "等待", "running": "运行中", "done": "✔ 完成", "failed": "✖ 失败", "skipped": "↷ 跳过"}
+        self.stages_tree.clear()
+        for stage in plan.stages:
+            duration = plan.duration(stage)
+            row = QTreeWidgetItem([stage, labels[plan.state[stage]], "" if duration is None else f"{duration:.1f}s"])
+            self.stages_tree.addTopLevelItem(row)
+        self.stages_tree.show()
+        self.resume_btn.setVisible(plan.failed and not plan.running)
+        if plan.running:
+            self.stage_timer.start()
+        else:
+            self.stage_timer.stop()
 
     def _update_commands(self):
         """更新命令列表"""
         self.commands_list.clear()
         for name, cmd in self.settings.script_commands.items():
-            item = QListWidgetItem(f"⚡ {name}")
-            item.setData(Qt.UserRole, cmd)  # 将命令存储在数据角色中
-            item.setFlags(item.flags() | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            self.commands_list.addItem(item)
\ No newline at end of file
+            self.commands_list.addItem(self._create_item(name, cmd))
+
+    def _item_text(self, name):
+        depends = parse_list(self.settings.script_option(name, "depends"))
+        return f"⚡ {name}" + (f"  ← {', '.join(depends)}" if depends else "")
+
+    def _create_item(self, name, cmd):
+        item = QListWidgetItem(self._item_text(name))
+        item.setData(Qt.UserRole, cmd)  # 将命令存储在数据角色中
+        item.setData(Qt.UserRole + 1, name)
+        item.setData(Qt.UserRole + 2, item.text())
+        item.setFlags(item.flags() | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        self._show_trend(item)
+        return item
+
+    def _on_setting_changed(self, key, old, new):
+        if key in ("script_commands", "script_options"):
+            self._sync_commands()
+        elif key == "workspace":
+            # 其他工作区的流水线在后台继续运行，这里只展示当前工作区的
+            self._shown_pipeline = None
+            self.stage_timer.stop()
+            self.stages_tree.hide()
+            self.resume_btn.hide()
+            # 运行历史按博客根目录区分，切换后显示新工作区的耗时趋势
+            for row in range(self.commands_list.count()):
+                self._show_trend(self.commands_list.item(row))
+
+    def _sync_commands(self):
+        """只增删、更新有变化的列表项（不重复查询未变化脚本的运行历史），脚本顺序改变时才整体重建"""
+        commands = self.settings.script_commands
+        items = {}
+        for row in reversed(range(self.commands_list.count())):
+            item = self.commands_list.item(row)
+            if item.data(Qt.UserRole + 1) in commands:
+                items[item.data(Qt.UserRole + 1)] = item
+            else:
+                self.commands_list.takeItem(row)
+        for row, (name, cmd) in enumerate(commands.items()):
+            item = items.get(name)
+            if item is None:
+                self.commands_list.insertItem(row, self._create_item(name, cmd))
+                continue
+            text = self._item_text(name)
+            if item.data(Qt.UserRole) != cmd or item.data(Qt.UserRole + 2) != text:
+                item.setData(Qt.UserRole, cmd)
+                item.setData(Qt.UserRole + 2, text)
+                self._show_trend(item)
+        names = [self.commands_list.item(row).data(Qt.UserRole + 1) for row in range(self.commands_list.count())]
+        if names != list(commands):
+            self._update_commands()
+
+    def _update_trend(self, name):
+        """运行历史新增记录后刷新对应脚本的耗时趋势"""
+        for row in range(self.commands_list.count()):
+            item = self.commands_list.item(row)
+            if item.data(Qt.UserRole + 1) == name:
+                self._show_trend(item)
+
+    def _show_trend(self, item):
+        """在列表项后显示最近一次成功运行的耗时与变化，悬停显示详情"""
+        name = item.data(Qt.UserRole + 1)
+        trend = self.pipeline_runner.executor.history.trend(self.settings.blog_root, name)
+        text = item.data(Qt.UserRole + 2)
+        if trend is None:
+            item.setText(text)
+            item.setToolTip(item.data(Qt.UserRole))
+            return
+        last, change = trend["last"], trend["change"]
+        badge = f"{last['wall_time']:.0f}s"
+        if change is not None and abs(change) >= TREND_TOLERANCE:
+            badge += f" {'▲' if change > 0 else '▼'}{abs(change):.0%}"
+        item.setText(f"{text}    {badge}")
+        details = [describe_trend(name, trend)]
+        if last["cpu_time"] is not None:
+            details.append(f"CPU {last['cpu_time']:.1f} s，峰值内存 {format_bytes(last['peak_rss'] or 0)}")
+        if last["output_bytes"] is not None:
+            details.append(f"输出 {format_bytes(last['output_bytes'])}")
+        item.setToolTip("\n".join([item.data(Qt.UserRole)] + details))
\ No newline at end of file
@@ -0,0 +1,88 @@
+import os
+
+from PySide6.QtCore import QTimer, Qt, Signal
+from PySide6.QtWidgets import QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout, QWidget
+
+from core import PostIndex, SettingsManager, SignalBus
+
+signal_bus = SignalBus.get_instance()
+settings_manager = SettingsManager.get_instance()
+
+
+class PostSearchWidget(QWidget):
+    """文件树上方的全文搜索框，结果按相关度排序"""
+    post_activated = Signal(str)  # 选中结果的文件路径
+
+    def __init__(self):
+        super().__init__()
+        self.post_index = None
+        self._index_root = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 0)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("🔍 搜索文章标题、标签与正文")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self._schedule_search)
+        self.search_edit.returnPressed.connect(self._activate_first)
+        layout.addWidget(self.search_edit)
+
+        self.results_list = QListWidget()
+        self.results_list.setMaximumHeight(240)
+        self.results_list.itemActivated.connect(self._on_item_activated)
+        self.results_list.itemClicked.connect(self._on_item_activated)
+        self.results_list.hide()
+        layout.addWidget(self.results_list)
+
+        # 输入防抖，停止输入后再查询
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(120)
+        self.search_timer.timeout.connect(self._run_search)
+
+        signal_bus.subscribe("setting_changed", self._on_setting_changed)
+
+    def _ensure_index(self):
+        """按当前博客根目录打开只读查询用的数据库连接"""
+        if self.post_index is None or self._index_root != settings_manager.blog_root:
+            if self.post_index is not None:
+                self.post_index.close()
+            self._index_root = settings_manager.blog_root
+            self.post_index = PostIndex(self._index_root)
+        return self.post_index
+
+    def _on_setting_changed(self, key, old, new):
+        if key == "blog_root" and self._index_root != new:
+            self.search_edit.clear()
+
+    def _schedule_search(self, _text=""):
+        self.search_timer.start()
+
+    def _run_search(self):
+        query = self.search_edit.text().strip()
+        self.results_list.clear()
+        if not query:
+            self.results_list.hide()
+            return
+        results = self._ensure_index().search(query)
+        for meta in results:
+            label = meta.title if not meta.date else f"{meta.title}  ·  {meta.date[:10]}"
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, meta.path)
+            item.setToolTip(os.path.relpath(meta.path, self._index_root))
+            self.results_list.addItem(item)
+        if not results:
+            self.results_list.addItem(QListWidgetItem("没有找到相关文章"))
+        self.results_list.show()
+
+    def _activate_first(self):
+        self.search_timer.stop()
+        self._run_search()
+        if self.results_list.count():
+            self._on_item_activated(self.results_list.item(0))
+
+    def _on_item_activated(self, item):
+        path = item.data(Qt.UserRole)
+        if path:
+            self.post_activated.emit(path)
@@ -4,9 +4,11 @@ import os
 from PySide6.QtCore import QTimer, Qt
 from PySide6.QtWidgets import (QWidget, QFormLayout, QLineEdit, QPushButton,
                                QFileDialog, QTextEdit, QVBoxLayout, QScrollArea,
-                               QHBoxLayout, QLabel, QMessageBox, QListWidgetItem, QListWidget)
+                               QHBoxLayout, QLabel, QMessageBox, QListWidgetItem, QListWidget,
+                               QSpinBox, QCheckBox)
 
 from core import SettingsManager, SignalBus
+from core.pipeline import PipelineError, parse_list, resolve_pipeline
 
 signal_bus = SignalBus.get_instance()
 settings_manager = SettingsManager.get_instance()
@@ -15,6 +17,7 @@ class SettingTab(QWidget):
         super().__init__()
         self.settings = settings_manager
         self.init_ui()
+        signal_bus.subscribe("setting_changed", self._on_setting_changed)
 
     def init_ui(self):
         scroll = QScrollArea()
@@ -22,16 +25,17 @@ class SettingTab(QWidget):
         content = QWidget()
         layout = QFormLayout(content)
 
+        # 以下博客根目录、默认内容与脚本命令属于当前工作区
+        self.workspace_label = QLabel(self.settings.workspace)
+        layout.addRow("当前工作区：", self.workspace_label)
+
         # 博客根目录
         self.blog_root_edit = QLineEdit(self.settings.blog_root)
         browse_blog_btn = self.create_browse_button(
             self.blog_root_edit, directory=True)
+        self.browse_blog_btn = browse_blog_btn
         layout.addRow("博客根目录：", self.create_path_layout(
             self.blog_root_edit, browse_blog_btn))
-        if not os.path.exists(self.settings.blog_root):
-            QMessageBox.warning(self, "警告", "博客根目录未设置！")
-            browse_blog_btn.clicked.emit()
-
 
         # 编辑器路径
         self.editor_edit = QLineEdit(self.settings.editor_path)
@@ -45,9 +49,55 @@ class SettingTab(QWidget):
         self.content_edit.setText(self.settings.default_content)
         layout.addRow("默认内容模板：", self.content_edit)
 
+        # 控制台回滚
+        self.max_lines_spin = QSpinBox()
+        self.max_lines_spin.setRange(100, 10_000_000)
+        self.max_lines_spin.setSingleStep(1000)
+        self.max_lines_spin.setValue(self.settings.console_max_lines)
+        layout.addRow("控制台最大行数：", self.max_lines_spin)
+        self.spill_log_check = QCheckBox("超出的旧输出写入临时日志文件（退出时删除）")
+        self.spill_log_check.setChecked(self.settings.console_spill_log)
+        layout.addRow("", self.spill_log_check)
+        self.virtual_view_check = QCheckBox("使用虚拟列表显示控制台输出（适合几十万行以上，支持按类型过滤）")
+        self.virtual_view_check.setChecked(self.settings.console_virtual_view)
+        layout.addRow("", self.virtual_view_check)
+
+        # 界面卡顿检测
+        self.stall_spin = QSpinBox()
+        self.stall_spin.setRange(0, 60_000)
+        self.stall_spin.setSingleStep(100)
+        self.stall_spin.setSuffix(" ms")
+        self.stall_spin.setSpecialValueText("关闭")
+        self.stall_spin.setToolTip("界面超过该时长未响应时记录主线程调用栈（诊断标签页与配置目录下的 stalls.log）")
+        self.stall_spin.setValue(self.settings.stall_threshold_ms)
+        layout.addRow("界面卡顿阈值：", self.stall_spin)
+
+        # 运行日志
+        self.log_keep_spin = QSpinBox()
+        self.log_keep_spin.setRange(0, 10_000)
+        self.log_keep_spin.setSpecialValueText("不记录")
+        self.log_keep_spin.setSuffix(" 个")
+        self.log_keep_spin.setToolTip("每次运行的输出写入配置目录下的 logs/，超出数量（或总计 1 GB）时删除最旧的日志")
+        self.log_keep_spin.setValue(self.settings.run_log_keep)
+        layout.addRow("保留运行日志：", self.log_keep_spin)
+        self.log_compress_check = QCheckBox("使用 gzip 压缩运行日志")
+        self.log_compress_check.setChecked(self.settings.run_log_compress)
+        layout.addRow("", self.log_compress_check)
+
+        # 常驻内存的工作区索引
+        self.warm_spin = QSpinBox()
+        self.warm_spin.setRange(1, 20)
+        self.warm_spin.setSuffix(" 个")
+        self.warm_spin.setToolTip("最近使用的工作区保留文件树索引并持续监听文件变化，切换时无需重新扫描")
+        self.warm_spin.setValue(self.settings.warm_workspaces)
+        layout.addRow("常驻工作区索引：", self.warm_spin)
+        self.rewrite_links_check = QCheckBox("在文件树中移动或重命名后，更新其他文章中指向它们的链接")
+        self.rewrite_links_check.setChecked(self.settings.rewrite_links)
+        layout.addRow("", self.rewrite_links_check)
+
         # 脚本命令配置
         self.commands_widget = CommandsWidget(
-            self.settings.script_commands)
+            self.settings.script_commands, self.settings.script_options)
         layout.addRow("脚本命令：", self.commands_widget)
 
         # 保存按钮
@@ -62,6 +112,21 @@ class SettingTab(QWidget):
         main_layout = QVBoxLayout(self)
         main_layout.addWidget(scroll)
 
+    def prompt_blog_root(self):
+        """博客根目录不存在时提示并打开目录选择（由主窗口在显示后调用，避免构建时弹出模态框）"""
+        if not os.path.exists(self.settings.blog_root):
+            QMessageBox.warning(self, "警告", "博客根目录未设置！")
+            self.browse_blog_btn.clicked.emit()
+
+    def _on_setting_changed(self, key, old, new):
+        """切换工作区后显示该工作区的设置（未保存的修改丢弃）"""
+        if key != "workspace":
+            return
+        self.workspace_label.setText(new)
+        self.blog_root_edit.setText(self.settings.blog_root)
+        self.content_edit.setText(self.settings.default_content)
+        self.commands_widget.set_commands(self.settings.script_commands, self.settings.script_options)
+
     def reset_settings(self):
         confirm = QMessageBox.question(self, "确认重置", "将清除所有设置，是否继续？")
         if confirm == QMessageBox.Yes:
@@ -87,21 +152,42 @@ class SettingTab(QWidget):
             path, _ = QFileDialog.getOpenFileName(self, "选择文件", target_edit.text())
         if path:
             target_edit.setText(path)
-            self.save_settings()
+            # 只修改浏览的这一项，由防抖保存写入；其余未保存的编辑仍需点击保存
+            if target_edit is self.blog_root_edit:
+                self.settings.blog_root = path
+            else:
+                self.settings.editor_path = path
 
     def save_settings(self):
         self.settings.blog_root = self.blog_root_edit.text()
         self.settings.editor_path = self.editor_edit.text()
         self.settings.default_content = self.content_edit.toPlainText()
+        self.settings.console_max_lines = self.max_lines_spin.value()
+        self.settings.console_spill_log = self.spill_log_check.isChecked()
+        self.settings.console_virtual_view = self.virtual_view_check.isChecked()
+        self.settings.stall_threshold_ms = self.stall_spin.value()
+        self.settings.run_log_keep = self.log_keep_spin.value()
+        self.settings.run_log_compress = self.log_compress_check.isChecked()
+        self.settings.warm_workspaces = self.warm_spin.value()
+        self.settings.rewrite_links = self.rewrite_links_check.isChecked()
         try:
             # 获取有效命令（自动过滤空项）
             valid_commands = self.commands_widget.get_commands()
 
+            # 检查依赖是否存在以及是否有循环
+            options = self.commands_widget.get_options()
+            depends_map = {name: value.get("depends", []) for name, value in options.items()}
+            for name in valid_commands:
+                resolve_pipeline(name, depends_map, valid_commands)
+
             # 更新设置
             self.settings.script_commands = valid_commands
+            self.settings.script_options = options
             self.settings.save()
             QMessageBox.information(self, "成功", "配置已保存")
 
+        except PipelineError as e:
+            QMessageBox.warning(self, "依赖错误", str(e))
         except Exception as e:
             QMessageBox.critical(self, "错误", f"保存失败：{str(e)}")
 
@@ -109,12 +195,17 @@ class SettingTab(QWidget):
 class CommandsWidget(QWidget):
     # commands_updated = Signal(dict)  # 新增数据更新信号
 
-    def __init__(self, commands):
+    def __init__(self, commands, options=None):
         super().__init__()
-        self._command_map = commands.copy()
-        self._original_names = set(commands.keys())  # 用于名称冲突检测
         self._current_editing_item = None  # 跟踪正在编辑的项
         self.init_ui()
+        self.set_commands(commands, options)
+
+    def set_commands(self, commands, options=None):
+        """替换编辑中的命令与选项（切换工作区时调用）"""
+        self._command_map = commands.copy()
+        self._option_map = {name: dict(value) for name, value in (options or {}).items()}
+        self._original_names = set(commands.keys())  # 用于名称冲突检测
         self._load_commands()
 
     def init_ui(self):
@@ -150,7 +241,11 @@ class CommandsWidget(QWidget):
     def _create_item_widget(self, name, cmd):
         """创建项内容控件"""
         widget = QWidget()
-        layout = QHBoxLayout(widget)
+        rows = QVBoxLayout(widget)
+        layout = QHBoxLayout()
+        cache_layout = QHBoxLayout()
+        rows.addLayout(layout)
+        rows.addLayout(cache_layout)
 
         # 名称输入
         name_edit = QLineEdit(name)
@@ -162,6 +257,23 @@ class CommandsWidget(QWidget):
         cmd_edit.setPlaceholderText("执行命令")
         cmd_edit.textChanged.connect(lambda text: self._update_command(name, text))
 
+        # 依赖的脚本
+        depends = self._option_map.get(name, {}).get("depends", [])
+        depends_edit = QLineEdit(", ".join(depends) if isinstance(depends, list) else str(depends))
+        depends_edit.setPlaceholderText("依赖的脚本，逗号分隔")
+        depends_edit.textChanged.connect(lambda text: self._update_option(name, "depends", parse_list(text)))
+
+        # 独占执行
+        exclusive_check = QCheckBox("独占")
+        exclusive_check.setToolTip("独占脚本之间排队执行，适用于构建、部署等任务")
+        exclusive_check.setChecked(bool(self._option_map.get(name, {}).get("exclusive", False)))
+        exclusive_check.toggled.connect(lambda checked: self._update_option(name, "exclusive", checked))
+
+        # 构建缓存的输入文件与输出目录
+        inputs_edit = self._create_list_edit(name, "inputs", "输入文件 glob，逗号分隔，如 **/*.md, package.json")
+        outputs_edit = self._create_list_edit(name, "outputs", "输出目录 glob，如 public")
+        inputs_edit.setToolTip("输入文件内容未变化且输出完好时跳过执行，留空则不使用构建缓存")
+
         # 删除按钮
         del_btn = QPushButton("🗑️")
         del_btn.setCursor(Qt.PointingHandCursor)
@@ -171,9 +283,24 @@ class CommandsWidget(QWidget):
         layout.addWidget(name_edit)
         layout.addWidget(QLabel("命令："))
         layout.addWidget(cmd_edit)
+        layout.addWidget(QLabel("依赖："))
+        layout.addWidget(depends_edit)
+        layout.addWidget(exclusive_check)
         layout.addWidget(del_btn)
+        cache_layout.addWidget(QLabel("输入："))
+        cache_layout.addWidget(inputs_edit, 2)
+        cache_layout.addWidget(QLabel("输出："))
+        cache_layout.addWidget(outputs_edit, 1)
         return widget
 
+    def _create_list_edit(self, name, key, placeholder):
+        """编辑列表类型选项的输入框"""
+        value = self._option_map.get(name, {}).get(key, [])
+        edit = QLineEdit(", ".join(value) if isinstance(value, list) else str(value))
+        edit.setPlaceholderText(placeholder)
+        edit.textChanged.connect(lambda text: self._update_option(name, key, parse_list(text)))
+        return edit
+
     def _validate_name_change(self, editor, old_name):
         """验证名称修改"""
         new_name = editor.text().strip()
@@ -193,6 +320,8 @@ class CommandsWidget(QWidget):
         """更新命令名称"""
         # 更新数据
         self._command_map[new_name] = self._command_map.pop(old_name)
+        if old_name in self._option_map:
+            self._option_map[new_name] = self._option_map.pop(old_name)
 
         # 局部更新列表项
         for index in range(self.list_widget.count()):
@@ -211,6 +340,10 @@ class CommandsWidget(QWidget):
         self._command_map[name] = new_cmd
         # self.commands_updated.emit(self.get_commands())
 
+    def _update_option(self, name, key, value):
+        """更新脚本选项"""
+        self._option_map.setdefault(name, {})[key] = value
+
     def _add_command(self):
         """添加新命令"""
         base_name = "新命令"
@@ -238,12 +371,18 @@ class CommandsWidget(QWidget):
                     self.list_widget.takeItem(index)
                     break
             del self._command_map[name]
+            self._option_map.pop(name, None)
             # self.commands_updated.emit(self.get_commands())
 
     def get_commands(self):
         """获取有效命令"""
         return {k: v for k, v in self._command_map.items() if k.strip() and v.strip()}
 
+    def get_options(self):
+        """获取有效命令的选项"""
+        commands = self.get_commands()
+        return {k: v for k, v in self._option_map.items() if k in commands and v}
+
     def _handle_item_change(self, item):
         """处理项变化事件（用于未来扩展）"""
         pass
\ No newline at end of file
@@ -0,0 +1,70 @@
+from PySide6.QtWidgets import (QComboBox, QFileDialog, QHBoxLayout, QInputDialog, QLabel, QMessageBox,
+                               QPushButton, QWidget)
+
+from core import SettingsManager, SignalBus
+
+signal_bus = SignalBus.get_instance()
+settings_manager = SettingsManager.get_instance()
+
+
+class WorkspaceBar(QWidget):
+    """文件树上方的工作区切换：每个工作区有自己的博客根目录、脚本与默认内容"""
+
+    def __init__(self):
+        super().__init__()
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 0)
+        layout.addWidget(QLabel("工作区："))
+        self.combo = QComboBox()
+        self.combo.activated.connect(self._on_activated)
+        layout.addWidget(self.combo, 1)
+
+        add_btn = QPushButton("➕")
+        add_btn.setToolTip("新建工作区（复制当前工作区的脚本与默认内容）")
+        add_btn.setFixedWidth(32)
+        add_btn.clicked.connect(self._add_workspace)
+        layout.addWidget(add_btn)
+        self.remove_btn = QPushButton("🗑️")
+        self.remove_btn.setToolTip("删除当前工作区（不删除博客文件）")
+        self.remove_btn.setFixedWidth(32)
+        self.remove_btn.clicked.connect(self._remove_workspace)
+        layout.addWidget(self.remove_btn)
+
+        self._update_workspaces()
+        signal_bus.subscribe("setting_changed", self._on_setting_changed)
+
+    def _on_setting_changed(self, key, old, new):
+        if key in ("workspace", "workspaces"):
+            self._update_workspaces()
+        elif key == "blog_root":
+            self.combo.setToolTip(new)
+
+    def _update_workspaces(self):
+        self.combo.clear()
+        self.combo.addItems(settings_manager.workspace_names())
+        self.combo.setCurrentText(settings_manager.workspace)
+        self.combo.setToolTip(settings_manager.blog_root)
+        self.remove_btn.setEnabled(self.combo.count() > 1)
+
+    def _on_activated(self, index):
+        settings_manager.switch_workspace(self.combo.itemText(index))
+
+    def _add_workspace(self):
+        name, ok = QInputDialog.getText(self, "新建工作区", "工作区名称：")
+        if not ok or not name.strip():
+            return
+        root = QFileDialog.getExistingDirectory(self, "选择博客根目录")
+        if not root:
+            return
+        try:
+            settings_manager.add_workspace(name, root)
+        except ValueError as e:
+            QMessageBox.warning(self, "新建失败", str(e))
+            return
+        settings_manager.switch_workspace(name.strip())
+
+    def _remove_workspace(self):
+        name = settings_manager.workspace
+        confirm = QMessageBox.question(self, "确认删除", f"确定要删除工作区「{name}」吗？（不会删除博客文件）")
+        if confirm == QMessageBox.Yes:
+            settings_manager.remove_workspace(name)
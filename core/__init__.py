@@ -1,5 +1,64 @@
-from .settings_manager import SettingsManager
-from .markdown_filter_proxy import MarkdownFilterProxy
-from .command_executor import CommandExecutor
-from .signal_bus import SignalBus
-from .utils import decode
\ No newline at end of file
+# 按需导入：命令行等场景只加载用到的模块，不会间接导入 PySide6
+# 以下模块不导入 PySide6，命令行与流水线可以直接使用：ansi、build_cache、line_store、links、log_index、
+# markdown_index、pipeline、post_import、post_index、process_runner、profiler、resource_usage、run_history、
+# run_log、scan_cache、search_index、settings_store（仅首次迁移旧 QSettings 时加载）、template、utils
+import importlib
+
+_exports = {
+    "SettingsManager": ".settings_manager",
+    "SettingsStore": ".settings_store",
+    "load_settings": ".settings_store",
+    "MarkdownFilterProxy": ".markdown_filter_proxy",
+    "MarkdownIndexScanner": ".markdown_filter_proxy",
+    "PostIndexUpdater": ".post_workers",
+    "PostImporter": ".post_workers",
+    "import_posts": ".post_import",
+    "PostTemplate": ".template",
+    "compile_template": ".template",
+    "FileOperation": ".file_ops",
+    "FileOperationQueue": ".file_ops",
+    "plan_operations": ".file_ops",
+    "validate_filename": ".file_ops",
+    "LinkUpdater": ".links",
+    "RootIndex": ".workspace_index",
+    "RootIndexPool": ".workspace_index",
+    "MarkdownIndex": ".markdown_index",
+    "scan_markdown_dirs": ".markdown_index",
+    "FileChangeTracker": ".fs_watcher",
+    "ScanCache": ".scan_cache",
+    "PostIndex": ".post_index",
+    "PostMeta": ".post_index",
+    "CommandExecutor": ".command_executor",
+    "CommandProcess": ".process_runner",
+    "run_command": ".process_runner",
+    "run_plan": ".process_runner",
+    "PipelinePlan": ".pipeline",
+    "PipelineError": ".pipeline",
+    "PipelineRunner": ".pipeline_runner",
+    "BuildCache": ".build_cache",
+    "RunHistory": ".run_history",
+    "ResourceMonitor": ".resource_usage",
+    "resource_monitor": ".resource_usage",
+    "RunLogger": ".run_log",
+    "run_logger": ".run_log",
+    "LogFile": ".log_index",
+    "LineStore": ".line_store",
+    "AnsiParser": ".ansi",
+    "SignalBus": ".signal_bus",
+    "BusTracer": ".bus_trace",
+    "bus_tracer": ".bus_trace",
+    "StallDetector": ".stall_detector",
+    "decode": ".utils",
+    "StreamDecoder": ".utils",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
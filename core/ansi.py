@@ -0,0 +1,182 @@
+# 流式 ANSI 转义序列解析：把输出流一次扫描切分为带样式的片段，跨块截断的序列保留到下一块
+import re
+from collections import namedtuple
+
+# 前景色 / 背景色为 "#rrggbb" 或 None（使用默认颜色）
+Style = namedtuple("Style", "fg bg bold dim italic underline inverse")
+DEFAULT_STYLE = Style(None, None, False, False, False, False, False)
+
+# 16 色调色板（适合深色背景）
+BASIC_COLORS = (
+    "#000000", "#CD3131", "#0DBC79", "#E5E510", "#2472C8", "#BC3FBC", "#11A8CD", "#E5E5E5",
+    "#666666", "#F14C4C", "#23D18B", "#F5F543", "#3B8EEA", "#D670D6", "#29B8DB", "#FFFFFF",
+)
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+# xterm 256 色：16 色 + 6x6x6 色立方 + 24 级灰度
+PALETTE_256 = BASIC_COLORS + tuple(
+    f"#{_CUBE_LEVELS[i // 36]:02X}{_CUBE_LEVELS[i // 6 % 6]:02X}{_CUBE_LEVELS[i % 6]:02X}" for i in range(216)
+) + tuple(f"#{8 + 10 * i:02X}{8 + 10 * i:02X}{8 + 10 * i:02X}" for i in range(24))
+
+# 完整的转义序列：CSI（参数、中间字节、结尾字节）、OSC（以 BEL 或 ST 结尾）、其余双字节序列
+ESCAPE = re.compile(r"\x1b(?:\[([0-?]*)[ -/]*([@-~])|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\^_])")
+# 块末尾可能尚未接收完的序列
+_PARTIAL = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?)?")
+# 保留的未完成序列的最大长度，超出时视为无效序列丢弃
+MAX_PENDING = 4096
+# (当前样式, SGR 参数) -> 新样式 的缓存上限
+TRANSITION_CACHE_SIZE = 1024
+
+
+def _parse_color(codes, index):
+    """解析 38/48 之后的扩展颜色，返回 (颜色, 消耗的参数个数)"""
+    if index < len(codes) and codes[index] == 5 and index + 1 < len(codes):
+        return PALETTE_256[codes[index + 1] % 256], 2
+    if index < len(codes) and codes[index] == 2 and index + 3 < len(codes):
+        r, g, b = (min(max(value, 0), 255) for value in codes[index + 1:index + 4])
+        return f"#{r:02X}{g:02X}{b:02X}", 4
+    return None, len(codes) - index
+
+
+def apply_sgr(style, params):
+    """按 SGR 参数（如 "1;32"）计算新样式，无法识别的参数忽略"""
+    try:
+        codes = [int(code) if code else 0 for code in params.replace(":", ";").split(";")]
+    except ValueError:
+        return style
+    fg, bg, bold, dim, italic, underline, inverse = style
+    index = 0
+    while index < len(codes):
+        code = codes[index]
+        index += 1
+        if code == 0:
+            fg, bg, bold, dim, italic, underline, inverse = DEFAULT_STYLE
+        elif code == 1:
+            bold = True
+        elif code == 2:
+            dim = True
+        elif code == 3:
+            italic = True
+        elif code == 4:
+            underline = True
+        elif code == 7:
+            inverse = True
+        elif code == 22:
+            bold = dim = False
+        elif code == 23:
+            italic = False
+        elif code == 24:
+            underline = False
+        elif code == 27:
+            inverse = False
+        elif 30 <= code <= 37:
+            fg = BASIC_COLORS[code - 30]
+        elif 90 <= code <= 97:
+            fg = BASIC_COLORS[code - 82]
+        elif code == 39:
+            fg = None
+        elif 40 <= code <= 47:
+            bg = BASIC_COLORS[code - 40]
+        elif 100 <= code <= 107:
+            bg = BASIC_COLORS[code - 92]
+        elif code == 49:
+            bg = None
+        elif code in (38, 48):
+            color, used = _parse_color(codes, index)
+            index += used
+            if code == 38:
+                fg = color
+            else:
+                bg = color
+    style = Style(fg, bg, bold, dim, italic, underline, inverse)
+    # 恢复默认时返回同一个对象，调用方可用 is 判断
+    return DEFAULT_STYLE if style == DEFAULT_STYLE else style
+
+
+class AnsiParser:
+    """
+    单个输出流的增量解析器，与 StreamDecoder 一样每个流一个实例
+    feed() 一次扫描把输出切分为 [(文本, Style)]，相邻的同样式文本合并；只保留 SGR 样式，其余控制序列丢弃，
+    块末尾不完整的序列留到下一次 feed 再解析
+    """
+
+    # 所有解析器共享的样式转换缓存，常见的颜色切换只需一次字典查找
+    _transitions = {}
+
+    def __init__(self):
+        self.style = DEFAULT_STYLE
+        self._pending = ""
+
+    def feed(self, text):
+        if self._pending:
+            text = self._pending + text
+            self._pending = ""
+        if "\x1b" not in text:
+            return [(text, self.style)] if text else []
+
+        # split 在 C 中完成切分：[文本, 参数, 结尾字节, 文本, 参数, 结尾字节, ..., 文本]
+        pieces = ESCAPE.split(text)
+        last = pieces[-1]
+        tail = last.find("\x1b")
+        while tail >= 0 and not _PARTIAL.fullmatch(last, tail):
+            # 无法识别的 ESC 原样当作文本
+            tail = last.find("\x1b", tail + 1)
+        if tail >= 0:
+            if len(last) - tail <= MAX_PENDING:
+                self._pending = last[tail:]
+            pieces[-1] = last[:tail]
+
+        transitions = self._transitions
+        style = self.style
+        segments = []
+        texts = []
+        segment_style = style
+        for index in range(0, len(pieces), 3):
+            if index and pieces[index - 1] == "m":
+                key = (style, pieces[index - 2])
+                new_style = transitions.get(key)
+                if new_style is None:
+                    if len(transitions) >= TRANSITION_CACHE_SIZE:
+                        transitions.clear()
+                    new_style = transitions[key] = apply_sgr(style, pieces[index - 2])
+                style = new_style
+            piece = pieces[index]
+            if not piece:
+                continue
+            if style is not segment_style and texts:
+                segments.append(("".join(texts), segment_style))
+                texts = []
+            segment_style = style
+            texts.append(piece)
+        if texts:
+            segments.append(("".join(texts), segment_style))
+        self.style = style
+        return segments
+
+    def flush(self):
+        """流结束时丢弃残留的不完整序列并恢复默认样式"""
+        self._pending = ""
+        self.style = DEFAULT_STYLE
+
+
+def is_plain(segments):
+    """全部为默认样式"""
+    return all(style is DEFAULT_STYLE for _, style in segments)
+
+
+def line_styles(segments):
+    """
+    按行切分 feed() 的结果，返回每行的样式片段：整行为默认样式时为 None，否则为 ((长度, Style), ...)
+    行的划分与 "".join(文本).split("\\n") 一致
+    """
+    styles = []
+    runs = []
+    for text, style in segments:
+        parts = text.split("\n")
+        for index, part in enumerate(parts):
+            if index:
+                styles.append(tuple(runs) if any(s is not DEFAULT_STYLE for _, s in runs) else None)
+                runs = []
+            if part:
+                runs.append((len(part), style))
+    styles.append(tuple(runs) if any(s is not DEFAULT_STYLE for _, s in runs) else None)
+    return styles
@@ -0,0 +1,215 @@
+# 构建缓存,对脚本声明的输入文件计算内容指纹,未变化且输出完好时跳过构建
+import hashlib
+import json
+import os
+import re
+import threading
+
+from .utils import normalize_path, user_config_dir
+
+CACHE_VERSION = 1
+# 计算指纹时始终跳过的目录
+SKIP_DIRS = {"node_modules", ".git", "__pycache__"}
+# 构建工具自己的临时目录，不计入输入
+SKIP_GLOBS = ["**/.vitepress/cache", "**/.vitepress/.temp", "db.json"]
+
+_lock = threading.Lock()
+
+
+def compile_globs(patterns):
+    """将 glob 列表编译为一个正则，支持 **（跨目录）、*、?，路径分隔符统一为 /"""
+    parts = []
+    for pattern in patterns:
+        pattern = pattern.replace("\\", "/").lstrip("/")
+        regex = ""
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                regex += "(?:.*/)?"
+                i += 3
+            elif pattern.startswith("**", i):
+                regex += ".*"
+                i += 2
+            elif pattern[i] == "*":
+                regex += "[^/]*"
+                i += 1
+            elif pattern[i] == "?":
+                regex += "[^/]"
+                i += 1
+            else:
+                regex += re.escape(pattern[i])
+                i += 1
+        parts.append(regex)
+    if not parts:
+        return None
+    return re.compile("(?:" + "|".join(parts) + r")\Z", re.IGNORECASE if os.name == "nt" else 0)
+
+
+def _normalize_globs(patterns):
+    return sorted({pattern.replace("\\", "/").lstrip("/") for pattern in patterns})
+
+
+def _walk_files(root, skip):
+    """迭代列出根目录下所有文件的 (相对路径, stat)，相对路径使用 /"""
+    stack = [""]
+    while stack:
+        relative = stack.pop()
+        directory = os.path.join(root, relative) if relative else root
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    child = f"{relative}/{entry.name}" if relative else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS and not (skip and skip.match(child)):
+                                stack.append(child)
+                        elif entry.is_file():
+                            yield child, entry.stat()
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """
+    按博客根目录保存：
+    - hashes: 文件相对路径 -> (mtime_ns, size, sha1)，stat 未变化时复用哈希
+    - scripts: 脚本名称 -> 上次成功运行时的输入指纹与输出签名
+    指纹同时包含命令与 inputs/outputs 声明，修改命令或 glob 后不会命中旧的记录
+    """
+
+    def __init__(self, root_path, cache_dir=None):
+        self.root = os.path.normpath(root_path)
+        cache_dir = cache_dir or os.path.join(user_config_dir(), "build_cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        key = hashlib.sha1(normalize_path(root_path).encode("utf-8")).hexdigest()
+        self.path = os.path.join(cache_dir, f"{key}.json")
+        self.hashes = {}
+        self.scripts = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.hashes = {path: tuple(value) for path, value in data.get("hashes", {}).items()}
+            self.scripts = data.get("scripts", {})
+
+    def save(self):
+        data = {"version": CACHE_VERSION, "hashes": self.hashes, "scripts": self.scripts}
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+    def fingerprint(self, inputs, outputs=(), command=""):
+        """计算命令、输入输出声明与输入文件内容的指纹（输出目录的内容不计入）"""
+        match = compile_globs(inputs)
+        if match is None:
+            return None
+        skip = compile_globs(list(outputs) + SKIP_GLOBS)
+        digest = hashlib.sha1()
+        spec = [command.strip(), _normalize_globs(inputs), _normalize_globs(outputs)]
+        digest.update(json.dumps(spec, ensure_ascii=False).encode("utf-8") + b"\n")
+        hashes = {}
+        seen = set()
+        for relative, stat in sorted(_walk_files(self.root, skip)):
+            seen.add(relative)
+            if not match.match(relative):
+                continue
+            cached = self.hashes.get(relative)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                file_hash = cached[2]
+            else:
+                try:
+                    file_hash = _hash_file(os.path.join(self.root, relative))
+                except OSError:
+                    continue
+            hashes[relative] = (stat.st_mtime_ns, stat.st_size, file_hash)
+            digest.update(f"{relative}\0{file_hash}\n".encode("utf-8"))
+        # 丢弃已不存在的文件，缓存不会无限增长
+        self.hashes = {path: value for path, value in self.hashes.items() if path in seen}
+        self.hashes.update(hashes)
+        return digest.hexdigest()
+
+    def output_signature(self, outputs):
+        """输出目录的 stat 签名（文件数、总大小、最新 mtime），输出缺失时返回 None"""
+        match = compile_globs(outputs)
+        if match is None:
+            return None
+        count = size = latest = 0
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            try:
+                entries = list(os.scandir(os.path.join(self.root, relative) if relative else self.root))
+            except OSError:
+                continue
+            for entry in entries:
+                child = f"{relative}/{entry.name}" if relative else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if match.match(child):
+                        files = _walk_files(entry.path, None) if is_dir else [(child, entry.stat())]
+                        for _, stat in files:
+                            count += 1
+                            size += stat.st_size
+                            latest = max(latest, stat.st_mtime_ns)
+                    elif is_dir and entry.name not in SKIP_DIRS:
+                        stack.append(child)
+                except OSError:
+                    continue
+        if not count:
+            return None
+        return [count, size, latest]
+
+    def check(self, name, inputs, outputs, command=""):
+        """返回 (是否命中, 当前指纹)"""
+        fingerprint = self.fingerprint(inputs, outputs, command)
+        record = self.scripts.get(name)
+        hit = (fingerprint is not None and record is not None
+               and record.get("fingerprint") == fingerprint
+               and (not outputs or record.get("outputs") == self.output_signature(outputs)))
+        return hit, fingerprint
+
+    def record(self, name, fingerprint, outputs):
+        """记录一次成功运行"""
+        self.scripts[name] = {"fingerprint": fingerprint, "outputs": self.output_signature(outputs) if outputs else None}
+
+
+def check_build_cache(root_path, name, inputs, outputs, command=""):
+    """
+    线程安全地检查缓存并保存复用的文件哈希，缓存不可用时视为未命中
+    返回的指纹已包含 command，成功运行后原样传给 record_build
+    """
+    with _lock:
+        try:
+            cache = BuildCache(root_path)
+            result = cache.check(name, inputs, outputs, command)
+            cache.save()
+        except OSError:
+            return False, None
+        return result
+
+
+def record_build(root_path, name, fingerprint, outputs):
+    """记录一次成功运行，写入失败只影响下次是否命中"""
+    with _lock:
+        try:
+            cache = BuildCache(root_path)
+            cache.record(name, fingerprint, outputs)
+            cache.save()
+        except OSError:
+            pass
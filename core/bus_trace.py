@@ -0,0 +1,278 @@
+# SignalBus 追踪：统计各信号的发出次数与各槽函数的执行耗时,可导出 JSON 与 Chrome Trace
+import inspect
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from functools import partial
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+# 设置该环境变量时启动即开启追踪
+TRACE_ENV = "SBA_TRACE_BUS"
+# 耗时直方图的桶上限（微秒），最后一个桶收集更慢的调用
+BUCKETS_US = (10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000)
+# 保留的最近事件数，用于导出 Chrome Trace
+MAX_EVENTS = 200_000
+
+
+def slot_name(slot):
+    func = getattr(slot, "__func__", slot)
+    name = getattr(func, "__qualname__", None) or repr(slot)
+    return f"{getattr(func, '__module__', None) or ''}.{name}".lstrip(".")
+
+
+def _positional_limit(slot):
+    """槽函数最多接受的位置参数个数，None 表示不限（与 Qt 一样丢弃多余的信号参数）"""
+    try:
+        parameters = inspect.signature(slot).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+        return None
+    return sum(1 for p in parameters if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD))
+
+
+def weak_slot(slot):
+    """返回取回槽函数的可调用对象；绑定方法只保留接收者的弱引用，接收者销毁后返回 None"""
+    owner = getattr(slot, "__self__", None)
+    if owner is None or inspect.ismodule(owner):
+        return lambda: slot
+    if inspect.ismethod(slot):
+        return weakref.WeakMethod(slot)
+    # Qt 封装的内置方法（如 QStatusBar.showMessage）
+    ref, name = weakref.ref(owner), slot.__name__
+    return lambda: getattr(ref(), name, None)
+
+
+class SlotStats:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_US) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        micros = seconds * 1_000_000
+        for i, limit in enumerate(BUCKETS_US):
+            if micros < limit:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_us": round(self.total / self.count * 1_000_000, 1) if self.count else 0,
+            "max_us": round(self.max * 1_000_000, 1),
+            "histogram_us": {f"<{limit}": n for limit, n in zip(BUCKETS_US, self.buckets)} | {
+                f">={BUCKETS_US[-1]}": self.buckets[-1]},
+        }
+
+
+class TracedSlot(QObject):
+    """
+    计时包装。以槽函数所属的 QObject 为父对象：
+    与接收者处于同一线程（跨线程时仍按队列连接执行），接收者销毁时随之销毁并自动断开
+    """
+
+    def __init__(self, tracer, signal, slot):
+        owner = getattr(slot, "__self__", None)
+        if not isinstance(owner, QObject):
+            super().__init__()
+        elif owner.thread() is QThread.currentThread():
+            super().__init__(owner)
+        else:
+            super().__init__()
+            self.moveToThread(owner.thread())
+        self.tracer = tracer
+        self.signal = signal
+        self._slot = weak_slot(slot)
+        self.name = slot_name(slot)
+        self.limit = _positional_limit(slot)
+
+    def invoke(self, *args):
+        if self.limit is not None:
+            args = args[:self.limit]
+        slot = self._slot()
+        if slot is None:
+            return None
+        start = time.perf_counter()
+        try:
+            return slot(*args)
+        finally:
+            self.tracer.record_slot(self.signal, self.name, start, time.perf_counter() - start)
+
+
+class Subscription:
+    """一次总线订阅；追踪开关切换时在直接连接与计时包装之间重新连接"""
+
+    def __init__(self, bus, signal, slot):
+        self.bus = bus
+        self.signal = signal
+        # 绑定方法只保留弱引用，与 Qt 直接连接一样不延长接收者的生命周期
+        self._slot = weak_slot(slot)
+        self.target = None
+
+    @property
+    def slot(self):
+        return self._slot()
+
+    def connect(self, tracer):
+        slot = self.slot
+        if slot is None:
+            return
+        if tracer.enabled:
+            traced = TracedSlot(tracer, self.signal, slot)
+            self.target = traced
+            getattr(self.bus, self.signal).connect(traced.invoke)
+        else:
+            self.target = False
+            getattr(self.bus, self.signal).connect(slot)
+
+    def disconnect(self):
+        if self.target is None:
+            return
+        traced = self.target
+        self.target = None
+        # 直接连接断开时重新取绑定方法；接收者已销毁时 Qt 已自动断开
+        target = traced.invoke if traced is not False else self.slot
+        if target is not None:
+            try:
+                getattr(self.bus, self.signal).disconnect(target)
+            except (RuntimeError, TypeError):
+                pass
+        if traced is not False:
+            traced.setParent(None)
+            traced.deleteLater()
+
+
+class BusTracer:
+    """
+    总线追踪器（全局唯一 bus_tracer）
+    关闭时订阅直接连接到槽函数，没有额外开销；开启时每个槽经过计时包装，并额外连接计数槽统计发出次数
+    """
+
+    def __init__(self):
+        self.bus = None
+        self.enabled = False
+        self.subscriptions = []
+        self.lock = threading.Lock()
+        self._counters = []
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started_at = time.perf_counter()
+            self.emissions = {}
+            self.slots = {}  # (signal, slot) -> SlotStats
+            self.events = deque(maxlen=MAX_EVENTS)  # (signal, slot, start, duration, thread)
+
+    @staticmethod
+    def signal_names(bus):
+        return [name for name, value in vars(type(bus)).items() if isinstance(value, Signal)]
+
+    def attach(self, bus):
+        """由 SignalBus 初始化时调用；设置了 SBA_TRACE_BUS 时立即开启"""
+        if self.bus is bus:
+            return
+        self.bus = bus
+        if self.enabled or os.environ.get(TRACE_ENV):
+            self.enabled = False
+            self.set_enabled(True)
+
+    def subscribe(self, bus, signal, slot):
+        self.attach(bus)
+        subscription = Subscription(bus, signal, slot)
+        subscription.connect(self)
+        self.subscriptions.append(subscription)
+        owner = getattr(slot, "__self__", None)
+        if isinstance(owner, QObject):
+            # 接收者销毁后 Qt 已自动断开，这里只需移除记录
+            owner.destroyed.connect(partial(self._forget, subscription))
+        return subscription
+
+    def _forget(self, subscription, *_):
+        subscription.target = None
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def set_enabled(self, enabled):
+        """切换追踪；按原顺序重新连接所有订阅，保证槽函数的调用顺序不变"""
+        if enabled == self.enabled or self.bus is None:
+            self.enabled = enabled
+            return
+        for subscription in self.subscriptions:
+            subscription.disconnect()
+        for signal, counter in self._counters:
+            getattr(self.bus, signal).disconnect(counter)
+        self._counters = []
+        self.enabled = enabled
+        if enabled:
+            self.reset()
+            for signal in self.signal_names(self.bus):
+                counter = partial(self.record_emission, signal)
+                getattr(self.bus, signal).connect(counter)
+                self._counters.append((signal, counter))
+        self.subscriptions = [subscription for subscription in self.subscriptions if subscription.slot is not None]
+        for subscription in self.subscriptions:
+            subscription.connect(self)
+
+    def record_emission(self, signal, *_):
+        with self.lock:
+            self.emissions[signal] = self.emissions.get(signal, 0) + 1
+            self.events.append((signal, None, time.perf_counter(), None, threading.get_ident()))
+
+    def record_slot(self, signal, name, start, duration):
+        with self.lock:
+            stats = self.slots.get((signal, name))
+            if stats is None:
+                stats = self.slots[(signal, name)] = SlotStats()
+            stats.add(duration)
+            self.events.append((signal, name, start, duration, threading.get_ident()))
+
+    def snapshot(self):
+        """当前统计：各信号的发出次数、每秒次数与各槽函数的耗时分布"""
+        with self.lock:
+            elapsed = max(time.perf_counter() - self.started_at, 1e-9)
+            signals = {}
+            for signal, count in self.emissions.items():
+                signals[signal] = {"emissions": count, "per_sec": round(count / elapsed, 2), "slots": {}}
+            for (signal, name), stats in self.slots.items():
+                signals.setdefault(signal, {"emissions": 0, "per_sec": 0.0, "slots": {}})["slots"][name] = stats.to_dict()
+        return {"enabled": self.enabled, "elapsed_s": round(elapsed, 3), "signals": signals}
+
+    def chrome_trace(self):
+        """Chrome Trace 事件格式（chrome://tracing、Perfetto 可直接打开）"""
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+            origin = self.started_at
+        trace = []
+        for signal, name, start, duration, thread in events:
+            event = {"cat": signal, "pid": pid, "tid": thread, "ts": round((start - origin) * 1_000_000, 3)}
+            if name is None:
+                event.update(name=f"emit {signal}", ph="i", s="t")
+            else:
+                event.update(name=name, ph="X", dur=round(duration * 1_000_000, 3))
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def export_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+bus_tracer = BusTracer()
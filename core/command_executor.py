@@ -1,38 +1,134 @@
 import sys
+import time
+from collections import deque
+from itertools import count
+
 from PySide6.QtCore import QObject, Signal, QProcess,QProcessEnvironment
-from  .utils import decode
+from  .utils import StreamDecoder
+from .process_runner import shell_command
+from .resource_usage import format_usage, resource_monitor
+from .run_history import RunHistory
+from .run_log import run_logger
 from .signal_bus import SignalBus
 from .settings_manager import SettingsManager
 signal_bus = SignalBus.get_instance()
 settings_manager = SettingsManager.get_instance()
+
+# 保留日志路径的任务数
+MAX_LOG_PATHS = 200
+
+
+class Job:
+    """一次命令执行：独立的进程、解码器与输出通道（job_id）"""
+
+    def __init__(self, job_id, command, name="", exclusive=False, cwd="", workspace=""):
+        self.job_id = job_id
+        self.command = command
+        self.name = name or command
+        self.exclusive = exclusive
+        # 提交时所在工作区的根目录，排队的任务在切换工作区后启动也不受影响
+        self.cwd = cwd
+        self.workspace = workspace
+        self.state = "queued"  # queued / running / finished
+        self.process = None
+        self.exit_code = None
+        self.started_at = None
+        self.finished_at = None
+        self.usage = None  # ResourceUsage，进程启动后开始采样
+        self.output_bytes = 0
+        self.log = None  # RunLog，输出同时写入日志文件
+        # 每个输出流独立的增量解码器，编码只检测一次
+        self.stdout_decoder = StreamDecoder()
+        self.stderr_decoder = StreamDecoder()
+
+    @property
+    def label(self):
+        return f"#{self.job_id} [{self.workspace}] {self.name}" if self.workspace else f"#{self.job_id} {self.name}"
+
+
 class CommandExecutor(QObject):
+    """
+    并发执行命令的任务引擎
+    - 普通任务立即启动，可同时运行多个
+    - 独占任务（exclusive）之间按 FIFO 排队，同一时刻只运行一个
+    每个任务的输出通过 output_received 的 job_id 区分，并写入各自的运行日志
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """静态方法获取单例实例"""
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
         super().__init__()
-        self.current_process = None
-        signal_bus.execute_command.connect(self.execute)
-        signal_bus.stop_command.connect(self.stop_current_process)
+        self._ids = count(1)
+        self.jobs = {}
+        self.exclusive_queue = deque()
+        self.exclusive_job = None
+        self.history = RunHistory()
+        # job_id -> 日志路径，任务结束后仍可从终端打开
+        self.log_paths = {}
+        self._configure_logs()
+        signal_bus.subscribe("setting_changed", self._on_setting_changed)
+        signal_bus.subscribe("execute_command", self.execute)
+        signal_bus.subscribe("stop_command", self.stop)
+
+    def _configure_logs(self):
+        run_logger.configure(settings_manager.run_log_keep, settings_manager.run_log_compress)
+
+    def _on_setting_changed(self, key, old, new):
+        if key in ("run_log_keep", "run_log_compress"):
+            self._configure_logs()
+
+    def log_path(self, job_id):
+        return self.log_paths.get(job_id)
 
     def execute(self, command):
-        if self.current_process and self.current_process.state() == QProcess.Running:
-            signal_bus.output_received.emit("已有命令正在运行", "error")
-            return
+        """执行系统命令（控制台与脚本按钮的入口）"""
+        self.submit(command)
 
-        self.current_process = QProcess()
-        """执行系统命令"""
-        if self.current_process and self.current_process.state() == QProcess.Running:
-            signal_bus.output_received.emit("已有命令正在运行", "error")
-            return
+    def submit(self, command, name="", exclusive=False, cwd=None, workspace=None):
+        """提交任务，返回 job_id；cwd 与 workspace 默认为当前工作区"""
+        if workspace is None:
+            # 只有一个工作区时标签中不显示工作区名称
+            workspace = settings_manager.workspace if len(settings_manager.workspace_names()) > 1 else ""
+        job = Job(str(next(self._ids)), command, name, exclusive, cwd or settings_manager.blog_root, workspace)
+        self.jobs[job.job_id] = job
+        job.log = run_logger.open(job.name, command)
+        if job.log is not None:
+            self.log_paths[job.job_id] = job.log.path
+            while len(self.log_paths) > MAX_LOG_PATHS:
+                del self.log_paths[next(iter(self.log_paths))]
+        signal_bus.job_started.emit(job.job_id, job.label)
+        signal_bus.output_received.emit(f"> {command}", "input", job.job_id)
+        if exclusive and self.exclusive_job is not None:
+            self.exclusive_queue.append(job)
+            signal_bus.output_received.emit(
+                f"[已加入队列，等待 {self.exclusive_job.label} 完成]", "system", job.job_id)
+        else:
+            self._start(job)
+        return job.job_id
 
-        signal_bus.output_received.emit(f"> {command}", "input")
-        signal_bus.message_sent.emit("Running")
+    def running_jobs(self):
+        return [job for job in self.jobs.values() if job.state == "running"]
 
-        self.current_process = QProcess()
+    def _start(self, job):
+        if job.exclusive:
+            self.exclusive_job = job
+        job.state = "running"
+        job.started_at = time.time()
+        process = job.process = QProcess()
 
-        self.current_process.readyReadStandardOutput.connect(self._handle_stdout)
-        self.current_process.readyReadStandardError.connect(self._handle_stderr)
-        self.current_process.finished.connect(self._handle_process_finished)
+        process.readyReadStandardOutput.connect(lambda: self._handle_stdout(job))
+        process.readyReadStandardError.connect(lambda: self._handle_stderr(job))
+        process.started.connect(lambda: self._handle_started(job))
+        process.finished.connect(lambda *_: self._handle_process_finished(job))
+        process.errorOccurred.connect(lambda error: self._handle_error(job, error))
 
-        self.current_process.setWorkingDirectory(settings_manager.blog_root)
+        process.setWorkingDirectory(job.cwd)
 
         # 继承系统环境变量
         env = QProcessEnvironment.systemEnvironment()
@@ -40,45 +136,121 @@ class CommandExecutor(QObject):
         if sys.platform == "win32":
             env.insert("PYTHONIOENCODING", "utf-8")
             env.insert("PYTHONUTF8", "1")
-        self.current_process.setProcessEnvironment(env)
+        process.setProcessEnvironment(env)
         # 根据系统设置shell
-        if sys.platform == "win32":
-            self.current_process.setProgram("cmd")
-            self.current_process.setArguments(["/c", command])
-        else:
-            self.current_process.setProgram("bash")
-            self.current_process.setArguments(["-c", command])
-        self.current_process.start()
-    def _handle_stdout(self):
+        program, *arguments = shell_command(job.command)
+        process.setProgram(program)
+        process.setArguments(arguments)
+        process.start()
+        self._update_status()
+
+    def _handle_started(self, job):
+        """开始统计进程及其子进程的 CPU 时间与内存"""
+        job.usage = resource_monitor.track(job.process.processId())
+
+    def _handle_stdout(self, job):
         """处理标准输出"""
-        raw_data = self.current_process.readAllStandardOutput().data()
-        signal_bus.output_received.emit(decode(raw_data), "output")
+        raw_data = job.process.readAllStandardOutput().data()
+        job.output_bytes += len(raw_data)
+        text = job.stdout_decoder.decode(raw_data)
+        if text:
+            run_logger.write(job.log, text)
+            signal_bus.output_received.emit(text, "output", job.job_id)
 
-    def _handle_stderr(self):
+    def _handle_stderr(self, job):
         """处理标准错误输出"""
-        raw_data = self.current_process.readAllStandardError().data()
-        signal_bus.output_received.emit(decode(raw_data), "error")
-    def _handle_process_finished(self):
+        raw_data = job.process.readAllStandardError().data()
+        job.output_bytes += len(raw_data)
+        text = job.stderr_decoder.decode(raw_data)
+        if text:
+            run_logger.write(job.log, text)
+            signal_bus.output_received.emit(text, "error", job.job_id)
+
+    def _handle_error(self, job, error):
+        """进程无法启动时也按结束处理，避免独占队列卡住"""
+        if error == QProcess.FailedToStart:
+            message = f"无法启动命令：{job.process.errorString()}"
+            run_logger.write(job.log, message + "\n")
+            signal_bus.output_received.emit(message, "error", job.job_id)
+            self._handle_process_finished(job)
+
+    def _handle_process_finished(self, job):
         """命令执行完成处理"""
-        signal_bus.output_received.emit(f"\n[进程结束，退出码 {self.current_process.exitCode()}]", "system")
-        signal_bus.message_sent.emit("就绪")
-        self.current_process = None
-
-    def stop_current_process(self):
-        """终止当前运行的进程及其子进程"""
-        pid = self.current_process.processId()
-        if self.current_process is not None and self.current_process.state() == QProcess.Running:
-            if sys.platform == "win32":
-                # Windows下终止整个进程树
-                self.current_process.kill()
-                pid = self.current_process.processId()
-                signal_bus.output_received.emit("进程树已强制终止", "error")
-            else:
-                # Unix系系统终止进程组
-                self.current_process.terminate()
-                self.current_process.waitForFinished(500)
-                if self.current_process.state() == QProcess.Running:
-                    self.current_process.kill()
-            self.current_process.waitForFinished()
+        if job.state == "finished":
+            return
+        for decoder, msg_type in ((job.stdout_decoder, "output"), (job.stderr_decoder, "error")):
+            rest = decoder.flush()
+            if rest:
+                run_logger.write(job.log, rest)
+                signal_bus.output_received.emit(rest, msg_type, job.job_id)
+        job.state = "finished"
+        job.finished_at = time.time()
+        job.exit_code = job.process.exitCode() if job.process.exitStatus() == QProcess.NormalExit else -1
+        summary = ""
+        if job.usage is not None:
+            resource_monitor.untrack(job.usage)
+            summary = f"，{format_usage(job.usage, job.output_bytes)}"
+            self.history.record(job.cwd, job.name, job.command, job.usage, job.exit_code, job.output_bytes)
+        run_logger.close(job.log, f"\n# 进程结束，退出码 {job.exit_code}{summary}\n")
+        signal_bus.output_received.emit(f"\n[进程结束，退出码 {job.exit_code}{summary}]", "system", job.job_id)
+        signal_bus.process_finished.emit(job.job_id, job.exit_code)
+        if job.usage is not None:
+            signal_bus.run_recorded.emit(job.name)
+        job.process.deleteLater()
+        job.process = None
+        del self.jobs[job.job_id]
+        if job is self.exclusive_job:
+            self.exclusive_job = None
+            if self.exclusive_queue:
+                self._start(self.exclusive_queue.popleft())
+        self._update_status()
+
+    def _update_status(self):
+        running = self.running_jobs()
+        if not running:
+            signal_bus.message_sent.emit("就绪")
+        elif len(running) == 1:
+            signal_bus.message_sent.emit(f"Running {running[0].label}")
+        else:
+            queued = f"，{len(self.exclusive_queue)} 个排队" if self.exclusive_queue else ""
+            signal_bus.message_sent.emit(f"Running {len(running)} 个任务{queued}")
+
+    def stop(self, job_id=""):
+        """终止指定任务；job_id 为空时终止全部任务并清空队列"""
+        if not job_id:
+            if not self.jobs:
+                signal_bus.output_received.emit("没有正在运行的进程", "info", "")
+                return
+            for job in list(self.exclusive_queue):
+                self.stop(job.job_id)
+            for job in self.running_jobs():
+                self.stop(job.job_id)
+            return
+        job = self.jobs.get(job_id)
+        if job is None:
+            signal_bus.output_received.emit("没有正在运行的进程", "info", job_id)
+            return
+        if job.state == "queued":
+            self.exclusive_queue.remove(job)
+            del self.jobs[job_id]
+            run_logger.close(job.log, "# 已从队列中移除\n")
+            signal_bus.output_received.emit("[已从队列中移除]", "system", job_id)
+            signal_bus.process_finished.emit(job_id, -1)
+            return
+        self._stop_process(job)
+
+    def _stop_process(self, job):
+        """终止任务进程及其子进程"""
+        process = job.process
+        if sys.platform == "win32":
+            # Windows下终止整个进程树
+            process.kill()
+            signal_bus.output_received.emit("进程树已强制终止", "error", job.job_id)
         else:
-            signal_bus.output_received.emit("没有正在运行的进程", "info")
+            # Unix系系统终止进程组
+            process.terminate()
+            process.waitForFinished(500)
+            if process.state() == QProcess.Running:
+                process.kill()
+        if job.process is not None:
+            job.process.waitForFinished()
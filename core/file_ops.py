@@ -0,0 +1,393 @@
+# 文件操作队列：移到回收站、永久删除、移动、复制与重命名在后台线程中逐个文件执行，可取消，
+# 结束后以监听线程的事件格式返回全部变化，由调用方一次性应用到索引；移动/重命名后可同时重写引用它们的链接
+import errno
+import os
+import shutil
+import stat
+import time
+from collections import deque, namedtuple
+
+from PySide6.QtCore import QFile, QObject, QThread, Signal
+
+from .fs_watcher import CREATED, DELETED, MOVED
+from .links import LinkUpdater
+from .post_index import PostIndex
+from .utils import normalize_path
+
+TRASH = "trash"
+DELETE = "delete"
+MOVE = "move"
+COPY = "copy"
+RENAME = "rename"
+
+# 两次进度回报的最短间隔（秒）
+PROGRESS_INTERVAL = 0.05
+
+FileOperation = namedtuple("FileOperation", ["kind", "source", "destination"])  # destination 为完整的目标路径
+# errors: [(路径, 错误信息)]；rewritten 为重写了链接的文章，links 为修改的链接数
+FileOpsResult = namedtuple("FileOpsResult", ["changes", "errors", "cancelled", "rewritten", "links"])
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+def top_level_paths(paths):
+    """去重并去掉已被选中目录包含的路径（删除/移动父目录时子项随之处理）"""
+    result = []
+    for path in sorted({os.path.normpath(p) for p in paths}, key=normalize_path):
+        key = normalize_path(path)
+        if not any(key.startswith(normalize_path(parent).rstrip(os.sep) + os.sep) for parent in result):
+            result.append(path)
+    return result
+
+
+def unique_destination(path):
+    """目标已存在时依次尝试 名称-1、名称-2 ...（扩展名保持不变）"""
+    if not os.path.lexists(path):
+        return path
+    base, extension = os.path.splitext(path) if not os.path.isdir(path) else (path, "")
+    counter = 1
+    while os.path.lexists(f"{base}-{counter}{extension}"):
+        counter += 1
+    return f"{base}-{counter}{extension}"
+
+
+def plan_operations(kind, paths, target_dir=None):
+    """
+    把选中的路径展开为操作列表：move/copy 的目标为 target_dir 下的同名项，
+    复制到原目录时自动改名；trash/delete 忽略 target_dir
+    """
+    operations = []
+    for path in top_level_paths(paths):
+        destination = None
+        if kind in (MOVE, COPY):
+            destination = os.path.join(target_dir, os.path.basename(path))
+            if kind == COPY:
+                destination = unique_destination(destination)
+        operations.append(FileOperation(kind, path, destination))
+    return operations
+
+
+_ILLEGAL_CHARS = set('\\/:*?"<>|')
+_RESERVED_NAMES = {"CON", "PRN", "AUX", "NUL", *(f"COM{i}" for i in range(1, 10)), *(f"LPT{i}" for i in range(1, 10))}
+
+
+def validate_filename(name):
+    """
+    检查用户输入的文件名，合法时原样返回（允许 .gitignore 等以点开头的名称），
+    不合法时抛出 ValueError 说明原因，不会替用户改名
+    """
+    if not name or not name.strip():
+        raise ValueError("名称不能为空")
+    if name in (".", ".."):
+        raise ValueError(f"不能使用“{name}”作为名称")
+    illegal = sorted({char for char in name if char in _ILLEGAL_CHARS or ord(char) < 32})
+    if illegal:
+        shown = " ".join(repr(char)[1:-1] for char in illegal)
+        raise ValueError(f"名称不能包含以下字符：{shown}")
+    if name != name.strip():
+        raise ValueError("名称不能以空格开头或结尾")
+    if name.endswith("."):
+        raise ValueError("名称不能以“.”结尾")
+    if name.split(".")[0].upper() in _RESERVED_NAMES:
+        raise ValueError(f"“{name}”是 Windows 保留的设备名")
+    return name
+
+
+def count_files(path):
+    """目录下的文件数（不跟随符号链接），用于计算进度；文件为 1"""
+    if not os.path.isdir(path) or os.path.islink(path):
+        return 1
+    total = 0
+    for current, dirs, files in os.walk(path):
+        total += len(files) + sum(1 for name in dirs if os.path.islink(os.path.join(current, name)))
+    return max(1, total)
+
+
+def _remove_file(path):
+    """删除文件或符号链接；Windows 下只读文件（如 .git 中的对象）先去掉只读属性"""
+    try:
+        os.remove(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IWRITE)
+        os.remove(path)
+
+
+class FileOperationRunner:
+    """
+    依次执行操作：每处理一个文件计一步，progress(已完成, 总数, 当前路径) 按 PROGRESS_INTERVAL 节流，
+    cancelled() 在文件之间检查；取消时已完成的操作保留，未完成的目录复制/跨磁盘移动会清理目标
+    传入 links（LinkUpdater）时，所有操作结束后（包括取消）为已完成的移动/重命名重写链接
+    """
+
+    def __init__(self, progress=None, cancelled=None, links=None):
+        self.progress = progress
+        self.cancelled = cancelled
+        self.links = links
+        self.done = 0
+        self.total = 0
+        self._last_report = 0.0
+
+    def run(self, operations):
+        changes, errors = [], []
+        self.done = 0
+        self.total = sum(self._cost(op) for op in operations)
+        if self.links is not None:
+            # 移动前查询反向链接：此时索引中的路径还是移动前的
+            self.links.collect([op.source for op in operations if op.kind in (MOVE, RENAME)])
+        cancelled = False
+        try:
+            for op in operations:
+                self._check_cancelled()
+                try:
+                    changes.extend(self._execute(op))
+                except OperationCancelled:
+                    raise
+                except OSError as e:
+                    errors.append((op.source, e.strerror or str(e)))
+                    # 失败的目录操作可能已处理了一部分，重新扫描两端
+                    changes.extend((CREATED, path, None, os.path.isdir(path))
+                                   for path in (op.source, op.destination) if path and os.path.exists(path))
+        except OperationCancelled as e:
+            changes.extend(e.args[0] if e.args else [])
+            cancelled = True
+        rewritten, links = self._rewrite_links(changes, errors)
+        self._report("", force=True)
+        return FileOpsResult(changes, errors, cancelled, rewritten, links)
+
+    def _rewrite_links(self, changes, errors):
+        moves = [(path, destination, is_dir) for kind, path, destination, is_dir in changes if kind == MOVED]
+        if self.links is None or not moves:
+            return [], 0
+        rewritten, links, link_errors = self.links.apply(moves)
+        errors.extend(link_errors)
+        # 重写后的文章需要重新解析（监听线程不报告修改，这里作为新增处理，索引会刷新其元数据与链接）
+        changes.extend((CREATED, path, None, False) for path in rewritten)
+        return rewritten, links
+
+    def _cost(self, op):
+        # 回收站、重命名与同一磁盘上的移动都只是一次改名
+        if op.kind in (DELETE, COPY):
+            return count_files(op.source)
+        return 1
+
+    def _check_cancelled(self, partial=None):
+        if self.cancelled is not None and self.cancelled():
+            raise OperationCancelled(partial or [])
+
+    def _step(self, path):
+        self.done += 1
+        self._report(path)
+
+    def _report(self, path, force=False):
+        now = time.monotonic()
+        if self.progress is not None and (force or now - self._last_report >= PROGRESS_INTERVAL):
+            self._last_report = now
+            self.progress(min(self.done, self.total), self.total, path)
+
+    def _execute(self, op):
+        is_dir = os.path.isdir(op.source) and not os.path.islink(op.source)
+        if not os.path.lexists(op.source):
+            raise FileNotFoundError(errno.ENOENT, "文件不存在", op.source)
+        if op.kind == TRASH:
+            if not QFile.moveToTrash(op.source):
+                raise OSError(errno.EIO, "无法移到回收站（可以选择永久删除）", op.source)
+            self._step(op.source)
+            return [(DELETED, op.source, None, is_dir)]
+        if op.kind == DELETE:
+            self._delete_tree(op.source) if is_dir else self._delete_file(op.source)
+            return [(DELETED, op.source, None, is_dir)]
+        self._check_destination(op, is_dir)
+        if op.kind == COPY:
+            try:
+                self._copy_tree(op.source, op.destination) if is_dir else self._copy_file(op.source, op.destination)
+            except OperationCancelled:
+                raise OperationCancelled(self._discard(op.destination, is_dir))
+            return [(CREATED, op.destination, None, is_dir)]
+        try:
+            os.rename(op.source, op.destination)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            self._move_across_devices(op, is_dir)
+        else:
+            self._step(op.source)
+        return [(MOVED, op.source, op.destination, is_dir)]
+
+    @staticmethod
+    def _check_destination(op, is_dir):
+        source = normalize_path(op.source)
+        destination = normalize_path(op.destination)
+        # 只改大小写的重命名在不区分大小写的文件系统上指向同一文件，允许执行
+        case_only = op.kind == RENAME and op.source != op.destination and source == destination
+        if source == destination and not case_only:
+            raise OSError(errno.EINVAL, "目标与源相同", op.destination)
+        if is_dir and destination.startswith(source.rstrip(os.sep) + os.sep):
+            raise OSError(errno.EINVAL, "不能移动或复制到自身的子目录中", op.destination)
+        if os.path.lexists(op.destination) and not case_only:
+            raise FileExistsError(errno.EEXIST, "目标已存在", op.destination)
+
+    def _move_across_devices(self, op, is_dir):
+        """跨磁盘移动：先完整复制，再删除源（复制阶段取消时源保持不变）"""
+        self.total += count_files(op.source) * 2 - 1
+        try:
+            self._copy_tree(op.source, op.destination) if is_dir else self._copy_file(op.source, op.destination)
+        except OperationCancelled:
+            raise OperationCancelled(self._discard(op.destination, is_dir))
+        try:
+            self._delete_tree(op.source) if is_dir else self._delete_file(op.source)
+        except OperationCancelled:
+            # 已复制完整，删除源途中取消：目标可用，源只剩一部分
+            raise OperationCancelled([(CREATED, op.destination, None, is_dir), (CREATED, op.source, None, True)])
+
+    def _copy_file(self, source, destination):
+        if os.path.islink(source):
+            os.symlink(os.readlink(source), destination)
+        else:
+            shutil.copy2(source, destination)
+        self._step(source)
+
+    def _copy_tree(self, source, destination):
+        """逐个文件复制目录（不跟随符号链接），每个文件之间检查取消"""
+        os.makedirs(destination)
+        for current, dirs, files in os.walk(source):
+            target = os.path.join(destination, os.path.relpath(current, source))
+            for name in list(dirs):
+                path = os.path.join(current, name)
+                if os.path.islink(path):
+                    dirs.remove(name)
+                    self._check_cancelled()
+                    self._copy_file(path, os.path.join(target, name))
+                else:
+                    os.makedirs(os.path.join(target, name), exist_ok=True)
+            for name in files:
+                self._check_cancelled()
+                self._copy_file(os.path.join(current, name), os.path.join(target, name))
+            shutil.copystat(current, target)
+
+    def _delete_file(self, path):
+        _remove_file(path)
+        self._step(path)
+
+    def _delete_tree(self, path):
+        """自底向上逐个删除（不跟随符号链接）；取消时目录保留剩余部分，并要求重新扫描"""
+        for current, dirs, files in os.walk(path, topdown=False):
+            for name in files:
+                self._check_cancelled([(CREATED, path, None, True)])
+                self._delete_file(os.path.join(current, name))
+            for name in dirs:
+                child = os.path.join(current, name)
+                if os.path.islink(child):
+                    self._check_cancelled([(CREATED, path, None, True)])
+                    self._delete_file(child)
+            os.rmdir(current)
+
+    @staticmethod
+    def _discard(path, is_dir):
+        """清理取消后只复制了一部分的目标，返回需要应用的变化（抵消监听线程已报告的新增）"""
+        if is_dir:
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.lexists(path):
+            try:
+                _remove_file(path)
+            except OSError:
+                pass
+        return [(DELETED, path, None, is_dir)]
+
+
+class FileOperationWorker(QThread):
+    """
+    后台执行一批文件操作：发出 progress(已完成, 总数, 当前路径)，结束后发出 operations_finished(FileOpsResult)
+    link_root 为博客根目录时，用该目录的文章索引重写被移动文件的链接
+    """
+    progress = Signal(int, int, str)
+    operations_finished = Signal(object)
+
+    def __init__(self, operations, link_root=None, parent=None):
+        super().__init__(parent)
+        self.operations = list(operations)
+        self.link_root = link_root
+
+    def run(self):
+        index = None
+        if self.link_root and any(op.kind in (MOVE, RENAME) for op in self.operations):
+            index = PostIndex(self.link_root)
+        try:
+            links = LinkUpdater(self.link_root, index) if index is not None else None
+            runner = FileOperationRunner(self.progress.emit, self.isInterruptionRequested, links)
+            self.operations_finished.emit(runner.run(self.operations))
+        finally:
+            if index is not None:
+                index.close()
+
+
+class FileOperationQueue(QObject):
+    """
+    文件操作队列：同一时间只执行一批，其余排队
+    batch_started(描述, 排队数) 在每批开始时发出，progress(已完成, 总数, 当前路径) 转发当前批次的进度，
+    batch_finished(描述, FileOpsResult, context) 在每批结束时发出（context 为提交时传入的对象）
+    """
+    batch_started = Signal(str, int)
+    progress = Signal(int, int, str)
+    batch_finished = Signal(str, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = deque()  # (描述, 操作列表, 链接根目录, context)
+        self._worker = None
+        self._current = None
+
+    @property
+    def busy(self):
+        return self._worker is not None
+
+    @property
+    def pending(self):
+        """排队中（不含正在执行）的批次数"""
+        return len(self._pending)
+
+    def submit(self, description, operations, context=None, link_root=None):
+        """link_root 为博客根目录时，移动/重命名后重写该站点中指向它们的链接"""
+        if not operations:
+            return
+        self._pending.append((description, operations, link_root, context))
+        if not self.busy:
+            self._start_next()
+
+    def _start_next(self):
+        if not self._pending:
+            return
+        self._current = self._pending.popleft()
+        description, operations, link_root, _ = self._current
+        self._worker = FileOperationWorker(operations, link_root, self)
+        self._worker.progress.connect(self.progress)
+        self._worker.operations_finished.connect(self._on_operations_finished)
+        self._worker.finished.connect(self._on_worker_finished)
+        self.batch_started.emit(description, len(self._pending))
+        self._worker.start()
+
+    def _on_operations_finished(self, result):
+        description, _, _, context = self._current
+        self.batch_finished.emit(description, result, context)
+
+    def _on_worker_finished(self):
+        worker = self.sender()
+        worker.deleteLater()
+        if worker is self._worker:
+            self._worker = self._current = None
+            self._start_next()
+
+    def cancel(self):
+        """取消正在执行的一批，并丢弃排队中的操作（丢弃的批次也会发出 batch_finished，便于调用方收尾）"""
+        while self._pending:
+            description, _, _, context = self._pending.popleft()
+            self.batch_finished.emit(description, FileOpsResult([], [], True, [], 0), context)
+        if self._worker is not None:
+            self._worker.requestInterruption()
+
+    def close(self):
+        """退出前取消并等待正在执行的操作"""
+        self.cancel()
+        if self._worker is not None:
+            self._worker.wait()
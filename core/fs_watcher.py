@@ -0,0 +1,275 @@
+# 文件变更追踪,Linux 下使用 inotify,其他平台退化为轮询目录 mtime
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+from .markdown_index import exclude_dirs
+
+# 事件格式：(kind, path, destination, is_dir)
+# kind 取值 created / deleted / moved / rescan
+CREATED = "created"
+DELETED = "deleted"
+MOVED = "moved"
+RESCAN = "rescan"
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _walk_dirs(root, exclude_dirs):
+    """迭代列出根目录下所有未排除的目录（包括根目录）"""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        yield current
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in exclude_dirs:
+                            stack.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+class InotifyBackend:
+    """基于 ctypes 调用 inotify 的递归监听"""
+
+    def __init__(self, root, exclude_dirs):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.root = root
+        self.exclude_dirs = exclude_dirs
+        self.watches = {}
+        self._pending_moves = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, path):
+        """
+        监听目录树；watch 数量达到上限（max_user_watches）时抛出 OSError，
+        目录在遍历过程中被删除或无权限访问时跳过
+        """
+        for directory in _walk_dirs(path, self.exclude_dirs):
+            wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = directory
+                continue
+            error = ctypes.get_errno()
+            if error in (errno.ENOSPC, errno.ENOMEM):
+                raise OSError(error, f"inotify watch 数量超限：{directory}")
+
+    def _watch_new_tree(self, path, events):
+        """监听新出现的目录，watch 不足时发出 rescan，由调用方重新扫描并重建监听（届时退化为轮询）"""
+        try:
+            self._watch_tree(path)
+        except OSError:
+            events.append((RESCAN, self.root, None, True))
+
+    def _rename_watches(self, source, destination):
+        """目录移动后 watch 描述符不变，只需更新路径"""
+        prefix = source + os.sep
+        for wd, path in self.watches.items():
+            if path == source:
+                self.watches[wd] = destination
+            elif path.startswith(prefix):
+                self.watches[wd] = destination + path[len(source):]
+
+    def poll(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        events = []
+        if readable:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                data = b""
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                self._translate(wd, mask, cookie, name, events)
+        # 没有配对 MOVED_TO 的 MOVED_FROM 视为删除（移出了监听范围）
+        for cookie, (path, is_dir) in list(self._pending_moves.items()):
+            events.append((DELETED, path, None, is_dir))
+        self._pending_moves.clear()
+        return events
+
+    def _translate(self, wd, mask, cookie, name, events):
+        if mask & IN_Q_OVERFLOW:
+            events.append((RESCAN, self.root, None, True))
+            return
+        if mask & IN_IGNORED:
+            self.watches.pop(wd, None)
+            return
+        directory = self.watches.get(wd)
+        if directory is None or not name:
+            return
+        if name in self.exclude_dirs and mask & IN_ISDIR:
+            return
+        path = os.path.join(directory, name)
+        is_dir = bool(mask & IN_ISDIR)
+        if mask & IN_CREATE:
+            if is_dir:
+                self._watch_new_tree(path, events)
+            events.append((CREATED, path, None, is_dir))
+        elif mask & IN_DELETE:
+            events.append((DELETED, path, None, is_dir))
+        elif mask & IN_MOVED_FROM:
+            self._pending_moves[cookie] = (path, is_dir)
+        elif mask & IN_MOVED_TO:
+            source = self._pending_moves.pop(cookie, None)
+            if source is None:
+                if is_dir:
+                    self._watch_new_tree(path, events)
+                events.append((CREATED, path, None, is_dir))
+            else:
+                if is_dir:
+                    self._rename_watches(source[0], path)
+                events.append((MOVED, source[0], path, is_dir))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingBackend:
+    """轮询目录 mtime，只重新列出发生变化的目录"""
+
+    def __init__(self, root, exclude_dirs, interval=2.0):
+        self.root = root
+        self.exclude_dirs = exclude_dirs
+        self.interval = interval
+        self.snapshot = {}
+        for directory in _walk_dirs(root, exclude_dirs):
+            self._snapshot_dir(directory)
+        self.last_scan = time.monotonic()
+
+    def _snapshot_dir(self, directory):
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                children = {}
+                for entry in entries:
+                    try:
+                        children[entry.name] = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        self.snapshot[directory] = (mtime, children)
+        return children
+
+    def poll(self, timeout):
+        """距上次扫描不足 interval 时只等待 timeout（便于线程及时响应中断），不访问磁盘"""
+        remaining = self.last_scan + self.interval - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            return []
+        self.last_scan = time.monotonic()
+        events = []
+        for directory, (mtime, children) in list(self.snapshot.items()):
+            if directory not in self.snapshot:
+                continue  # 已随父目录一起删除
+            try:
+                changed = os.stat(directory).st_mtime_ns != mtime
+            except OSError:
+                changed = True
+            if not changed:
+                continue
+            current = self._snapshot_dir(directory)
+            if current is None:
+                self.snapshot.pop(directory, None)
+                continue
+            for name, is_dir in children.items():
+                if name not in current or current[name] != is_dir:
+                    path = os.path.join(directory, name)
+                    if is_dir:
+                        self._forget(path)
+                    if not (is_dir and name in self.exclude_dirs):
+                        events.append((DELETED, path, None, is_dir))
+            for name, is_dir in current.items():
+                if name not in children or children[name] != is_dir:
+                    if is_dir and name in self.exclude_dirs:
+                        continue
+                    path = os.path.join(directory, name)
+                    if is_dir:
+                        for sub in _walk_dirs(path, self.exclude_dirs):
+                            self._snapshot_dir(sub)
+                    events.append((CREATED, path, None, is_dir))
+        return events
+
+    def _forget(self, path):
+        prefix = path + os.sep
+        for key in [key for key in self.snapshot if key == path or key.startswith(prefix)]:
+            del self.snapshot[key]
+
+    def close(self):
+        self.snapshot.clear()
+
+
+class FileChangeTracker(QThread):
+    """
+    后台监听博客目录变化，合并一段时间内的事件后批量发出
+    changes_detected(list[(kind, path, destination, is_dir)])
+    """
+    changes_detected = Signal(list)
+
+    def __init__(self, root_path, exclude_dirs=exclude_dirs, coalesce_interval=0.2, parent=None):
+        super().__init__(parent)
+        self.root_path = os.path.normpath(root_path)
+        self.exclude_dirs = set(exclude_dirs)
+        self.coalesce_interval = coalesce_interval
+
+    def _create_backend(self):
+        if sys.platform.startswith("linux"):
+            try:
+                return InotifyBackend(self.root_path, self.exclude_dirs)
+            except (OSError, AttributeError):
+                pass  # inotify 不可用或 watch 数量超限时退化为轮询
+        return PollingBackend(self.root_path, self.exclude_dirs)
+
+    def run(self):
+        backend = self._create_backend()
+        try:
+            batch = []
+            deadline = None
+            while not self.isInterruptionRequested():
+                batch.extend(backend.poll(self.coalesce_interval))
+                if batch and deadline is None:
+                    deadline = time.monotonic() + self.coalesce_interval
+                if batch and time.monotonic() >= deadline:
+                    self.changes_detected.emit(batch)
+                    batch = []
+                    deadline = None
+        finally:
+            backend.close()
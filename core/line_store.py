@@ -0,0 +1,189 @@
+# 紧凑的控制台行存储：全部文本以 UTF-8 连续存放在一个 bytearray 中，另用数组记录每行的偏移与类型
+import bisect
+import os
+import tempfile
+from array import array
+from itertools import accumulate
+
+from .ansi import line_styles
+
+# 消息类型与其编码（types 数组中每行占一个字节）
+TYPES = ("output", "input", "error", "system")
+TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+# 反向检索时每次检索的窗口大小
+SEARCH_WINDOW = 1024 * 1024
+# 头部已淘汰的行超过该数量且多于存活行时才压缩缓冲区，使淘汰的均摊开销为 O(1)
+COMPACT_MIN_LINES = 4096
+
+
+class LineStore:
+    """
+    控制台的回滚缓冲区，每行只占 8 字节偏移 + 1 字节类型 + 文本本身
+    data[offsets[i]:offsets[i + 1]] 为第 i 行（含结尾换行符），被淘汰的行只移动 first，攒够后再整体压缩
+    行号均相对于当前保留的第一行；evicted 为累计淘汰的行数，evicted + 行号 即为该行的绝对序号
+    带 ANSI 颜色的输出另按块保存 AnsiParser 的片段，需要时（重新渲染）才切分为每行的样式，纯文本不占额外空间
+    """
+
+    def __init__(self, max_lines=10000, spill_to_file=False):
+        self.max_lines = max(1, max_lines)
+        self.spill_to_file = spill_to_file
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+        self.types = array("B")
+        self.first = 0
+        self.evicted = 0
+        self._styled_starts = array("Q")  # 带样式的块的第一行的绝对序号
+        self._styled_chunks = []  # (行数, 片段)
+        self._style_cache = (None, None)
+        self.spill_path = None
+        self._spill_file = None
+
+    def __len__(self):
+        return len(self.types) - self.first
+
+    @property
+    def lines(self):
+        """按顺序产生 (text, msg_type)"""
+        for row in range(len(self)):
+            yield self.text(row), self.type_of(row)
+
+    def append_lines(self, lines, msg_type, segments=None):
+        """追加多行，segments 为这些行带样式的片段（AnsiParser.feed 的结果，纯文本时为 None），返回本次被淘汰的行数"""
+        if not lines:
+            return 0
+        if segments is not None:
+            self._styled_starts.append(self.evicted + len(self))
+            self._styled_chunks.append((len(lines), segments))
+        blob = ("\n".join(lines) + "\n").encode("utf-8", "replace")
+        parts = blob.split(b"\n")
+        parts.pop()
+        offsets = accumulate(map((1).__add__, map(len, parts)), initial=len(self.data))
+        next(offsets)
+        self.data += blob
+        self.offsets.extend(offsets)
+        self.types.frombytes(bytes([TYPE_CODES.get(msg_type, 0)]) * len(parts))
+        overflow = len(self) - self.max_lines
+        if overflow > 0:
+            self._evict(overflow)
+        return max(overflow, 0)
+
+    def resize(self, max_lines):
+        self.max_lines = max(1, max_lines)
+        overflow = len(self) - self.max_lines
+        if overflow > 0:
+            self._evict(overflow)
+
+    def _evict(self, count):
+        if self.spill_to_file:
+            if self._spill_file is None:
+                fd, self.spill_path = tempfile.mkstemp(prefix="StaticBlogAssistant-console-", suffix=".log")
+                self._spill_file = os.fdopen(fd, "wb")
+            self._spill_file.write(self.data[self.offsets[self.first]:self.offsets[self.first + count]])
+            self._spill_file.flush()
+        self.first += count
+        self.evicted += count
+        if self.first >= COMPACT_MIN_LINES and self.first > len(self):
+            self._compact()
+
+    def _compact(self):
+        cut = self.offsets[self.first]
+        del self.data[:cut]
+        self.offsets = array("Q", (offset - cut for offset in self.offsets[self.first:]))
+        self.types = self.types[self.first:]
+        self.first = 0
+        # 丢弃已全部淘汰的样式块
+        stale = bisect.bisect_right(self._styled_starts, self.evicted)
+        while stale > 0 and self._styled_starts[stale - 1] + self._styled_chunks[stale - 1][0] > self.evicted:
+            stale -= 1
+        del self._styled_starts[:stale]
+        del self._styled_chunks[:stale]
+
+    def clear(self):
+        self.evicted += len(self)
+        self._styled_starts = array("Q")
+        self._styled_chunks = []
+        self._style_cache = (None, None)
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+        self.types = array("B")
+        self.first = 0
+
+    def close(self):
+        """关闭并删除淘汰输出的临时日志"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+
+    def text(self, row):
+        index = self.first + row
+        return self.data[self.offsets[index]:self.offsets[index + 1] - 1].decode("utf-8", "replace")
+
+    def style_runs(self, row):
+        """该行的 ((长度, Style), ...)，整行为默认样式时返回 None"""
+        if not self._styled_chunks:
+            return None
+        line = self.evicted + row
+        index = bisect.bisect_right(self._styled_starts, line) - 1
+        if index < 0:
+            return None
+        start = self._styled_starts[index]
+        count, segments = self._styled_chunks[index]
+        if line >= start + count:
+            return None
+        # 重新渲染时按顺序访问，同一块只切分一次
+        cached_start, styles = self._style_cache
+        if cached_start != start:
+            styles = line_styles(segments)
+            self._style_cache = (start, styles)
+        return styles[line - start]
+
+    def type_code(self, row):
+        return self.types[self.first + row]
+
+    def type_of(self, row):
+        return TYPES[self.types[self.first + row]]
+
+    def rows_of_types(self, codes, start=0):
+        """start 行之后类型属于 codes 的行号"""
+        codes = frozenset(codes)
+        return [row for row, code in enumerate(self.types[self.first + start:], start) if code in codes]
+
+    def row_at(self, offset):
+        """包含该字节偏移的行号"""
+        return bisect.bisect_right(self.offsets, offset, self.first) - 1 - self.first
+
+    def find(self, pattern, row=0, backward=False, codes=None):
+        """
+        在缓冲区上直接检索 pattern（bytes 正则），不复制文本
+        从 row 行开头向后查找（backward 时查找 row 行之前），只接受类型属于 codes 的行，返回行号，找不到返回 None
+        """
+        if not len(self):
+            return None
+        row = min(max(row, 0), len(self))
+        if not backward:
+            position = self.offsets[self.first + row]
+            while True:
+                match = pattern.search(self.data, position)
+                if match is None:
+                    return None
+                found = self.row_at(match.start())
+                if codes is None or self.type_code(found) in codes:
+                    return found
+                position = self.offsets[self.first + found + 1]
+        end = self.offsets[self.first + row]
+        lower = self.offsets[self.first]
+        while end > lower:
+            # 窗口从行首开始，匹配不会被窗口边界截断
+            window_start = self.offsets[self.first + self.row_at(max(lower, end - SEARCH_WINDOW))]
+            for match in reversed(list(pattern.finditer(self.data, window_start, end))):
+                found = self.row_at(match.start())
+                if codes is None or self.type_code(found) in codes:
+                    return found
+            end = window_start
+        return None
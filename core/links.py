@@ -0,0 +1,235 @@
+# 文章中的站内链接：提取 Markdown/HTML 链接目标并解析为文件路径，文件移动或重命名后重写引用它们的链接
+import os
+import re
+from urllib.parse import quote, unquote
+
+from .utils import normalize_path
+
+# [文字](目标 "标题") 与 ![图片](目标)，目标可以用 <> 包围
+_INLINE = re.compile(r"!?\[(?:[^\[\]\n]|\[[^\]\n]*\])*\]\([ \t]*(?:<([^>\n]*)>|([^\s()<>]+(?:\([^\s()]*\)[^\s()<>]*)*))")
+# [名称]: 目标
+_REFERENCE = re.compile(r"^ {0,3}\[[^\]\n]+\]:[ \t]*(?:<([^>\n]*)>|(\S+))", re.M)
+# <a href="..."> <img src="..."> 等
+_HTML = re.compile(r"<(?:a|img|source|video|audio|link|script)\b[^>]*?\s(?:href|src)\s*=\s*([\"'])([^\"'\n]*)\1", re.I)
+# 代码块与行内代码中的内容不是链接
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})[^\n]*\n.*?(?:^ {0,3}\1[ \t]*$|\Z)", re.M | re.S)
+_CODE_SPAN = re.compile(r"(`+)[^`\n].*?\1")
+# 带协议的地址（http:、mailto: 等）与 //host 不是站内链接
+_EXTERNAL = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)")
+
+
+def _code_ranges(text):
+    ranges = [match.span() for match in _FENCE.finditer(text)]
+    ranges += [match.span() for match in _CODE_SPAN.finditer(text)]
+    return sorted(ranges)
+
+
+def find_links(text):
+    """返回 [(start, end, 目标)]：目标在文本中的位置（不含 <> 与引号），按位置排序，跳过代码中的内容"""
+    spans = []
+    for pattern, groups in ((_INLINE, (1, 2)), (_REFERENCE, (1, 2)), (_HTML, (2,))):
+        for match in pattern.finditer(text):
+            group = next(g for g in groups if match.group(g) is not None)
+            if match.group(group):
+                spans.append((match.start(group), match.end(group), match.group(group)))
+    ranges = _code_ranges(text)
+    if ranges:
+        spans = [span for span in spans if not any(start <= span[0] < end for start, end in ranges)]
+    return sorted(set(spans))
+
+
+def split_url(url):
+    """拆分为 (路径, 后缀)，后缀为 ?query 或 #fragment 部分"""
+    for index, char in enumerate(url):
+        if char in "?#":
+            return url[:index], url[index:]
+    return url, ""
+
+
+def resolve_link(url, source_path, root):
+    """
+    站内链接的目标文件路径（保留大小写），外部地址与纯锚点返回 None
+    以 / 开头的链接相对博客根目录，其余相对文章所在目录
+    """
+    path, _ = split_url(url)
+    if not path or _EXTERNAL.match(path):
+        return None
+    path = unquote(path)
+    base = root if path.startswith("/") else os.path.dirname(source_path)
+    return os.path.normpath(os.path.join(base, path.lstrip("/")))
+
+
+def extract_links(text, source_path, root):
+    """文章引用的所有站内路径（normalize_path 之后），用于反向链接索引"""
+    targets = set()
+    for _, _, url in find_links(text):
+        target = resolve_link(url, source_path, root)
+        if target is not None:
+            targets.add(normalize_path(target))
+    return sorted(targets)
+
+
+def link_variants(path):
+    """可能指向该文件的链接目标：文章常省略 .md 或写成 .html（VitePress/Hexo 生成的页面）"""
+    stem, extension = os.path.splitext(path)
+    if extension.lower() == ".md":
+        return [path, stem, stem + ".html"]
+    return [path]
+
+
+class Relocation:
+    """一批移动/重命名：moves 为 [(原路径, 新路径, 是否目录)]，relocate 给出路径移动后的位置"""
+
+    def __init__(self, moves):
+        self.moves = [(normalize_path(source), source, destination, is_dir) for source, destination, is_dir in moves]
+
+    def _relocate_exact(self, path):
+        key = normalize_path(path)
+        for source_key, source, destination, is_dir in self.moves:
+            if key == source_key:
+                return destination
+            if is_dir and key.startswith(source_key.rstrip(os.sep) + os.sep):
+                return destination + path[len(source.rstrip(os.sep)):]
+        return None
+
+    def relocate(self, path):
+        """路径（可以是省略 .md 或写成 .html 的链接目标）移动后的位置，未移动时返回 None"""
+        moved = self._relocate_exact(path)
+        if moved is not None:
+            return moved
+        stem, extension = os.path.splitext(path)
+        if extension.lower() == ".html":
+            moved, extension = self._relocate_exact(stem + ".md"), extension
+        else:
+            moved, extension = self._relocate_exact(path + ".md"), ""
+        if moved is not None and moved.lower().endswith(".md"):
+            return moved[:-3] + extension
+        return None
+
+
+def _format_link(original, target, source_path, root):
+    """按原链接的写法（/ 开头、./ 前缀、结尾 /、百分号编码）生成指向 target 的链接路径"""
+    if original.startswith("/"):
+        path = "/" + os.path.relpath(target, root).replace(os.sep, "/")
+    else:
+        path = os.path.relpath(target, os.path.dirname(source_path)).replace(os.sep, "/")
+        if original.startswith("./") and not path.startswith("../"):
+            path = "./" + path
+    if original.endswith("/") and not path.endswith("/"):
+        path += "/"
+    if unquote(original) != original:
+        path = quote(path, safe="/")
+    return path
+
+
+def rewrite_links(text, old_path, new_path, root, relocation):
+    """
+    文章从 old_path 移到 new_path（未移动时两者相同）后重写其中的链接，
+    目标被移动或相对位置变化的链接才修改，返回 (新文本, 修改的链接数)
+    """
+    chunks = []
+    position = 0
+    changed = 0
+    for start, end, url in find_links(text):
+        target = resolve_link(url, old_path, root)
+        if target is None:
+            continue
+        path, suffix = split_url(url)
+        new_target = relocation.relocate(target) or target
+        if path.startswith("/") and new_target == target:
+            continue
+        try:
+            old_link = _format_link(path, target, old_path, root)
+            new_link = _format_link(path, new_target, new_path, root)
+        except ValueError:
+            continue  # Windows 下移到了其他磁盘，无法写成相对路径
+        if new_link == old_link:
+            continue
+        chunks.append(text[position:start])
+        chunks.append(new_link + suffix)
+        position = end
+        changed += 1
+    chunks.append(text[position:])
+    return "".join(chunks), changed
+
+
+def replace_files(contents):
+    """
+    批量原子替换文件内容：先全部写入同目录的临时文件，全部成功后再依次替换；
+    替换中途失败时恢复已替换的文件，返回失败的 [(路径, 错误信息)]（为空表示全部成功）
+    """
+    temps = []
+    try:
+        for path, text in contents:
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            temps.append(temp_path)
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+    except OSError as e:
+        for temp_path in temps:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return [(path, e.strerror or str(e))]
+    replaced = []  # [(路径, 原内容)]
+    try:
+        for (path, _), temp_path in zip(contents, temps):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                original = f.read()
+            os.replace(temp_path, path)
+            replaced.append((path, original))
+    except OSError as e:
+        for original_path, original in replaced:
+            with open(original_path, "w", encoding="utf-8", newline="") as f:
+                f.write(original)
+        for temp_path in temps:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return [(path, e.strerror or str(e))]
+    return []
+
+
+class LinkUpdater:
+    """
+    移动/重命名前用 collect 从反向链接索引找出受影响的文章（引用被移动路径的文章，以及被移动的文章本身），
+    全部移动完成后用 apply 一次性重写它们的链接，并立即刷新这些文章在索引中的记录，
+    紧接着的下一次移动查询到的就是最新的链接；只读取受影响的文章，不重新扫描站点
+    index 为当前线程中打开的 PostIndex
+    """
+
+    def __init__(self, root, index):
+        self.root = root
+        self.index = index
+        self.affected = set()
+        self.moved_posts = set()
+
+    def collect(self, paths):
+        self.affected |= self.index.referrers(paths) | self.index.posts_in(paths, with_links=True)
+        self.moved_posts |= self.index.posts_in(paths)
+
+    def apply(self, moves):
+        """moves 为实际完成的 [(原路径, 新路径, 是否目录)]，返回 (重写的文章, 修改的链接数, 错误)"""
+        relocation = Relocation(moves)
+        contents, errors = [], []
+        total = 0
+        for old_path in sorted(self.affected):
+            new_path = relocation.relocate(old_path) or old_path
+            try:
+                with open(new_path, "r", encoding="utf-8", newline="") as f:
+                    text = f.read()
+            except FileNotFoundError:
+                continue  # 索引中的记录已过期（文章已被删除或移走）
+            except (OSError, UnicodeDecodeError) as e:
+                errors.append((new_path, getattr(e, "strerror", None) or str(e)))
+                continue
+            text, changed = rewrite_links(text, old_path, new_path, self.root, relocation)
+            if changed:
+                contents.append((new_path, text))
+                total += changed
+        failed = replace_files(contents)
+        if failed:
+            contents, total = [], 0
+            errors += failed
+        rewritten = [path for path, _ in contents]
+        moved = {relocation.relocate(path) or path for path in self.moved_posts}
+        self.index.refresh(self.moved_posts | moved | set(rewritten))
+        return rewritten, total, errors
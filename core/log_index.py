@@ -0,0 +1,141 @@
+# 大日志文件的只读访问：mmap 映射文件，分块建立行偏移索引，正则检索直接在映射上进行
+import bisect
+import gzip
+import mmap
+import os
+import re
+import shutil
+import tempfile
+from array import array
+from itertools import accumulate
+
+# 每次建立索引处理的字节数
+INDEX_CHUNK = 8 * 1024 * 1024
+# 反向检索时每次检索的窗口大小
+SEARCH_WINDOW = 4 * 1024 * 1024
+# 跳转到错误时匹配的行
+ERROR_PATTERN = re.compile(r"(?i)\b(?:error|fatal|failed|failure|exception|traceback)\b|\berr!|错误|失败".encode())
+
+
+def compile_search(text, regex=False, case_sensitive=False):
+    """把检索文本编译为可在 mmap 上使用的 bytes 正则，正则无效时抛出 re.error"""
+    pattern = text if regex else re.escape(text)
+    return re.compile(pattern.encode("utf-8"), 0 if case_sensitive else re.IGNORECASE)
+
+
+def decompress_to_temp(path):
+    """gzip 日志解压到临时文件（mmap 需要未压缩的文件），返回临时文件路径；仍在写入的日志只解压已有部分"""
+    fd, temp_path = tempfile.mkstemp(prefix="StaticBlogAssistant-log-", suffix=".log")
+    try:
+        with gzip.open(path, "rb") as source, os.fdopen(fd, "wb") as target:
+            try:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            except EOFError:
+                pass
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+
+class LogFile:
+    """
+    offsets[i] 为第 i 行的起始偏移，offsets[i + 1] 为下一行的起始（即本行结尾，含换行符）
+    index_chunk() 每次处理一块，可在后台线程中反复调用；未建完索引前只能访问已索引的行
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self.map = None
+        self.size = 0
+        self.offsets = array("Q", [0])
+        self.indexed = 0  # 已建立索引的字节数（总是位于行首）
+        self.remap()
+
+    def remap(self):
+        """文件增长后（日志仍在写入）重新映射，已建立的索引保留"""
+        size = os.fstat(self._file.fileno()).st_size
+        if size == self.size and (self.map is not None or not size):
+            return False
+        if self.map is not None:
+            self.map.close()
+        self.size = size
+        # 空文件不能映射
+        self.map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        return True
+
+    @property
+    def complete(self):
+        return self.indexed >= self.size
+
+    def __len__(self):
+        """已索引的行数；索引完成后包括末尾没有换行符的最后一行"""
+        count = len(self.offsets) - 1
+        if self.complete and self.offsets[-1] < self.size:
+            count += 1
+        return count
+
+    def index_chunk(self, chunk_size=INDEX_CHUNK):
+        """为下一块建立索引，返回是否已到文件末尾"""
+        if self.complete:
+            return True
+        start = self.indexed
+        end = min(start + chunk_size, self.size)
+        last_newline = self.map.rfind(b"\n", start, end)
+        if last_newline < 0:
+            if end < self.size:
+                # 超长的一行：向后找到它的结尾
+                last_newline = self.map.find(b"\n", end)
+            if last_newline < 0:
+                self.indexed = self.size
+                return True
+        # split 与 accumulate 都在 C 中完成，每行只分配一个 bytes 对象
+        parts = self.map[start:last_newline + 1].split(b"\n")
+        parts.pop()
+        offsets = accumulate(map((1).__add__, map(len, parts)), initial=start)
+        next(offsets)
+        self.offsets.extend(offsets)
+        self.indexed = last_newline + 1
+        return self.complete
+
+    def line_range(self, row):
+        start = self.offsets[row]
+        end = self.offsets[row + 1] if row + 1 < len(self.offsets) else self.size
+        return start, end
+
+    def line(self, row):
+        start, end = self.line_range(row)
+        return self.map[start:end].rstrip(b"\r\n").decode("utf-8", "replace")
+
+    def row_at(self, offset):
+        """包含该字节偏移的行号"""
+        return max(0, bisect.bisect_right(self.offsets, offset) - 1)
+
+    def search(self, pattern, start=0, backward=False):
+        """
+        从字节偏移 start 开始检索 pattern（bytes 正则），返回匹配的偏移，找不到返回 None
+        backward 为 True 时查找 start 之前最后一处匹配
+        """
+        if self.map is None:
+            return None
+        if not backward:
+            match = pattern.search(self.map, start)
+            return match.start() if match else None
+        end = start
+        while end > 0:
+            window_start = max(0, end - SEARCH_WINDOW)
+            last = None
+            for match in pattern.finditer(self.map, window_start, end):
+                last = match
+            if last is not None:
+                return last.start()
+            # 相邻窗口重叠 1 KB，避免漏掉跨窗口的匹配
+            end = window_start + 1024 if window_start else 0
+        return None
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self._file.close()
@@ -1,54 +1,177 @@
-# 文章过滤器,递归方式查询子目录中的.md文件
-from PySide6.QtCore import QSortFilterProxyModel, Qt
+# 文章过滤器,通过后台扫描得到的目录索引判断子目录中是否包含.md文件
+import os
+
+from PySide6.QtCore import QSortFilterProxyModel, Qt, QThread, Signal
+
+from .markdown_index import MarkdownIndex, exclude_dirs, scan_markdown_dirs
+from .scan_cache import ScanCache
+from .utils import normalize_path
+
+
+class MarkdownIndexScanner(QThread):
+    """
+    后台线程扫描博客目录
+    有缓存时先发出 cache_loaded(MarkdownIndex) 立即展示，
+    再按目录 mtime 校验缓存，完成后发出 scan_finished(MarkdownIndex) 并回写缓存
+    """
+    cache_loaded = Signal(object)
+    scan_finished = Signal(object)
+
+    def __init__(self, root_path, exclude_dirs=exclude_dirs, parent=None, cache=None):
+        super().__init__(parent)
+        self.root_path = root_path
+        self.exclude_dirs = set(exclude_dirs)
+        self.cache = cache or ScanCache()
+
+    def run(self):
+        cached_entries = self.cache.load(self.root_path, self.exclude_dirs)
+        if cached_entries and not self.isInterruptionRequested():
+            self.cache_loaded.emit(MarkdownIndex.from_entries(self.root_path, cached_entries, self.exclude_dirs))
+        index = scan_markdown_dirs(self.root_path, self.exclude_dirs, cached_entries, self.isInterruptionRequested)
+        if self.isInterruptionRequested():
+            return
+        self.scan_finished.emit(index)
+        if index.entries != cached_entries:
+            self.cache.save(self.root_path, self.exclude_dirs, index.entries)
+
 
-# 可以在这里添加需要排除的目录以优化性能
-exclude_dirs = {"__pycache__", ".vitepress", "node_modules", ".git", "docs", "public", ".vscode", "dist"}
 class MarkdownFilterProxy(QSortFilterProxyModel):
+    # 可选的排序字段
+    SORT_FIELDS = ("name", "title", "date")
+
     def __init__(self, root_path):
         super().__init__()
         self.setFilterCaseSensitivity(Qt.CaseInsensitive)
         self.root_path = root_path
         self.exclude_dirs = exclude_dirs
+        self._root_key = normalize_path(root_path)
+        # 扫描完成前为 None，此时目录一律放行，保证文件树立即可用
+        self.markdown_index = None
+        # 文章元数据 path -> PostMeta，排序与筛选时只查询内存
+        self.post_metadata = {}
+        self.sort_field = "name"
+        self.meta_query = ""
+        self._matched_files = None
+        self._matched_dirs = None
+
+    def set_root_path(self, root_path):
+        self.root_path = root_path
+        self._root_key = normalize_path(root_path)
+        self.markdown_index = None
+        self.post_metadata = {}
+        self._matched_files = self._matched_dirs = None
+        self.meta_query = ""
+        self.invalidateRowsFilter()
 
+    def set_markdown_index(self, index, changed_dirs=None):
+        """
+        替换目录索引（不重置模型）；changed_dirs 为与当前索引相比状态翻转的目录，
+        给出时只在这些目录影响显示时重新过滤，否则重新过滤全部行
+        """
+        previous, self.markdown_index = self.markdown_index, index
+        if previous is None or changed_dirs is None:
+            self.invalidateRowsFilter()
+        else:
+            self.refresh_paths(changed_dirs)
+
+    def set_post_metadata(self, metadata):
+        self.post_metadata = metadata
+        if self.meta_query:
+            self.set_meta_query(self.meta_query)
+        elif self.sort_field != "name":
+            self.invalidate()
+
+    def set_sort_field(self, field, order=Qt.AscendingOrder):
+        """按 name/title/date 排序，name 即保持文件系统原有顺序"""
+        self.sort_field = field
+        if field == "name":
+            self.sort(-1)
+        else:
+            self.sort(0, order)
+            self.invalidate()
+
+    def set_meta_query(self, query):
+        """
+        按元数据筛选文章：普通文本匹配标题，tag:xxx 匹配标签
+        空字符串表示取消筛选
+        """
+        self.meta_query = query.strip()
+        if not self.meta_query:
+            self._matched_files = self._matched_dirs = None
+        else:
+            text = self.meta_query.lower()
+            if text.startswith("tag:"):
+                tag = text[4:].strip()
+                matched = {path for path, meta in self.post_metadata.items()
+                           if any(tag == item.lower() for item in meta.tags)}
+            else:
+                matched = {path for path, meta in self.post_metadata.items() if text in meta.title.lower()}
+            self._matched_files = matched
+            self._matched_dirs = self._ancestor_dirs(matched)
+        self.invalidateRowsFilter()
+
+    def _ancestor_dirs(self, paths):
+        dirs = set()
+        for path in paths:
+            directory = os.path.dirname(path)
+            while directory not in dirs and directory.startswith(self._root_key) and directory != self._root_key:
+                dirs.add(directory)
+                directory = os.path.dirname(directory)
+        return dirs
+
+    def lessThan(self, source_left, source_right):
+        model = self.sourceModel()
+        left_dir, right_dir = model.isDir(source_left), model.isDir(source_right)
+        if left_dir != right_dir:
+            # 目录始终排在文件前面
+            return left_dir if self.sortOrder() == Qt.AscendingOrder else right_dir
+        if not left_dir:
+            left = self.post_metadata.get(normalize_path(model.filePath(source_left)))
+            right = self.post_metadata.get(normalize_path(model.filePath(source_right)))
+            if left is not None and right is not None:
+                key_left = getattr(left, self.sort_field).lower()
+                key_right = getattr(right, self.sort_field).lower()
+                if key_left != key_right:
+                    return key_left < key_right
+        return model.fileName(source_left).lower() < model.fileName(source_right).lower()
+
+    def refresh_paths(self, paths):
+        """
+        目录的过滤结果翻转后重新过滤：只有父目录已在文件树中显示的目录才影响当前显示，
+        全部位于未加载的子树中时不做任何事（展开时才会过滤）
+        """
+        model = self.sourceModel()
+        for path in paths:
+            parent = model.index(os.path.dirname(path))
+            if parent.isValid() and model.rowCount(parent) and self.mapFromSource(parent).isValid():
+                self.invalidateRowsFilter()
+                return
 
     def filterAcceptsRow(self, source_row, source_parent):
         model = self.sourceModel()
         index = model.index(source_row, 0, source_parent)
-        child_path = model.filePath(index).lower()
-
         child_name = model.fileName(index)
-        print(child_path)
         # 如果是文件：直接判断是否为 .md
         if not model.isDir(index):
-            return child_name.lower().endswith(".md")
+            if not child_name.lower().endswith(".md"):
+                return False
+            if self._matched_files is not None:
+                return normalize_path(model.filePath(index)) in self._matched_files
+            return True
+
+        child_path = normalize_path(model.filePath(index))
+        # 根目录的祖先目录需要保留，否则无法定位到根目录
+        if child_path == self._root_key or self._root_key.startswith(child_path.rstrip(os.sep) + os.sep):
+            return True
 
         # 如果是目录：检查是否在排除列表及根路径范围内
-        if child_name in self.exclude_dirs or not child_path.startswith(self.root_path.lower()):
+        if child_name in self.exclude_dirs or not child_path.startswith(self._root_key):
             return False
 
-        # 检查目录下是否包含 .md 文件
-        return self.has_markdown_in_children(model, index)
-
-    def has_markdown_in_children(self, model, index):
-        """深度优先检查目录是否包含 .md 文件"""
-        # 强制加载所有子项（解决延迟加载问题）
-        if model.canFetchMore(index):
-            model.fetchMore(index)
-
-        # 检查当前目录的直属文件
-        for i in range(model.rowCount(index)):
-            child = model.index(i, 0, index)
-            if not model.isDir(child) and child.data().lower().endswith(".md"):
-                return True
-
-        # 递归检查子目录（跳过排除项）
-        for i in range(model.rowCount(index)):
-            child = model.index(i, 0, index)
-            child_name = model.fileName(child)
-            if model.isDir(child) and child_name not in self.exclude_dirs:
-                # 强制加载子目录内容
-                if model.canFetchMore(child):
-                    model.fetchMore(child)
-                if self.has_markdown_in_children(model, child):
-                    return True
-        return False
\ No newline at end of file
+        if self._matched_dirs is not None:
+            return child_path in self._matched_dirs
+
+        # 查询索引判断目录下是否包含 .md 文件
+        if self.markdown_index is None:
+            return True
+        return self.markdown_index.contains_markdown(child_path)
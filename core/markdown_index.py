@@ -0,0 +1,208 @@
+# 文章目录索引,使用 os.scandir 预先统计每个目录子树中的.md文件数量
+import os
+
+from .utils import normalize_path
+
+# 可以在这里添加需要排除的目录以优化性能
+exclude_dirs = {"__pycache__", ".vitepress", "node_modules", ".git", "docs", "public", ".vscode", "dist"}
+
+
+class MarkdownIndex:
+    """
+    目录 -> 子树中.md文件数量 的索引
+    路径统一经过 normalize_path 处理，查询为 O(1)
+    增量更新方法返回「是否包含.md」状态发生翻转的目录集合
+    """
+
+    def __init__(self, root_path, counts=None, files=None, exclude_dirs=exclude_dirs, entries=None):
+        self.root = normalize_path(root_path)
+        self.exclude_dirs = set(exclude_dirs)
+        self._counts = counts if counts is not None else {}
+        self._files = files if files is not None else {}
+        # 扫描时的原始目录信息 dir -> (mtime_ns, md文件名, 子目录名)，用于写入扫描缓存
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def from_entries(cls, root_path, entries, exclude_dirs=exclude_dirs):
+        """由目录信息构建索引，不访问文件系统"""
+        root = normalize_path(root_path)
+        counts = {}
+        files = {}
+        order = []
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            entry = entries.get(current)
+            if entry is None:
+                continue
+            order.append(current)
+            counts[current] = len(entry[1])
+            if entry[1]:
+                files[current] = set(entry[1])
+            stack.extend(os.path.join(current, name) for name in entry[2])
+
+        # 先序遍历的逆序保证子目录先于父目录累加
+        for path in reversed(order):
+            if path != root:
+                counts[os.path.dirname(path)] += counts[path]
+        return cls(root, counts, files, exclude_dirs, entries)
+
+    def __len__(self):
+        return len(self._counts)
+
+    def contains_markdown(self, path):
+        """目录子树中是否包含.md文件"""
+        return self._counts.get(normalize_path(path), 0) > 0
+
+    def is_indexed(self, path):
+        return normalize_path(path) in self._counts
+
+    def markdown_dirs(self):
+        """所有包含.md文件的目录"""
+        return {path for path, count in self._counts.items() if count > 0}
+
+    def markdown_files(self):
+        """所有.md文件的完整路径"""
+        for directory, names in self._files.items():
+            for name in names:
+                yield os.path.join(directory, name)
+
+    # ---------------- 增量更新 ----------------
+    def is_tracked(self, path):
+        """路径位于根目录内且不在排除目录中"""
+        path = normalize_path(path)
+        if path == self.root:
+            return True
+        if not path.startswith(self.root.rstrip(os.sep) + os.sep):
+            return False
+        relative = os.path.relpath(path, self.root)
+        return not any(part in self.exclude_dirs for part in relative.split(os.sep))
+
+    def add_file(self, path):
+        path = normalize_path(path)
+        directory, name = os.path.split(path)
+        if not name.lower().endswith(".md") or not self.is_tracked(directory):
+            return set()
+        if directory not in self._counts:
+            return self.add_dir(directory)
+        names = self._files.setdefault(directory, set())
+        if name in names:
+            return set()
+        names.add(name)
+        return self._propagate(directory, 1)
+
+    def remove_file(self, path):
+        path = normalize_path(path)
+        directory, name = os.path.split(path)
+        names = self._files.get(directory)
+        if not names or name not in names:
+            return set()
+        names.discard(name)
+        if not names:
+            del self._files[directory]
+        return self._propagate(directory, -1)
+
+    def add_dir(self, path):
+        """扫描新增目录的子树并合并到索引中"""
+        path = normalize_path(path)
+        if not self.is_tracked(path):
+            return set()
+        flipped = self.remove_dir(path) if path in self._counts else set()
+        parent = os.path.dirname(path)
+        if path != self.root and parent not in self._counts:
+            # 父目录尚未索引时从父目录开始补扫
+            return flipped | self.add_dir(parent)
+        subtree = scan_markdown_dirs(path, self.exclude_dirs)
+        self._counts.update(subtree._counts)
+        self._files.update(subtree._files)
+        total = subtree._counts.get(path, 0)
+        flipped |= subtree.markdown_dirs()
+        if path != self.root and total:
+            flipped |= self._propagate(parent, total)
+        return flipped
+
+    def remove_dir(self, path):
+        """移除目录及其子树"""
+        path = normalize_path(path)
+        if path not in self._counts:
+            return set()
+        total = self._counts[path]
+        prefix = path.rstrip(os.sep) + os.sep
+        removed = [key for key in self._counts if key == path or key.startswith(prefix)]
+        flipped = {key for key in removed if self._counts[key] > 0}
+        for key in removed:
+            del self._counts[key]
+            self._files.pop(key, None)
+        if path != self.root and total:
+            flipped |= self._propagate(os.path.dirname(path), -total)
+        return flipped
+
+    def move(self, source, destination, is_dir):
+        if is_dir:
+            return self.remove_dir(source) | self.add_dir(destination)
+        return self.remove_file(source) | self.add_file(destination)
+
+    def _propagate(self, directory, delta):
+        """将数量变化沿祖先目录向上累加，返回状态翻转的目录"""
+        flipped = set()
+        while True:
+            before = self._counts.get(directory, 0)
+            after = before + delta
+            self._counts[directory] = after
+            if (before > 0) != (after > 0):
+                flipped.add(directory)
+            if directory == self.root:
+                break
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+        return flipped
+
+
+def scan_markdown_dirs(root_path, exclude_dirs=exclude_dirs, cached_entries=None, cancelled=None):
+    """
+    迭代扫描根目录，返回 MarkdownIndex（不跟随符号链接，跳过排除目录）
+    传入 cached_entries 时，mtime 未变化的目录直接复用缓存的文件列表
+    cancelled() 在每个目录之前检查，返回 True 时放弃扫描并返回 None
+    """
+    root = normalize_path(root_path)
+    cached_entries = cached_entries or {}
+    entries = {}
+    stack = [root]
+    while stack:
+        if cancelled is not None and cancelled():
+            return None
+        current = stack.pop()
+        try:
+            mtime = os.stat(current).st_mtime_ns
+        except OSError:
+            continue
+        cached = cached_entries.get(current)
+        if cached is not None and cached[0] == mtime:
+            names, subdirs = cached[1], cached[2]
+        else:
+            names, subdirs = _list_dir(current, exclude_dirs)
+        entries[current] = (mtime, names, subdirs)
+        stack.extend(os.path.join(current, name) for name in subdirs)
+    return MarkdownIndex.from_entries(root, entries, exclude_dirs)
+
+
+def _list_dir(directory, exclude_dirs):
+    """列出目录下的.md文件和未排除的子目录（名称均经过 normcase）"""
+    names = []
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in exclude_dirs:
+                            subdirs.append(os.path.normcase(entry.name))
+                    elif entry.name.lower().endswith(".md"):
+                        names.append(os.path.normcase(entry.name))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return tuple(names), tuple(subdirs)
@@ -0,0 +1,125 @@
+# 脚本流水线,按脚本之间声明的依赖关系(DAG)调度执行
+import time
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"  # 命中构建缓存等原因未实际执行，视同成功
+
+
+class PipelineError(ValueError):
+    """依赖声明有误（循环依赖或依赖的脚本不存在）"""
+
+
+def parse_list(value):
+    """将设置中的列表项（列表或逗号分隔的字符串，如依赖、输入文件）统一为列表"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace("，", ",").split(",")
+    return [name.strip() for name in value if name and name.strip()]
+
+
+def resolve_pipeline(target, depends_map, commands):
+    """返回目标脚本及其所有依赖，按拓扑顺序排列（依赖在前）"""
+    order = []
+    visiting = set()
+    visited = set()
+
+    def visit(name, path):
+        if name not in commands:
+            raise PipelineError(f"脚本「{path[-1]}」依赖的「{name}」不存在" if path else f"脚本「{name}」不存在")
+        if name in visited:
+            return
+        if name in visiting:
+            cycle = " → ".join(path[path.index(name):] + [name])
+            raise PipelineError(f"存在循环依赖：{cycle}")
+        visiting.add(name)
+        for dependency in depends_map.get(name, []):
+            visit(dependency, path + [name])
+        visiting.discard(name)
+        visited.add(name)
+        order.append(name)
+
+    visit(target, [])
+    return order
+
+
+class PipelinePlan:
+    """
+    一次流水线运行的状态
+    ready() 返回依赖已全部完成、可以并行启动的阶段；
+    某阶段失败后不再启动依赖它的阶段，resume() 可从失败处继续
+    options 为各阶段的脚本选项，workspace 与 root 为启动时的工作区及其根目录
+    """
+
+    def __init__(self, target, commands, depends_map, options=None, workspace="", root="", force=False):
+        self.target = target
+        self.stages = resolve_pipeline(target, depends_map, commands)
+        self.commands = {name: commands[name] for name in self.stages}
+        self.depends = {name: list(depends_map.get(name, [])) for name in self.stages}
+        self.options = {name: (options or {}).get(name, {}) for name in self.stages}
+        self.workspace = workspace
+        self.root = root
+        self.force = force  # 为 True 时忽略构建缓存
+        self.state = {name: PENDING for name in self.stages}
+        self.started_at = {}
+        self.finished_at = {}
+
+    def ready(self):
+        return [name for name in self.stages
+                if self.state[name] == PENDING
+                and all(self.state[dep] in (DONE, SKIPPED) for dep in self.depends[name])]
+
+    def start(self, name):
+        self.state[name] = RUNNING
+        self.started_at[name] = time.time()
+        self.finished_at.pop(name, None)
+
+    def finish(self, name, ok, skipped=False):
+        self.state[name] = SKIPPED if skipped else (DONE if ok else FAILED)
+        self.finished_at[name] = time.time()
+        self.started_at.setdefault(name, self.finished_at[name])
+
+    def duration(self, name):
+        if name not in self.started_at:
+            return None
+        return self.finished_at.get(name, time.time()) - self.started_at[name]
+
+    @property
+    def running(self):
+        return any(state == RUNNING for state in self.state.values())
+
+    @property
+    def failed(self):
+        return any(state == FAILED for state in self.state.values())
+
+    @property
+    def finished(self):
+        """没有正在运行且没有可启动的阶段"""
+        return not self.running and not self.ready()
+
+    @property
+    def succeeded(self):
+        return all(state in (DONE, SKIPPED) for state in self.state.values())
+
+    def refresh(self, commands, depends_map, options=None):
+        """
+        用最新的设置更新未完成阶段的命令与选项（修改失败的命令后继续时运行新命令），
+        阶段或依赖关系改变时抛出 PipelineError
+        """
+        stages = resolve_pipeline(self.target, depends_map, commands)
+        if set(stages) != set(self.stages) or any(
+                list(depends_map.get(name, [])) != self.depends[name] for name in stages):
+            raise PipelineError(f"「{self.target}」的依赖关系已修改，请重新运行")
+        for name in self.stages:
+            if self.state[name] not in (DONE, SKIPPED):
+                self.commands[name] = commands[name]
+                self.options[name] = (options or {}).get(name, {})
+
+    def resume(self):
+        """将失败的阶段重置为待执行，已完成的阶段保持不变"""
+        for name, state in self.state.items():
+            if state == FAILED:
+                self.state[name] = PENDING
@@ -0,0 +1,175 @@
+# 流水线执行器,通过 CommandExecutor 并行启动依赖已满足的阶段
+from PySide6.QtCore import QObject, QThread, Signal
+
+from .build_cache import check_build_cache, record_build
+from .command_executor import CommandExecutor
+from .pipeline import PipelineError, PipelinePlan, parse_list
+from .settings_manager import SettingsManager
+from .signal_bus import SignalBus
+
+signal_bus = SignalBus.get_instance()
+settings_manager = SettingsManager.get_instance()
+
+
+class TaskThread(QThread):
+    """在后台线程执行一个函数，完成后发出 result_ready(result)，抛出异常时发出 failed(错误信息)"""
+    result_ready = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, func, *args, parent=None):
+        super().__init__(parent)
+        self.func = func
+        self.args = args
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            self.failed.emit(f"{type(e).__name__}: {e}")
+            return
+        self.result_ready.emit(result)
+
+
+class PipelineRunner(QObject):
+    """
+    按脚本依赖运行流水线
+    每个工作区的每个目标脚本保留最近一次的 PipelinePlan，用于展示阶段耗时与从失败处继续
+    流水线启动时记录工作区的根目录与脚本选项，运行中切换工作区不影响后续阶段
+    """
+    _instance = None
+    pipeline_updated = Signal(str)  # 目标脚本名称
+
+    @classmethod
+    def get_instance(cls):
+        """静态方法获取单例实例"""
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self.executor = CommandExecutor.get_instance()
+        self.plans = {}  # (工作区, 目标脚本) -> PipelinePlan
+        self._jobs = {}  # job_id -> (plan, stage, fingerprint)
+        self._threads = set()
+        signal_bus.subscribe("process_finished", self._on_job_finished)
+
+    @staticmethod
+    def _depends_map(options):
+        return {name: parse_list(value.get("depends")) for name, value in options.items()}
+
+    def plan(self, target):
+        """当前工作区中目标脚本最近一次的流水线"""
+        return self.plans.get((settings_manager.workspace, target))
+
+    def run(self, target, force=False):
+        """运行目标脚本及其依赖；force 为 True 时忽略构建缓存"""
+        plan = self.plan(target)
+        if plan is not None and plan.running:
+            signal_bus.output_received.emit(f"流水线「{target}」正在运行", "error", "")
+            return None
+        options = settings_manager.script_options
+        try:
+            plan = PipelinePlan(target, settings_manager.script_commands, self._depends_map(options), options,
+                                settings_manager.workspace, settings_manager.blog_root, force)
+        except PipelineError as e:
+            signal_bus.output_received.emit(str(e), "error", "")
+            return None
+        self.plans[(plan.workspace, target)] = plan
+        if len(plan.stages) > 1:
+            signal_bus.output_received.emit(f"[流水线] {' → '.join(plan.stages)}", "system", "")
+        self._advance(plan)
+        return plan
+
+    def resume(self, target):
+        """从失败的阶段继续运行，未完成的阶段使用设置中最新的命令与选项"""
+        plan = self.plan(target)
+        if plan is None or plan.running or not plan.failed:
+            return self.run(target)
+        options = settings_manager.script_options
+        try:
+            plan.refresh(settings_manager.script_commands, self._depends_map(options), options)
+        except PipelineError as e:
+            signal_bus.output_received.emit(str(e), "error", "")
+            return None
+        plan.resume()
+        signal_bus.output_received.emit(f"[流水线] 从失败处继续「{target}」", "system", "")
+        self._advance(plan)
+        return plan
+
+    def _advance(self, plan):
+        """启动所有依赖已满足的阶段"""
+        for stage in plan.ready():
+            self._start_stage(plan, stage)
+        if plan.finished:
+            self._report(plan)
+        self.pipeline_updated.emit(plan.target)
+
+    def _run_in_thread(self, callback, on_error, func, *args):
+        thread = TaskThread(func, *args, parent=self)
+        thread.result_ready.connect(callback)
+        thread.failed.connect(on_error)
+        thread.finished.connect(lambda: self._threads.discard(thread))
+        thread.finished.connect(thread.deleteLater)
+        self._threads.add(thread)
+        thread.start()
+
+    def _start_stage(self, plan, stage):
+        plan.start(stage)
+        inputs = parse_list(plan.options[stage].get("inputs"))
+        if not inputs:
+            self._submit_stage(plan, stage, None)
+            return
+        # 声明了输入的脚本先在后台计算指纹，判断能否跳过
+        outputs = parse_list(plan.options[stage].get("outputs"))
+        self._run_in_thread(lambda result: self._on_cache_checked(plan, stage, *result),
+                            lambda message: self._on_cache_error(plan, stage, message),
+                            check_build_cache, plan.root, stage, inputs, outputs, plan.commands[stage])
+
+    def _on_cache_checked(self, plan, stage, hit, fingerprint):
+        if hit and not plan.force:
+            signal_bus.output_received.emit(f"[缓存命中] 输入未变化，跳过「{stage}」", "system", "")
+            plan.finish(stage, True, skipped=True)
+            self._advance(plan)
+        else:
+            self._submit_stage(plan, stage, fingerprint)
+
+    def _on_cache_error(self, plan, stage, message):
+        """构建缓存损坏等异常时视为未命中，照常运行（成功后也不记录指纹）"""
+        signal_bus.output_received.emit(f"[缓存不可用] {message}，运行「{stage}」", "warning", "")
+        self._submit_stage(plan, stage, None)
+
+    def _submit_stage(self, plan, stage, fingerprint):
+        exclusive = bool(plan.options[stage].get("exclusive", False))
+        workspace = plan.workspace if len(settings_manager.workspace_names()) > 1 else ""
+        job_id = self.executor.submit(plan.commands[stage], stage, exclusive, plan.root, workspace)
+        self._jobs[job_id] = (plan, stage, fingerprint)
+
+    def _on_job_finished(self, job_id, exit_code):
+        entry = self._jobs.pop(job_id, None)
+        if entry is None:
+            return
+        plan, stage, fingerprint = entry
+        if exit_code == 0 and fingerprint is not None:
+            # 成功后记录指纹与输出签名，再继续后续阶段
+            outputs = parse_list(plan.options[stage].get("outputs"))
+            # 记录失败只影响下次是否命中，阶段仍然成功
+            self._run_in_thread(lambda _: self._finish_stage(plan, stage, True),
+                                lambda _: self._finish_stage(plan, stage, True),
+                                record_build, plan.root, stage, fingerprint, outputs)
+        else:
+            self._finish_stage(plan, stage, exit_code == 0)
+
+    def _finish_stage(self, plan, stage, ok):
+        plan.finish(stage, ok)
+        self._advance(plan)
+
+    def _report(self, plan):
+        if len(plan.stages) == 1:
+            return
+        timings = "，".join(f"{stage} {plan.duration(stage) or 0:.1f}s" for stage in plan.stages
+                           if plan.duration(stage) is not None)
+        if plan.succeeded:
+            signal_bus.output_received.emit(f"[流水线完成] {timings}", "system", "")
+        elif plan.failed:
+            signal_bus.output_received.emit(f"[流水线失败] {timings}，可从失败处继续", "error", "")
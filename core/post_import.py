@@ -0,0 +1,173 @@
+# 批量生成文章：读取 CSV/JSON 行，用编译后的模板渲染，每个目录只列一次分配不重名的文件名，多线程写入
+import csv
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from .template import compile_template, default_values
+
+# 写入文件的线程数（写小文件主要是等待 I/O）
+IMPORT_WORKERS = 8
+# 进度最多回报的次数
+PROGRESS_STEPS = 100
+# 有特殊含义的列：body/content 为正文，dir 为相对目标目录的子目录，filename 为文件名（不含扩展名）
+BODY_COLUMNS = ("body", "content")
+RESERVED_COLUMNS = frozenset(BODY_COLUMNS + ("dir", "filename"))
+
+ImportResult = namedtuple("ImportResult", ["created", "errors"])  # errors: [(行号, 错误信息)]
+
+
+def safe_filename(title):
+    """去除文件名中的非法字符，为空时使用时间"""
+    name = re.sub(r'[\\/*?:"<>|\r\n\t]', "", str(title).strip()).strip(". ")
+    return name or datetime.now().strftime("新建文章-%Y%m%d%H%M")
+
+
+def read_rows(path):
+    """读取 CSV（首行为列名）或 JSON（对象数组，或 {"posts": [...]}），返回 dict 列表"""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("posts", [])
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ValueError("JSON 应为对象数组，或包含 posts 数组的对象")
+        return data
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        try:
+            return [{key: value for key, value in row.items() if key} for row in csv.DictReader(f)]
+        except csv.Error as e:
+            raise ValueError(f"CSV 格式错误：{e}") from e
+
+
+class NameAllocator:
+    """
+    在内存中分配不重名的文件名：每个目录只列一次（不逐个 os.path.exists），
+    同名的标题记住下一个序号，之后按 名称-1、名称-2 ... 依次分配；可在多个线程中使用
+    文件名按小写比较，避免在不区分大小写的文件系统上冲突
+    """
+
+    def __init__(self):
+        self._taken = {}  # 目录 -> 已存在或已分配的文件名（小写）
+        self._next = {}  # (目录, 小写名称) -> 下一个序号
+        self._lock = threading.Lock()
+
+    def _names(self, directory):
+        taken = self._taken.get(directory)
+        if taken is None:
+            try:
+                taken = {name.lower() for name in os.listdir(directory)}
+            except OSError:
+                taken = set()
+            self._taken[directory] = taken
+        return taken
+
+    def allocate(self, directory, base, extension=".md"):
+        with self._lock:
+            taken = self._names(directory)
+            key = (directory, base.lower())
+            counter = self._next.get(key, 0)
+            name = f"{base}{extension}" if not counter else f"{base}-{counter}{extension}"
+            while name.lower() in taken:
+                counter += 1
+                name = f"{base}-{counter}{extension}"
+            self._next[key] = counter + 1
+            taken.add(name.lower())
+            return os.path.join(directory, name)
+
+
+def write_new_file(path, content, allocator=None, directory=None, base=None):
+    """以独占模式写入；文件已被其他进程创建时重新分配文件名，返回实际路径"""
+    while True:
+        try:
+            with open(path, "x", encoding="utf-8") as f:
+                f.write(content)
+            return path
+        except FileExistsError:
+            if allocator is None:
+                raise
+            path = allocator.allocate(directory, base)
+
+
+def column_names(rows):
+    """数据集中出现过的全部列名（小写）"""
+    return {str(key).strip().lower() for row in rows for key in row}
+
+
+def prepare_row(row, template, columns=()):
+    """
+    一行数据 -> (变量, 额外的 front matter, 正文)
+    列名不区分大小写；模板中没有引用、也不是保留列的列写入 front matter
+    columns 中的列在本行缺少或为空时按空字符串渲染，不会在文章中留下 $TAGS$ 这样的占位符
+    """
+    values = {str(key).strip().lower(): value for key, value in row.items() if value is not None and value != ""}
+    body = next((values[name] for name in BODY_COLUMNS if name in values and name not in template.variables), None)
+    extra = {key: value for key, value in values.items()
+             if key not in template.variables and key not in RESERVED_COLUMNS and key != "time"}
+    return {**dict.fromkeys(columns, ""), **values}, extra, body
+
+
+def import_posts(rows, target_dir, template_text, progress=None, cancelled=None, workers=IMPORT_WORKERS):
+    """
+    按模板为每一行生成一篇文章，返回 ImportResult
+    progress(已完成, 总数) 最多调用约 PROGRESS_STEPS 次；cancelled() 返回 True 时不再写入剩余的文章
+    文件名按行的顺序分配，与写入完成的先后无关
+    """
+    template = compile_template(template_text)
+    rows = list(rows)
+    defaults = default_values("")
+    # 内置变量为空时仍使用默认值
+    columns = column_names(rows) - set(defaults)
+    allocator = NameAllocator()
+    tasks = []
+    errors = []
+    directories = set()
+    for number, row in enumerate(rows, 1):
+        values, extra, body = prepare_row(row, template, columns)
+        title = str(values.get("title") or values.get("filename") or "未命名文章")
+        values = {**defaults, **values, "title": title}
+        directory = os.path.normpath(os.path.join(target_dir, str(values.get("dir", ""))))
+        if directory != os.path.normpath(target_dir) and not directory.startswith(
+                os.path.join(os.path.normpath(target_dir), "")):
+            errors.append((number, f"目录超出目标目录：{values['dir']}"))
+            continue
+        if directory not in directories:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                errors.append((number, str(e)))
+                continue
+            directories.add(directory)
+        base = safe_filename(values.get("filename") or title)
+        tasks.append((number, directory, base, allocator.allocate(directory, base), values, extra, body))
+
+    def write(task):
+        number, directory, base, path, values, extra, body = task
+        content = template.render(values, extra)
+        if body is not None:
+            content = f"{content.rstrip()}\n\n{body}\n"
+        return write_new_file(path, content, allocator, directory, base)
+
+    created = []
+    total = len(tasks)
+    step = max(1, total // PROGRESS_STEPS)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(write, task): task[0] for task in tasks}
+        for done, future in enumerate(as_completed(futures), 1):
+            if future.cancelled():
+                continue
+            try:
+                created.append(future.result())
+            except OSError as e:
+                errors.append((futures[future], str(e)))
+            if progress is not None and (done % step == 0 or done == total):
+                progress(done, total)
+            if cancelled is not None and cancelled():
+                for pending in futures:
+                    pending.cancel()
+    errors.sort()
+    return ImportResult(created, errors)
@@ -0,0 +1,299 @@
+# 文章元数据索引,解析 .md 文件的 YAML front matter 并保存到本地 SQLite
+import hashlib
+import json
+import os
+import sqlite3
+from collections import namedtuple
+from datetime import date, datetime
+from functools import partial
+
+from .links import extract_links, link_variants
+from .search_index import BODY_LIMIT, build_query, index_text
+from .utils import normalize_path, user_config_dir
+
+PostMeta = namedtuple("PostMeta", ["path", "title", "date", "tags"])
+
+# 数据库结构版本，升级时清空旧数据触发重新解析
+SCHEMA_VERSION = 3
+# 每个解析进程至少分到的文件数：子进程启动约 0.1 s，相当于串行解析两三百篇文章，
+# 不足两个进程的工作量时直接在当前线程解析
+PARALLEL_THRESHOLD = 512
+
+
+def _scalar(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _simple_yaml(text):
+    """未安装 PyYAML 时使用的简易解析，支持 key: value、[a, b] 与 - item 列表"""
+    result = {}
+    current_key = None
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        stripped = line.strip()
+        if stripped.startswith("- ") and current_key is not None:
+            if not isinstance(result.get(current_key), list):
+                result[current_key] = []
+            result[current_key].append(_scalar(stripped[2:]))
+            continue
+        if ":" not in line or line[0].isspace():
+            continue
+        key, value = line.split(":", 1)
+        current_key = key.strip()
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            result[current_key] = [_scalar(item) for item in value[1:-1].split(",") if item.strip()]
+        else:
+            result[current_key] = _scalar(value)
+    return result
+
+
+def parse_front_matter(text):
+    """解析文本开头 --- 包围的 front matter，返回 dict"""
+    if not text.startswith("---"):
+        return {}
+    end = text.find("\n---", 3)
+    if end == -1:
+        return {}
+    block = text[3:end]
+    try:
+        import yaml
+        data = yaml.safe_load(block)
+        return data if isinstance(data, dict) else {}
+    except ImportError:
+        return _simple_yaml(block)
+    except Exception:
+        return _simple_yaml(block)
+
+
+def _normalize_tags(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [tag.strip() for tag in value.split(",") if tag.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(tag).strip() for tag in value if str(tag).strip()]
+    return [str(value)]
+
+
+def _normalize_date(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return str(value) if value else ""
+
+
+def read_post_metadata(path, root=None):
+    """
+    读取单个文件的元数据、检索文本与站内链接（root 为解析 / 开头链接的博客根目录）
+    返回 (path, mtime_ns, size, title, date, tags, search_text, links)；文件不可读返回 None
+    """
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            content = f.read(BODY_LIMIT)
+    except OSError:
+        return None
+    text = content.decode("utf-8", errors="replace").lstrip("\ufeff")
+    meta = parse_front_matter(text)
+    title = meta.get("title")
+    title = str(title) if title else os.path.splitext(os.path.basename(path))[0]
+    tags = _normalize_tags(meta.get("tags"))
+    # 分词在工作进程中完成，主进程只负责写库
+    search_text = index_text(" ".join([title, " ".join(tags), text]))
+    links = extract_links(text, path, root or os.path.dirname(path))
+    return path, stat.st_mtime_ns, stat.st_size, title, _normalize_date(meta.get("date")), tags, search_text, links
+
+
+class PostIndex:
+    """
+    按博客根目录保存的文章元数据库
+    以 (path, mtime, size) 判断文件是否变化，只重新解析变化的文件
+    """
+
+    def __init__(self, root_path, db_path=None):
+        self.root = normalize_path(root_path)
+        if db_path is None:
+            key = hashlib.sha1(self.root.encode("utf-8")).hexdigest()
+            directory = os.path.join(user_config_dir(), "post_index")
+            os.makedirs(directory, exist_ok=True)
+            db_path = os.path.join(directory, f"{key}.sqlite3")
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS posts")
+            self.conn.execute("DROP TABLE IF EXISTS posts_fts")
+            self.conn.execute("DROP TABLE IF EXISTS links")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS posts (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                date TEXT NOT NULL,
+                tags TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS posts_date ON posts(date)")
+        # 全文索引：写入前已按 CJK 二元组分词，detail=column 不保存词位置以减小体积
+        self.conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                title, body,
+                tokenize = 'unicode61 remove_diacritics 0', detail = column
+            )
+        """)
+        # 反向链接：文章（source）引用的站内路径（target），按 target 查询引用某个文件或目录的文章
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS links (
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                PRIMARY KEY (source, target)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS links_target ON links(target)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _stale_paths(self, paths):
+        """返回 mtime/size 与数据库记录不一致的文件"""
+        known = {path: (mtime, size) for path, mtime, size in
+                 self.conn.execute("SELECT path, mtime_ns, size FROM posts")}
+        stale = []
+        missing = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                missing.append(path)
+                continue
+            if known.get(path) != (stat.st_mtime_ns, stat.st_size):
+                stale.append(path)
+        return stale, missing
+
+    def _parse(self, paths):
+        read = partial(read_post_metadata, root=self.root)
+        workers = min(os.cpu_count() or 1, len(paths) // PARALLEL_THRESHOLD)
+        if workers < 2:
+            return [read(path) for path in paths]
+        # 进程池按需导入，命令行只查询时不必加载
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        # 使用 spawn 避免在多线程的 Qt 进程中 fork
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                return list(pool.map(read, paths, chunksize=64))
+        except (BrokenProcessPool, OSError):
+            # 进程池不可用（如被打包的环境限制）时退化为串行解析
+            return [read(path) for path in paths]
+
+    def _store(self, rows):
+        """写入元数据；UPSERT 保持 rowid 不变，全文索引与之共用 rowid"""
+        self.conn.executemany("""
+            INSERT INTO posts (path, mtime_ns, size, title, date, tags) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size,
+                title = excluded.title, date = excluded.date, tags = excluded.tags
+        """, [(path, mtime, size, title, date_text, json.dumps(tags, ensure_ascii=False))
+              for path, mtime, size, title, date_text, tags, _, _ in rows])
+        for path, _, _, title, _, _, search_text, links in rows:
+            rowid = self.conn.execute("SELECT rowid FROM posts WHERE path = ?", (path,)).fetchone()[0]
+            self.conn.execute("INSERT OR REPLACE INTO posts_fts (rowid, title, body) VALUES (?, ?, ?)",
+                              (rowid, index_text(title), search_text))
+            self.conn.execute("DELETE FROM links WHERE source = ?", (path,))
+            self.conn.executemany("INSERT OR IGNORE INTO links (source, target) VALUES (?, ?)",
+                                  [(path, target) for target in links])
+
+    def _delete(self, paths):
+        for path in paths:
+            row = self.conn.execute("SELECT rowid FROM posts WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                self.conn.execute("DELETE FROM posts_fts WHERE rowid = ?", row)
+                self.conn.execute("DELETE FROM posts WHERE rowid = ?", row)
+            self.conn.execute("DELETE FROM links WHERE source = ?", (path,))
+
+    def refresh(self, paths):
+        """增量刷新指定文件，返回发生变化的文件"""
+        paths = [normalize_path(path) for path in paths]
+        stale, missing = self._stale_paths(paths)
+        rows = [row for row in self._parse(stale) if row is not None]
+        with self.conn:
+            self._store(rows)
+            self._delete(missing)
+        return [row[0] for row in rows] + missing
+
+    def sync(self, paths):
+        """与完整的文件列表同步：刷新变化的文件并删除已不存在的记录"""
+        paths = {normalize_path(path) for path in paths}
+        known = {path for path, in self.conn.execute("SELECT path FROM posts")}
+        removed = known - paths
+        with self.conn:
+            self._delete(removed)
+        return self.refresh(paths) + list(removed)
+
+    def all_metadata(self):
+        """返回 path -> PostMeta"""
+        return {
+            path: PostMeta(path, title, date_text, tuple(json.loads(tags)))
+            for path, title, date_text, tags in self.conn.execute("SELECT path, title, date, tags FROM posts")
+        }
+
+    def search(self, text, limit=50):
+        """全文检索，按 bm25 相关度排序（标题权重更高），返回 PostMeta 列表"""
+        query = build_query(text)
+        if not query:
+            return []
+        rows = self.conn.execute("""
+            SELECT p.path, p.title, p.date, p.tags
+            FROM posts_fts f JOIN posts p ON p.rowid = f.rowid
+            WHERE posts_fts MATCH ?
+            ORDER BY bm25(posts_fts, 5.0, 1.0)
+            LIMIT ?
+        """, (query, limit))
+        return [PostMeta(path, title, date_text, tuple(json.loads(tags))) for path, title, date_text, tags in rows]
+
+    def backlinks(self, path):
+        """引用该文件（包括省略 .md 或写成 .html 的链接）的文章，path 为目录时包括引用其中任何文件的文章"""
+        return sorted(self.referrers([path]))
+
+    def referrers(self, paths):
+        """
+        引用 paths 中任一文件或目录（及其子路径）的文章，只走 target 索引，
+        耗时与引用数量成正比，不需要扫描整个站点
+        """
+        sources = set()
+        for path in paths:
+            key, lower, upper = _prefix_range(path)
+            for variant in link_variants(key):
+                sources.update(source for source, in self.conn.execute(
+                    "SELECT source FROM links WHERE target = ?", (variant,)))
+            sources.update(source for source, in self.conn.execute(
+                "SELECT source FROM links WHERE target > ? AND target < ?", (lower, upper)))
+        return sources
+
+    def posts_in(self, paths, with_links=False):
+        """位于 paths 中（本身或目录之下）的文章；with_links 时只返回包含站内链接的文章"""
+        table, column = ("links", "source") if with_links else ("posts", "path")
+        posts = set()
+        for path in paths:
+            key, lower, upper = _prefix_range(path)
+            posts.update(row for row, in self.conn.execute(
+                f"SELECT DISTINCT {column} FROM {table} WHERE {column} = ? OR ({column} > ? AND {column} < ?)",
+                (key, lower, upper)))
+        return posts
+
+
+def _prefix_range(path):
+    """(规范化的路径, 子路径的下界, 上界)：分隔符的下一个字符作为上界，范围查询可以使用索引"""
+    key = normalize_path(path)
+    prefix = key.rstrip(os.sep) + os.sep
+    return key, prefix, prefix[:-1] + chr(ord(os.sep) + 1)
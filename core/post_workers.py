@@ -0,0 +1,55 @@
+# 文章的后台线程：更新元数据库与从 CSV/JSON 批量生成文章，具体逻辑在 post_index 与 post_import 中
+from PySide6.QtCore import QThread, Signal
+
+from .post_import import import_posts, read_rows
+from .post_index import PostIndex
+
+
+class PostIndexUpdater(QThread):
+    """后台线程更新文章元数据库，完成后发出 metadata_ready(dict[path, PostMeta])"""
+    metadata_ready = Signal(object)
+
+    def __init__(self, root_path, paths, full_sync=True, parent=None):
+        super().__init__(parent)
+        self.root_path = root_path
+        self.paths = list(paths)
+        self.full_sync = full_sync
+
+    def run(self):
+        index = PostIndex(self.root_path)
+        try:
+            if self.full_sync:
+                index.sync(self.paths)
+            else:
+                index.refresh(self.paths)
+            metadata = index.all_metadata()
+        finally:
+            index.close()
+        if not self.isInterruptionRequested():
+            self.metadata_ready.emit(metadata)
+
+
+class PostImporter(QThread):
+    """
+    后台线程从 CSV/JSON 批量生成文章
+    写入过程中发出 progress(已完成, 总数)，结束后发出 import_finished(ImportResult)，读取失败时发出 failed(错误信息)
+    """
+    progress = Signal(int, int)
+    import_finished = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, source_path, target_dir, template_text, parent=None):
+        super().__init__(parent)
+        self.source_path = source_path
+        self.target_dir = target_dir
+        self.template_text = template_text
+
+    def run(self):
+        try:
+            rows = read_rows(self.source_path)
+        except (OSError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        result = import_posts(rows, self.target_dir, self.template_text,
+                              progress=self.progress.emit, cancelled=self.isInterruptionRequested)
+        self.import_finished.emit(result)
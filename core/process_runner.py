@@ -0,0 +1,164 @@
+# 基于 subprocess 的命令执行,供命令行运行脚本与流水线
+import os
+import queue
+import subprocess
+import sys
+import threading
+from collections import deque
+
+from .build_cache import check_build_cache, record_build
+from .pipeline import parse_list
+from .resource_usage import format_usage, resource_monitor
+from .run_history import RunHistory
+from .utils import StreamDecoder
+
+
+def shell_command(command):
+    """根据系统选择 shell，返回完整的参数列表"""
+    if sys.platform == "win32":
+        return ["cmd", "/c", command]
+    return ["bash", "-c", command]
+
+
+def process_environment():
+    """继承系统环境变量，Windows 下强制子进程输出 UTF-8"""
+    env = dict(os.environ)
+    if sys.platform == "win32":
+        env["PYTHONIOENCODING"] = "utf-8"
+        env["PYTHONUTF8"] = "1"
+    return env
+
+
+def _pump(process, stream, msg_type, on_output):
+    """逐行读取输出流并解码，编码只检测一次"""
+    decoder = StreamDecoder()
+    for raw_line in iter(stream.readline, b""):
+        process.output_bytes += len(raw_line)
+        text = decoder.decode(raw_line)
+        if text:
+            on_output(text, msg_type)
+    rest = decoder.flush()
+    if rest:
+        on_output(rest, msg_type)
+    stream.close()
+
+
+class CommandProcess:
+    """
+    一个子进程，stdout/stderr 由后台线程读取并回调 on_output(text, type)
+    结束后 usage 为资源统计（ResourceUsage），output_bytes 为输出的字节数
+    """
+
+    def __init__(self, command, cwd, on_output):
+        self.command = command
+        self.output_bytes = 0
+        self.process = subprocess.Popen(
+            shell_command(command), cwd=cwd, env=process_environment(),
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.usage = resource_monitor.track(self.process.pid)
+        self.threads = [
+            threading.Thread(target=_pump, args=(self, self.process.stdout, "output", on_output), daemon=True),
+            threading.Thread(target=_pump, args=(self, self.process.stderr, "error", on_output), daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def wait(self):
+        """等待进程结束并读完输出，返回退出码"""
+        if hasattr(os, "waitid"):
+            # 等待进程退出但暂不回收，此时还能从 /proc 读到包含全部子进程的最终 CPU 时间
+            try:
+                os.waitid(os.P_PID, self.process.pid, os.WEXITED | os.WNOWAIT)
+            except ChildProcessError:
+                pass
+            resource_monitor.sample()
+        exit_code = self.process.wait()
+        resource_monitor.untrack(self.usage)
+        for thread in self.threads:
+            thread.join()
+        return exit_code
+
+    def terminate(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=0.5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def run_command(command, cwd, on_output):
+    """同步执行命令，返回退出码"""
+    process = CommandProcess(command, cwd, on_output)
+    try:
+        return process.wait()
+    except KeyboardInterrupt:
+        process.terminate()
+        raise
+
+
+def run_plan(plan, cwd, script_option, on_output, force=False):
+    """
+    在当前线程驱动一条流水线（PipelinePlan），依赖已满足的阶段并行执行
+    - 独占脚本之间排队执行
+    - 声明了 inputs 的脚本命中构建缓存时跳过，force 为 True 时忽略缓存
+    on_output(stage, text, type) 在读取线程中回调；返回流水线是否全部成功
+    每个阶段的耗时与资源占用记入运行历史
+    """
+    history = RunHistory()
+    finished = queue.Queue()
+    processes = {}
+    exclusive_queue = deque()
+    exclusive_running = None
+
+    def launch(stage, fingerprint):
+        nonlocal exclusive_running
+        if script_option(stage, "exclusive", False):
+            exclusive_running = stage
+        process = CommandProcess(plan.commands[stage], cwd, lambda text, kind: on_output(stage, text, kind))
+        processes[stage] = process
+
+        def wait():
+            finished.put((stage, process.wait(), fingerprint))
+        threading.Thread(target=wait, daemon=True).start()
+
+    try:
+        while not plan.finished:
+            skipped = False
+            for stage in plan.ready():
+                plan.start(stage)
+                fingerprint = None
+                inputs = parse_list(script_option(stage, "inputs"))
+                if inputs:
+                    outputs = parse_list(script_option(stage, "outputs"))
+                    hit, fingerprint = check_build_cache(cwd, stage, inputs, outputs, plan.commands[stage])
+                    if hit and not force:
+                        on_output(stage, f"[缓存命中] 输入未变化，跳过「{stage}」\n", "system")
+                        plan.finish(stage, True, skipped=True)
+                        skipped = True
+                        continue
+                on_output(stage, f"> {plan.commands[stage]}\n", "input")
+                if script_option(stage, "exclusive", False) and exclusive_running is not None:
+                    exclusive_queue.append((stage, fingerprint))
+                else:
+                    launch(stage, fingerprint)
+            if skipped:
+                # 跳过的阶段可能让后续阶段就绪
+                continue
+            stage, exit_code, fingerprint = finished.get()
+            process = processes.pop(stage)
+            if exit_code == 0 and fingerprint is not None:
+                record_build(cwd, stage, fingerprint, parse_list(script_option(stage, "outputs")))
+            history.record(cwd, stage, process.command, process.usage, exit_code, process.output_bytes, source="cli")
+            on_output(stage, f"[进程结束，退出码 {exit_code}，{format_usage(process.usage, process.output_bytes)}]\n",
+                      "system")
+            plan.finish(stage, exit_code == 0)
+            if stage == exclusive_running:
+                exclusive_running = None
+                if exclusive_queue:
+                    launch(*exclusive_queue.popleft())
+    except KeyboardInterrupt:
+        for process in processes.values():
+            process.terminate()
+        raise
+    return plan.succeeded
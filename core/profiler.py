@@ -0,0 +1,77 @@
+# 启动耗时分析,记录启动各阶段的耗时
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from .utils import user_config_dir
+
+# 设置该环境变量（或以 --profile-startup 启动）时，启动完成后输出各阶段耗时
+PROFILE_ENV = "SBA_PROFILE_STARTUP"
+
+
+class StartupProfiler:
+    """
+    记录启动各阶段（导入、读取设置、构建控件、首次绘制等）的耗时
+    phase() 统计一段代码的耗时，可以嵌套；mark() 记录某个时间点
+    所有时间都相对于本模块被导入的时刻
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.records = []  # [name, depth, start, duration]，mark 的 duration 为 None
+        self.finished = False
+        self._depth = 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def phase(self, name):
+        record = [name, self._depth, self.elapsed(), None]
+        self.records.append(record)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record[3] = self.elapsed() - record[2]
+
+    def mark(self, name):
+        """记录只发生一次的时间点，重复调用时忽略"""
+        if not any(record[0] == name and record[3] is None for record in self.records):
+            self.records.append([name, self._depth, self.elapsed(), None])
+
+    def to_dict(self):
+        return {
+            "total_ms": round(self.elapsed() * 1000, 2),
+            "python": sys.version.split()[0],
+            "records": [
+                {"name": name, "depth": depth, "start_ms": round(start * 1000, 2),
+                 "duration_ms": None if duration is None else round(duration * 1000, 2)}
+                for name, depth, start, duration in self.records
+            ],
+        }
+
+    def report(self):
+        """按时间顺序输出各阶段：开始时刻、耗时（时间点只有开始时刻）"""
+        lines = ["启动耗时（开始时刻 / 耗时）："]
+        for name, depth, start, duration in self.records:
+            cost = "   ·   " if duration is None else f"{duration * 1000:7.1f}"
+            lines.append(f"{start * 1000:8.1f} ms {cost} ms  {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+    def dump(self, path=None):
+        """写入 JSON，返回文件路径"""
+        path = path or os.path.join(user_config_dir(), "startup_profile.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+
+def profiling_requested(argv=None):
+    return "--profile-startup" in (sys.argv if argv is None else argv) or bool(os.environ.get(PROFILE_ENV))
+
+
+startup_profiler = StartupProfiler()
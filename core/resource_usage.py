@@ -0,0 +1,212 @@
+# 命令的资源统计：在 Linux 上定时读取 /proc，累计进程及其全部子进程的 CPU 时间与峰值内存
+import os
+import threading
+import time
+
+# 采样间隔（秒）；进程被回收后读不到 /proc，CPU 时间取最后一次采样，误差不超过一个间隔
+SAMPLE_INTERVAL = 0.2
+# children 文件中找不到已被过继的进程：每隔几次采样扫描一遍 /proc，找出进程组中新出现的成员，
+# 之后的采样通过记录的进程号继续统计
+GROUP_SCAN_SAMPLES = 5
+
+_PROC = "/proc"
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = _PAGE_SIZE = None
+
+
+def proc_available():
+    return _CLOCK_TICKS is not None and os.path.isdir(os.path.join(_PROC, "self"))
+
+
+def _children_files_available():
+    """内核提供 /proc/<pid>/task/<tid>/children 时只需读取子孙进程，不必扫描全部进程"""
+    pid = str(os.getpid())
+    return os.path.exists(os.path.join(_PROC, pid, "task", pid, "children"))
+
+
+def _children(pid):
+    children = []
+    try:
+        for tid in os.listdir(os.path.join(_PROC, pid, "task")):
+            with open(os.path.join(_PROC, pid, "task", tid, "children"), "rb") as f:
+                children.extend(f.read().decode().split())
+    except OSError:
+        pass
+    return children
+
+
+def _read_stat(pid):
+    """返回 (ppid, pgrp, cpu 秒, rss 字节)；进程已退出时返回 None"""
+    try:
+        with open(os.path.join(_PROC, pid, "stat"), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # 进程名可能包含空格与括号，从最后一个 ')' 之后开始解析
+    fields = data[data.rfind(b")") + 2:].split()
+    try:
+        ppid, pgrp = int(fields[1]), int(fields[2])
+        # utime stime cutime cstime：包括已被回收的子进程
+        ticks = int(fields[11]) + int(fields[12]) + int(fields[13]) + int(fields[14])
+        rss = int(fields[21]) * _PAGE_SIZE
+    except (IndexError, ValueError):
+        return None
+    return ppid, pgrp, ticks / _CLOCK_TICKS, rss
+
+
+class ResourceUsage:
+    """一个命令（进程及其子进程）的资源统计，cpu_time 与 peak_rss 在不支持 /proc 的系统上为 None"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.started_at = time.time()
+        self.finished_at = None
+        self.cpu_time = None
+        self.peak_rss = None
+        self.processes = 0  # 观察到的进程数（含子进程）
+        self._seen = set()
+
+    @property
+    def wall_time(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+    def update(self, cpu_time, rss, pids):
+        # 子进程退出且未被组内进程回收时 CPU 总和会下降，保留最大值
+        self.cpu_time = max(self.cpu_time or 0.0, cpu_time)
+        self.peak_rss = max(self.peak_rss or 0, rss)
+        self._seen.update(pids)
+        self.processes = len(self._seen)
+
+
+class ResourceMonitor:
+    """
+    统一的采样线程（全局唯一 resource_monitor），同时跟踪多个命令
+    每次采样汇总根进程的进程组：根进程及其子孙进程，以及已被过继但仍在组内的进程
+    子孙进程优先通过 children 文件查找，否则扫描一遍 /proc
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.tracked = {}  # pid -> ResourceUsage
+        self._wake = threading.Event()
+        self._thread = None
+        self._children_files = None
+        self._samples = 0
+
+    def track(self, pid):
+        usage = ResourceUsage(pid)
+        if not pid or not proc_available():
+            return usage
+        with self.lock:
+            self.tracked[pid] = usage
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ResourceMonitor", daemon=True)
+                self._thread.start()
+        self.sample()
+        return usage
+
+    def untrack(self, usage):
+        """停止跟踪并返回最终统计（进程刚退出时已读不到它的 /proc，使用最后一次采样）"""
+        with self.lock:
+            self.tracked.pop(usage.pid, None)
+        usage.finished_at = time.time()
+        return usage
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            with self.lock:
+                if not self.tracked:
+                    self._thread = None
+                    return
+            self.sample()
+
+    def sample(self):
+        with self.lock:
+            roots = dict(self.tracked)
+        if not roots:
+            return
+        if self._children_files is None:
+            self._children_files = _children_files_available()
+        self._samples += 1
+        if self._children_files and self._samples % GROUP_SCAN_SAMPLES:
+            for root, usage in roots.items():
+                # list(set) 在持有 GIL 时一次完成，采样线程与 track 同时采样也安全
+                self._update(usage, self._walk_children(str(root), list(usage._seen)))
+        else:
+            self._scan_all(roots)
+
+    @staticmethod
+    def _walk_children(root, seen=()):
+        """
+        根进程的子孙进程；之前采样到的进程被过继后（如转入后台的开发服务器）不再出现在 children 中，
+        仍在根进程的进程组中时连同其子孙一起统计，与扫描 /proc 的结果一致
+        """
+        group = int(root)
+        stats = {}
+        # (pid, 是否需要检查进程组)，根进程最先处理，仍是子孙的进程不重复检查
+        pending = [(pid, True) for pid in seen if pid != root] + [(root, False)]
+        while pending:
+            pid, orphan = pending.pop()
+            if pid in stats:
+                continue
+            stat = _read_stat(pid)
+            if stat is None or (orphan and stat[1] != group):
+                continue
+            stats[pid] = stat
+            pending.extend((child, False) for child in _children(pid))
+        return stats
+
+    def _scan_all(self, roots):
+        try:
+            pids = [name for name in os.listdir(_PROC) if name.isdigit()]
+        except OSError:
+            return
+        stats = {}
+        children = {}
+        for pid in pids:
+            stat = _read_stat(pid)
+            if stat is not None:
+                stats[pid] = stat
+                children.setdefault(str(stat[0]), []).append(pid)
+        for root, usage in roots.items():
+            # 根进程的子孙进程，以及仍在同一进程组中的孤儿进程
+            pending = [str(root)] + [pid for pid, stat in stats.items() if stat[1] == root]
+            members = {}
+            while pending:
+                pid = pending.pop()
+                if pid in stats and pid not in members:
+                    members[pid] = stats[pid]
+                    pending.extend(children.get(pid, ()))
+            self._update(usage, members)
+
+    @staticmethod
+    def _update(usage, stats):
+        if stats:
+            usage.update(sum(stat[2] for stat in stats.values()), sum(stat[3] for stat in stats.values()), stats)
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_usage(usage, output_bytes=None):
+    """例如：用时 94.1 s，CPU 120.3 s，峰值内存 512.0 MB，输出 1.2 MB"""
+    parts = [f"用时 {usage.wall_time:.1f} s"]
+    if usage.cpu_time is not None:
+        parts.append(f"CPU {usage.cpu_time:.1f} s")
+    if usage.peak_rss:
+        parts.append(f"峰值内存 {format_bytes(usage.peak_rss)}")
+    if output_bytes is not None:
+        parts.append(f"输出 {format_bytes(output_bytes)}")
+    return "，".join(parts)
+
+
+resource_monitor = ResourceMonitor()
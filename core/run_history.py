@@ -0,0 +1,142 @@
+# 运行历史：每次执行命令的耗时与资源占用保存在配置目录的 SQLite 数据库中
+import os
+import sqlite3
+import time
+
+from .utils import normalize_path, user_config_dir
+
+DAY = 24 * 3600
+# 趋势对比：最近一次运行与同一博客上周同名脚本成功运行的中位数比较，没有上周数据时与之前最近几次比较
+RECENT_RUNS = 10
+# 变化小于该比例时视为持平
+TREND_TOLERANCE = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    command TEXT NOT NULL,
+    source TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    wall_time REAL NOT NULL,
+    cpu_time REAL,
+    peak_rss INTEGER,
+    output_bytes INTEGER,
+    exit_code INTEGER NOT NULL
+);
+"""
+# 运行记录按博客根目录区分，不同工作区的同名脚本不混在一起统计
+_INDEX = """
+DROP INDEX IF EXISTS runs_name_started;
+CREATE INDEX IF NOT EXISTS runs_root_name_started ON runs (root, name, started_at);
+"""
+
+
+def history_path():
+    return os.path.join(user_config_dir(), "history.sqlite3")
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+class RunHistory:
+    """
+    运行历史数据库，图形界面与命令行共用
+    每次操作打开一个连接，WAL 模式下写入不等待磁盘同步，多个进程同时写入也安全
+    """
+
+    def __init__(self, path=None):
+        self.path = path or history_path()
+        self._initialized = False
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(runs)")}
+            if "root" not in columns:
+                # 旧版本的记录没有根目录，不计入任何工作区
+                connection.execute("ALTER TABLE runs ADD COLUMN root TEXT NOT NULL DEFAULT ''")
+            connection.executescript(_INDEX)
+            self._initialized = True
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record(self, root, name, command, usage, exit_code, output_bytes=None, source="gui"):
+        """记录博客根目录 root 下的一次运行（usage 为 ResourceUsage），数据库不可写时忽略"""
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT INTO runs (root, name, command, source, started_at, wall_time, cpu_time, peak_rss,"
+                        " output_bytes, exit_code) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (normalize_path(root), name, command, source, usage.started_at, usage.wall_time, usage.cpu_time,
+                         usage.peak_rss, output_bytes, exit_code))
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            pass
+
+    def runs(self, root, name, limit=50, since=None, until=None):
+        """博客根目录下某个脚本最近的运行记录（新的在前），每条为字典；可限定开始时间范围 [since, until)"""
+        query = "SELECT * FROM runs WHERE root = ? AND name = ?"
+        params = [normalize_path(root), name]
+        if since is not None:
+            query += " AND started_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND started_at < ?"
+            params.append(until)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        try:
+            connection = self._connect()
+            try:
+                connection.row_factory = sqlite3.Row
+                return [dict(row) for row in connection.execute(query, params)]
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return []
+
+    def trend(self, root, name, now=None):
+        """
+        最近一次成功运行与基线的比较，没有成功记录时返回 None
+        返回 {"last": 最近一次, "baseline": 基线耗时, "change": 变化比例, "period": "上周"/"之前"}
+        """
+        now = now or time.time()
+        recent = [run for run in self.runs(root, name, limit=RECENT_RUNS * 3) if run["exit_code"] == 0]
+        if not recent:
+            return None
+        last, previous = recent[0], recent[1:RECENT_RUNS + 1]
+        last_week = [run["wall_time"] for run in self.runs(root, name, limit=500, since=now - 14 * DAY,
+                                                           until=now - 7 * DAY)
+                     if run["exit_code"] == 0]
+        if last_week:
+            baseline, period = _median(last_week), "上周"
+        elif previous:
+            baseline, period = _median([run["wall_time"] for run in previous]), "之前"
+        else:
+            baseline, period = None, None
+        change = (last["wall_time"] - baseline) / baseline if baseline else None
+        return {"last": last, "baseline": baseline, "change": change, "period": period}
+
+
+def describe_trend(name, trend):
+    """例如：docs:build 用时 94 s，比上周慢 30%"""
+    if trend is None:
+        return f"{name} 还没有成功运行的记录"
+    text = f"{name} 用时 {trend['last']['wall_time']:.0f} s"
+    change = trend["change"]
+    if change is None:
+        return text
+    if abs(change) < TREND_TOLERANCE:
+        return f"{text}，与{trend['period']}持平（{trend['baseline']:.0f} s）"
+    direction = "慢" if change > 0 else "快"
+    return f"{text}，比{trend['period']}{direction} {abs(change):.0%}（{trend['baseline']:.0f} s）"
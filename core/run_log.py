@@ -0,0 +1,196 @@
+# 每次运行的日志文件：输出由后台线程写入配置目录的 logs/，可选 gzip 压缩，按数量与总大小轮转
+import gzip
+import os
+import queue
+import re
+import threading
+import time
+
+from .settings_store import default_run_log_keep
+from .utils import user_config_dir
+
+# 日志总大小上限，与保留数量一起决定何时删除最旧的日志
+MAX_TOTAL_BYTES = 1024 ** 3
+# 写入线程攒够该大小或队列为空时才写文件
+WRITE_BATCH_BYTES = 256 * 1024
+
+
+def log_dir():
+    path = os.path.join(user_config_dir(), "logs")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _safe_name(name):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", name).strip("_")[:40] or "run"
+
+
+def _reserve(base, suffix):
+    """
+    在调用线程中以独占方式创建空文件占住文件名（写入线程稍后才打开文件），
+    同一秒内启动的多次运行依次得到 名称、名称-2、名称-3 ...
+    """
+    index = 1
+    path = f"{base}{suffix}"
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return path
+        except FileExistsError:
+            index += 1
+            path = f"{base}-{index}{suffix}"
+        except OSError:
+            return path  # 目录不可写时由写入线程报告失败
+
+
+def list_logs(directory=None):
+    """全部运行日志，新的在前"""
+    directory = directory or log_dir()
+    try:
+        entries = [entry for entry in os.scandir(directory)
+                   if entry.is_file() and entry.name.endswith((".log", ".log.gz"))]
+    except OSError:
+        return []
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    return [entry.path for entry in entries]
+
+
+class RunLog:
+    """一次运行的日志；path 在 open() 时即确定，写入由 RunLogger 的线程完成"""
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+        self.file = None
+        self.closed = False
+
+
+class RunLogger:
+    """
+    运行日志（全局唯一 run_logger）
+    open/write/close 只把操作放入队列，文件的打开、写入、压缩与轮转都在后台线程完成，不阻塞界面
+    """
+
+    def __init__(self):
+        self.keep = default_run_log_keep
+        self.compress = False
+        self.directory = None
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.keep > 0
+
+    def configure(self, keep, compress):
+        self.keep = max(0, int(keep))
+        self.compress = bool(compress)
+
+    def open(self, name, command):
+        """开始记录一次运行，返回 RunLog；关闭记录时返回 None"""
+        if not self.enabled:
+            return None
+        directory = self.directory or log_dir()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = ".log.gz" if self.compress else ".log"
+        path = _reserve(os.path.join(directory, f"{stamp}-{_safe_name(name)}"), suffix)
+        header = f"# {name}\n# {time.strftime('%Y-%m-%d %H:%M:%S')}  {command}\n"
+        log = RunLog(path, header)
+        self._put(("open", log, None))
+        return log
+
+    def write(self, log, text):
+        if log is not None:
+            self._put(("write", log, text))
+
+    def close(self, log, footer=""):
+        if log is not None:
+            self._put(("close", log, footer))
+
+    def flush(self, timeout=5.0):
+        """等待队列中的操作全部完成（测试与退出时使用）"""
+        done = threading.Event()
+        self._put(("sync", None, done))
+        return done.wait(timeout)
+
+    def _put(self, item):
+        self._queue.put(item)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="RunLogger", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        pending = {}  # RunLog -> [text]
+        while True:
+            items = [self._queue.get()]
+            # 合并队列中已有的操作，减少系统调用
+            size = 0
+            while size < WRITE_BATCH_BYTES:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                if items[-1][0] == "write":
+                    size += len(items[-1][2])
+            for op, log, payload in items:
+                if op == "write":
+                    pending.setdefault(log, []).append(payload)
+                    continue
+                if op == "open":
+                    pending.setdefault(log, [log.header])
+                    continue
+                self._write_pending(pending)
+                if op == "close":
+                    self._close(log, payload)
+                elif op == "sync":
+                    payload.set()
+            self._write_pending(pending)
+
+    def _write_pending(self, pending):
+        for log, texts in pending.items():
+            if log.closed:
+                continue
+            try:
+                if log.file is None:
+                    if log.path.endswith(".gz"):
+                        log.file = gzip.open(log.path, "wt", encoding="utf-8", compresslevel=6)
+                    else:
+                        log.file = open(log.path, "w", encoding="utf-8")
+                log.file.write("".join(texts))
+                if not log.path.endswith(".gz"):
+                    # 让查看器能读到仍在运行的任务的最新输出（gzip 只在关闭时完整）
+                    log.file.flush()
+            except OSError:
+                log.closed = True
+        pending.clear()
+
+    def _close(self, log, footer):
+        if log.closed:
+            return
+        if footer:
+            self._write_pending({log: [footer]})
+        log.closed = True
+        try:
+            if log.file is not None:
+                log.file.close()
+        except OSError:
+            pass
+        log.file = None
+        self._rotate(os.path.dirname(log.path))
+
+    def _rotate(self, directory):
+        """按数量与总大小删除最旧的日志"""
+        logs = list_logs(directory)
+        total = 0
+        for index, path in enumerate(logs):
+            try:
+                total += os.path.getsize(path)
+                if index >= self.keep or total > MAX_TOTAL_BYTES and index > 0:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+run_logger = RunLogger()
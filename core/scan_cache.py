@@ -0,0 +1,97 @@
+# 扫描缓存,将目录 mtime 与.md文件列表持久化到用户配置目录,加速冷启动
+import hashlib
+import json
+import os
+
+from .utils import normalize_path, user_config_dir
+
+CACHE_VERSION = 1
+
+
+class ScanCache:
+    """
+    按博客根目录分文件保存扫描结果
+    - max_entries: 单个根目录最多缓存的目录数，超过则不写入
+    - max_roots: 最多保留的根目录缓存数量，按最近使用淘汰
+    排除目录列表变化时缓存自动失效
+    """
+
+    def __init__(self, cache_dir=None, max_entries=200_000, max_roots=8):
+        self.cache_dir = cache_dir or os.path.join(user_config_dir(), "scan_cache")
+        self.max_entries = max_entries
+        self.max_roots = max_roots
+
+    def _cache_file(self, root_path):
+        key = hashlib.sha1(normalize_path(root_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def _signature(exclude_dirs):
+        return sorted(exclude_dirs)
+
+    def load(self, root_path, exclude_dirs):
+        """读取缓存，返回 dir -> (mtime_ns, md文件名, 子目录名)；缓存缺失或失效返回 None"""
+        root = normalize_path(root_path)
+        path = self._cache_file(root)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (data.get("version") != CACHE_VERSION or data.get("root") != root
+                or data.get("exclude_dirs") != self._signature(exclude_dirs)):
+            return None
+        try:
+            os.utime(path)  # 刷新最近使用时间，用于淘汰
+        except OSError:
+            pass
+        return {
+            root if relative == "." else os.path.join(root, relative): (mtime, tuple(names), tuple(subdirs))
+            for relative, (mtime, names, subdirs) in data["entries"].items()
+        }
+
+    def save(self, root_path, exclude_dirs, entries):
+        """原子写入缓存文件，并淘汰多余的根目录缓存"""
+        if len(entries) > self.max_entries:
+            return False
+        root = normalize_path(root_path)
+        data = {
+            "version": CACHE_VERSION,
+            "root": root,
+            "exclude_dirs": self._signature(exclude_dirs),
+            "entries": {
+                os.path.relpath(path, root): [mtime, list(names), list(subdirs)]
+                for path, (mtime, names, subdirs) in entries.items()
+            },
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_file(root)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+        self._evict()
+        return True
+
+    def _evict(self):
+        try:
+            files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                     if name.endswith(".json")]
+            files.sort(key=os.path.getmtime, reverse=True)
+            for stale in files[self.max_roots:]:
+                os.remove(stale)
+        except OSError:
+            pass
+
+    def clear(self, root_path):
+        try:
+            os.remove(self._cache_file(root_path))
+        except OSError:
+            pass
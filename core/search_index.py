@@ -0,0 +1,46 @@
+# 全文检索分词,中日韩文字按二元组(bigram)切分,其他文字按单词切分
+import re
+
+CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+TOKEN_RE = re.compile(f"([{CJK}]+)|([^\\W{CJK}]+)")
+
+# 正文最多读取的字节数，超大文件只索引开头部分
+BODY_LIMIT = 1024 * 1024
+
+
+def tokenize(text):
+    """将文本切分为检索词：CJK 连续片段输出重叠二元组，单字片段输出单字"""
+    tokens = []
+    for match in TOKEN_RE.finditer(text.lower()):
+        cjk, word = match.groups()
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def index_text(text):
+    """生成写入 FTS 表的文本（空格分隔的检索词）"""
+    return " ".join(tokenize(text))
+
+
+def build_query(text):
+    """
+    将用户输入转换为 FTS5 查询（所有词均需命中）
+    单个 CJK 字与最后一个单词使用前缀匹配，便于边输入边搜索
+    """
+    terms = []
+    matches = list(TOKEN_RE.finditer(text.lower()))
+    for position, match in enumerate(matches):
+        cjk, word = match.groups()
+        is_last = position == len(matches) - 1
+        if word:
+            terms.append(f'"{word}"*' if is_last else f'"{word}"')
+        elif len(cjk) == 1:
+            terms.append(f'"{cjk}"*')
+        else:
+            terms.extend(f'"{cjk[i:i + 2]}"' for i in range(len(cjk) - 1))
+    return " ".join(terms)
@@ -1,35 +1,23 @@
 # settings_manager.py
-from PySide6.QtCore import QSettings, QObject
+from PySide6.QtCore import QCoreApplication, QSettings, QObject, QTimer
 import os
-import base64
-organization = "57Darling02"
-application = "StaticBlogAssistant"
+from .profiler import startup_profiler
+from .utils import organization, application
+from .settings_store import WORKSPACE_KEYS, load_settings
 from .signal_bus import SignalBus
 signal_bus = SignalBus()
 
-default_default_content = """---
-title: $TITLE$
-date: $TIME$
----
-# 欢迎使用StaticBlogAssistant！
-StaticBlogAssistant是一个静态博客辅助工具，能够自定义脚本并快捷执行。自定义编辑器如果有时间再做
-$TITLE$将会替换成文件名
-$TIME$将会替换成当前时间
-"""
-
-default_scripts_content = {
-    "vitepress初始化项目": "npm init",
-    "vitepress打包": "npm run docs:build",
-    "vitepress本地预览": "npm run docs:dev",
-    "vitepress调试": "npm run docs:dev",
-    "github部署": "git add . && git commit -m \"update\" && git push",
-    "Hexo初始化项目": "hexo init",
-    "Hexo清理并生成": "hexo cl && hexo g",
-    "Hexo本地预览": "hexo server",
-    "Hexo部署到GitHub": "hexo deploy",
-}
+# 防抖保存的间隔（毫秒）：连续的修改合并为一次写入
+SAVE_DELAY_MS = 500
+
 
 class SettingsManager(QObject):
+    """
+    设置保存在 settings.json（SettingsStore）一个文件中
+    修改某项设置时立即发出 setting_changed(key, old, new)，订阅者只需处理自己关心的项；
+    写入文件经过防抖合并，save() 立即写入并发出一次 settings_changed
+    博客根目录、默认内容与脚本属于当前工作区，切换工作区时对其中变化的项各发出一次 setting_changed
+    """
     _instance = None
     @classmethod
     def get_instance(cls):
@@ -39,72 +27,240 @@ class SettingsManager(QObject):
         return cls._instance
     def __init__(self):
         super().__init__()
-        self.settings = QSettings(organization, application)
-        self._blog_root = "D:/myCode/Vue/VitePress-js"
-        self._editor_path = ""
-        self._default_content = ""
-        self._script_commands = {}
+        self.store = None
+        self._dirty = False  # 有尚未写入文件的修改
+        self._changed = False  # 上次 settings_changed 之后有修改
+        self._cleared = False  # 已重置：防抖与退出时不再写回，直到再次修改或点击保存
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.flush)
         self.load()
     def clear(self):
-        self.settings.clear()
+        """删除保存的设置，下次启动恢复默认；当前值仍在内存中，再次保存或修改任一设置即可撤销"""
+        self.save_timer.stop()
+        self._dirty = False
+        self._cleared = True
+        if os.path.exists(self.store.path):
+            os.remove(self.store.path)
+        # 旧版本的 QSettings 也要清除，否则下次启动会再次迁移
+        QSettings(organization, application).clear()
+
+    def _set(self, key, value):
+        """修改一项设置：值有变化时通知订阅者并安排保存"""
+        old = getattr(self.store, key)
+        if old == value:
+            return
+        setattr(self.store, key, value)
+        self._dirty = self._changed = True
+        self._cleared = False
+        signal_bus.setting_changed.emit(key, old, value)
+        self.schedule_save()
+
     @property
     def blog_root(self):
-        return self._blog_root
+        return self.store.blog_root
 
     @blog_root.setter
     def blog_root(self, value):
         if os.path.exists(value):
-            self._blog_root = value
+            self._set("blog_root", value)
         else:
             raise ValueError("Invalid blog root path.")
 
     @property
     def editor_path(self):
-        return self._editor_path
+        return self.store.editor_path
 
     @editor_path.setter
     def editor_path(self, value):
-        self._editor_path = value
+        self._set("editor_path", value)
     @property
     def default_content(self):
-        return self._default_content
+        return self.store.default_content
 
     @default_content.setter
     def default_content(self, value):
-        self._default_content = value
+        self._set("default_content", value)
     @property
     def script_commands(self):
-        return self._script_commands.copy()
+        return self.store.script_commands.copy()
     @script_commands.setter
     def script_commands(self, value):
-        self._script_commands = value
+        self._set("script_commands", dict(value))
+
+    @property
+    def script_options(self):
+        return {name: dict(options) for name, options in self.store.script_options.items()}
+
+    @script_options.setter
+    def script_options(self, value):
+        self._set("script_options", {name: dict(options) for name, options in value.items()})
+
+    def script_option(self, name, key, default=None):
+        """读取单个脚本的选项"""
+        return self.store.script_option(name, key, default)
+
+    @property
+    def console_max_lines(self):
+        return self.store.console_max_lines
+
+    @console_max_lines.setter
+    def console_max_lines(self, value):
+        self._set("console_max_lines", max(100, int(value)))
+
+    @property
+    def console_spill_log(self):
+        return self.store.console_spill_log
+
+    @console_spill_log.setter
+    def console_spill_log(self, value):
+        self._set("console_spill_log", bool(value))
+
+    @property
+    def console_virtual_view(self):
+        return self.store.console_virtual_view
+
+    @console_virtual_view.setter
+    def console_virtual_view(self, value):
+        self._set("console_virtual_view", bool(value))
+
+    @property
+    def stall_threshold_ms(self):
+        return self.store.stall_threshold_ms
+
+    @stall_threshold_ms.setter
+    def stall_threshold_ms(self, value):
+        self._set("stall_threshold_ms", max(0, int(value)))
+
+    @property
+    def run_log_keep(self):
+        return self.store.run_log_keep
+
+    @run_log_keep.setter
+    def run_log_keep(self, value):
+        self._set("run_log_keep", max(0, int(value)))
+
+    @property
+    def run_log_compress(self):
+        return self.store.run_log_compress
+
+    @run_log_compress.setter
+    def run_log_compress(self, value):
+        self._set("run_log_compress", bool(value))
+
+    @property
+    def warm_workspaces(self):
+        return self.store.warm_workspaces
+
+    @warm_workspaces.setter
+    def warm_workspaces(self, value):
+        self._set("warm_workspaces", max(1, int(value)))
+
+    @property
+    def rewrite_links(self):
+        """在文件树中移动或重命名后更新引用它们的链接"""
+        return self.store.rewrite_links
+
+    @rewrite_links.setter
+    def rewrite_links(self, value):
+        self._set("rewrite_links", bool(value))
+
+    @property
+    def workspace(self):
+        """当前工作区名称"""
+        return self.store.workspace
+
+    def workspace_names(self):
+        return list(self.store.workspaces)
+
+    def switch_workspace(self, name):
+        """切换工作区：先发出 workspace 的变化，再发出该工作区中与之前不同的各项"""
+        if name == self.store.workspace:
+            return
+        old_workspace = self.store.workspace
+        old_values = self.store.workspace_data()
+        self.store.select_workspace(name)
+        self._dirty = self._changed = True
+        self._cleared = False
+        signal_bus.setting_changed.emit("workspace", old_workspace, name)
+        for key, attribute in WORKSPACE_KEYS.items():
+            new = getattr(self.store, attribute)
+            if old_values[key] != new:
+                signal_bus.setting_changed.emit(attribute, old_values[key], new)
+        self.schedule_save()
+
+    def add_workspace(self, name, blog_root):
+        """新建工作区，默认内容与脚本复制自当前工作区"""
+        name = name.strip()
+        if not name or name in self.store.workspaces:
+            raise ValueError(f"工作区名称无效或已存在：{name}")
+        if not os.path.isdir(blog_root):
+            raise ValueError("Invalid blog root path.")
+        old_names = self.workspace_names()
+        data = self.store.workspace_data()
+        data.update(blog_root_path=blog_root, script_commands=dict(data["script_commands"]),
+                    script_options={key: dict(value) for key, value in data["script_options"].items()})
+        self.store.workspaces[name] = data
+        self._workspaces_changed(old_names)
+
+    def remove_workspace(self, name):
+        """删除工作区（至少保留一个）；删除的是当前工作区时先切换到第一个其他工作区"""
+        if name not in self.store.workspaces or len(self.store.workspaces) < 2:
+            return
+        old_names = self.workspace_names()
+        if name == self.store.workspace:
+            self.switch_workspace(next(other for other in old_names if other != name))
+        del self.store.workspaces[name]
+        self._workspaces_changed(old_names)
+
+    def _workspaces_changed(self, old_names):
+        self._dirty = self._changed = True
+        self._cleared = False
+        signal_bus.setting_changed.emit("workspaces", old_names, self.workspace_names())
+        self.schedule_save()
 
     def load(self):
-        # 博客根目录
-        blog_root = self.settings.value("blog_root_path", "")
-        self._blog_root = blog_root if blog_root else "D:/myCode/Vue/VitePress-js"
+        with startup_profiler.phase("读取设置"):
+            self._load()
 
-        # 编辑器路径
-        self._editor_path = self.settings.value("editor_path", "")
+    def _load(self):
+        # 优先读取 settings.json，旧版本只有 QSettings 时迁移一次
+        self.store = load_settings()
+        self._dirty = False
 
-        # 默认内容（Base64解码）
-        encoded_content = self.settings.value("default_content", "")
-        self._default_content = base64.b64decode(encoded_content).decode("utf-8") if encoded_content else default_default_content
+    def schedule_save(self):
+        """合并短时间内的多次修改，只写一次文件"""
+        if QCoreApplication.instance() is None:
+            # 没有事件循环（命令行、脚本）时定时器不会触发，直接写入
+            self.flush()
+        else:
+            self.save_timer.start()
 
-        # 脚本命令
-        self._script_commands = self.settings.value("script_commands", default_scripts_content)
+    def flush(self):
+        """写入等待中的修改，失败时保留到下次修改或退出时重试；重置设置后不写入"""
+        if self._cleared:
+            return
+        try:
+            self.save()
+        except OSError:
+            self._dirty = True
 
     def save(self):
-        self.settings.setValue("blog_root_path", self._blog_root)
-        self.settings.setValue("editor_path", self._editor_path)
-        self.settings.setValue("default_content",
-                               base64.b64encode(self._default_content.encode("utf-8")).decode())
-        self.settings.setValue("script_commands", self._script_commands)
-        signal_bus.settings_changed.emit()
+        """立即写入尚未保存的修改（取消等待中的防抖保存）；重置设置后调用时写回当前的值"""
+        self.save_timer.stop()
+        if self._dirty or self._cleared:
+            self._dirty = self._cleared = False
+            self.store.save()
+        if self._changed:
+            self._changed = False
+            signal_bus.settings_changed.emit()
 
     def update_script_command(self, name, command):
-        self._script_commands[name] = command
+        self.script_commands = {**self.store.script_commands, name: command}
 
     def remove_script_command(self, name):
-        if name in self._script_commands:
-            del self._script_commands[name]
\ No newline at end of file
+        if name in self.store.script_commands:
+            self.script_commands = {k: v for k, v in self.store.script_commands.items() if k != name}
+        if name in self.store.script_options:
+            self.script_options = {k: v for k, v in self.store.script_options.items() if k != name}
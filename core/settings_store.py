@@ -0,0 +1,244 @@
+# 设置的 JSON 镜像,供命令行等无 Qt 环境读取
+import base64
+import json
+import os
+
+from .utils import organization, application, user_config_dir
+
+default_blog_root = "D:/myCode/Vue/VitePress-js"
+
+default_default_content = """---
+title: $TITLE$
+date: $TIME$
+---
+# 欢迎使用StaticBlogAssistant！
+StaticBlogAssistant是一个静态博客辅助工具，能够自定义脚本并快捷执行。自定义编辑器如果有时间再做
+$TITLE$将会替换成文件名
+$TIME$将会替换成当前时间
+"""
+
+default_scripts_content = {
+    "vitepress初始化项目": "npm init",
+    "vitepress打包": "npm run docs:build",
+    "vitepress本地预览": "npm run docs:dev",
+    "vitepress调试": "npm run docs:dev",
+    "github部署": "git add . && git commit -m \"update\" && git push",
+    "Hexo初始化项目": "hexo init",
+    "Hexo清理并生成": "hexo cl && hexo g",
+    "Hexo本地预览": "hexo server",
+    "Hexo部署到GitHub": "hexo deploy",
+}
+
+# 脚本附加选项
+# exclusive: 为 True 的脚本之间排队执行（构建、部署等不宜并行的任务）
+# depends: 依赖的脚本，先于本脚本执行
+# inputs/outputs: 构建缓存的输入文件与输出目录（相对博客根目录的 glob），输入未变化且输出完好时跳过执行
+default_script_options = {
+    "vitepress打包": {
+        "exclusive": True,
+        "inputs": ["**/*.md", "**/.vitepress/config.*", "**/.vitepress/theme/**", "**/public/**",
+                   "package.json", "package-lock.json", "pnpm-lock.yaml", "yarn.lock"],
+        "outputs": ["**/.vitepress/dist"],
+    },
+    "github部署": {"exclusive": True},
+    "Hexo清理并生成": {
+        "exclusive": True,
+        "inputs": ["source/**", "themes/**", "scaffolds/**", "_config*.yml",
+                   "package.json", "package-lock.json", "yarn.lock"],
+        "outputs": ["public"],
+    },
+    "Hexo部署到GitHub": {"exclusive": True},
+}
+
+# 控制台默认保留的最大行数
+default_console_max_lines = 10000
+
+# 界面卡顿检测的默认阈值（毫秒），0 表示关闭
+default_stall_threshold_ms = 500
+
+# 默认保留的运行日志数，0 表示不记录
+default_run_log_keep = 100
+
+# 默认常驻内存的工作区索引数
+default_warm_workspaces = 3
+
+# 没有配置工作区时（旧版本的设置）使用的工作区名称
+default_workspace = "默认"
+# 每个工作区独立的设置项（settings.json 中的键 -> SettingsStore 属性），其余设置所有工作区共用
+WORKSPACE_KEYS = {
+    "blog_root_path": "blog_root",
+    "default_content": "default_content",
+    "script_commands": "script_commands",
+    "script_options": "script_options",
+}
+
+# settings.json 的格式版本
+# 1：QSettings 的镜像；2：唯一的设置存储，图形界面不再写入 QSettings；3：多个工作区
+SETTINGS_VERSION = 3
+
+
+def read_qsettings(settings):
+    """从 QSettings 读取全部设置，返回与 SettingsStore.to_dict() 相同结构的字典"""
+    # 默认内容（Base64解码）
+    encoded_content = settings.value("default_content", "")
+    return {
+        "blog_root_path": settings.value("blog_root_path", "") or default_blog_root,
+        "editor_path": settings.value("editor_path", ""),
+        "default_content": base64.b64decode(encoded_content).decode("utf-8") if encoded_content else default_default_content,
+        "script_commands": settings.value("script_commands", default_scripts_content),
+        "script_options": settings.value("script_options", default_script_options),
+        "console_max_lines": settings.value("console_max_lines", default_console_max_lines, type=int),
+        "console_spill_log": settings.value("console_spill_log", False, type=bool),
+        "console_virtual_view": settings.value("console_virtual_view", False, type=bool),
+        "stall_threshold_ms": settings.value("stall_threshold_ms", default_stall_threshold_ms, type=int),
+        "run_log_keep": settings.value("run_log_keep", default_run_log_keep, type=int),
+        "run_log_compress": settings.value("run_log_compress", False, type=bool),
+    }
+
+
+def settings_path():
+    return os.path.join(user_config_dir(), "settings.json")
+
+
+class SettingsStore:
+    """
+    与 SettingsManager 相同的设置项，保存在配置目录的 settings.json 中
+    图形界面与命令行共用这一个文件，缺失时从旧版本的 QSettings 迁移一次
+    blog_root 等 WORKSPACE_KEYS 中的属性始终是当前工作区（workspace）的值，
+    workspaces 保存全部工作区（当前工作区的条目在 select_workspace / to_dict 时才更新）
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings_path()
+        self.version = SETTINGS_VERSION
+        self.blog_root = default_blog_root
+        self.editor_path = ""
+        self.default_content = default_default_content
+        self.script_commands = dict(default_scripts_content)
+        self.script_options = {name: dict(options) for name, options in default_script_options.items()}
+        self.console_max_lines = default_console_max_lines
+        self.console_spill_log = False
+        self.console_virtual_view = False
+        self.stall_threshold_ms = default_stall_threshold_ms
+        self.run_log_keep = default_run_log_keep
+        self.run_log_compress = False
+        self.warm_workspaces = default_warm_workspaces
+        self.rewrite_links = True
+        self.workspace = default_workspace
+        self.workspaces = {default_workspace: self.workspace_data()}
+
+    def workspace_data(self):
+        """当前工作区的设置"""
+        return {key: getattr(self, name) for key, name in WORKSPACE_KEYS.items()}
+
+    def _apply_workspace(self, data):
+        self.blog_root = data.get("blog_root_path") or default_blog_root
+        self.default_content = data.get("default_content") or default_default_content
+        self.script_commands = dict(data.get("script_commands", default_scripts_content))
+        self.script_options = {name: dict(options) for name, options in
+                               data.get("script_options", default_script_options).items()}
+
+    def select_workspace(self, name):
+        """切换当前工作区，不存在时抛出 KeyError"""
+        data = self.workspaces[name]
+        self.workspaces[self.workspace] = self.workspace_data()
+        self.workspace = name
+        self._apply_workspace(data)
+
+    def script_option(self, name, key, default=None):
+        """读取单个脚本的选项"""
+        return self.script_options.get(name, {}).get(key, default)
+
+    def to_dict(self):
+        return {
+            "version": SETTINGS_VERSION,
+            "blog_root_path": self.blog_root,
+            "editor_path": self.editor_path,
+            "default_content": self.default_content,
+            "script_commands": self.script_commands,
+            "script_options": self.script_options,
+            "console_max_lines": self.console_max_lines,
+            "console_spill_log": self.console_spill_log,
+            "console_virtual_view": self.console_virtual_view,
+            "stall_threshold_ms": self.stall_threshold_ms,
+            "run_log_keep": self.run_log_keep,
+            "run_log_compress": self.run_log_compress,
+            "warm_workspaces": self.warm_workspaces,
+            "rewrite_links": self.rewrite_links,
+            "workspace": self.workspace,
+            "workspaces": {name: self.workspace_data() if name == self.workspace else data
+                           for name, data in self.workspaces.items()},
+        }
+
+    def update(self, data):
+        self.editor_path = data.get("editor_path", "")
+        self.console_max_lines = int(data.get("console_max_lines", default_console_max_lines))
+        self.console_spill_log = bool(data.get("console_spill_log", False))
+        self.console_virtual_view = bool(data.get("console_virtual_view", False))
+        self.stall_threshold_ms = int(data.get("stall_threshold_ms", default_stall_threshold_ms))
+        self.run_log_keep = int(data.get("run_log_keep", default_run_log_keep))
+        self.run_log_compress = bool(data.get("run_log_compress", False))
+        self.warm_workspaces = int(data.get("warm_workspaces", default_warm_workspaces))
+        self.rewrite_links = bool(data.get("rewrite_links", True))
+        # 版本 3 之前只有一个工作区，即顶层的设置项
+        self.workspace = data.get("workspace") or default_workspace
+        self.workspaces = dict(data.get("workspaces") or {})
+        self.workspaces.setdefault(self.workspace, {key: data[key] for key in WORKSPACE_KEYS if key in data})
+        self._apply_workspace(self.workspaces[self.workspace])
+
+    def load(self):
+        """读取 settings.json，文件不存在或损坏时返回 False"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict):
+            return False
+        # 旧版本的字段都保留（顶层仍是当前工作区的设置），更高的版本只读取认识的字段
+        self.version = int(data.get("version", 1))
+        self.update(data)
+        return True
+
+    def save(self):
+        """
+        原子写入：先完整写入并落盘临时文件再替换，避免图形界面与命令行同时读写时读到半个文件，
+        写入中途断电也只会留下旧文件
+        """
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.version = SETTINGS_VERSION
+
+    def migrate_from_qsettings(self):
+        """从图形界面的 QSettings 导入设置（只用到 QtCore）"""
+        try:
+            from PySide6.QtCore import QSettings
+        except ImportError:
+            return False
+        settings = QSettings(organization, application)
+        if not settings.allKeys():
+            return False
+        self.update(read_qsettings(settings))
+        return True
+
+
+def load_settings(path=None):
+    """读取设置：优先 settings.json，其次迁移 QSettings，都没有时使用默认值"""
+    store = SettingsStore(path)
+    if not store.load():
+        # 只迁移一次，之后的启动不再加载 Qt
+        store.migrate_from_qsettings()
+        try:
+            store.save()
+        except OSError:
+            pass
+    return store
@@ -1,4 +1,6 @@
 from PySide6.QtCore import QObject, Signal
+
+from .bus_trace import bus_tracer
 class SignalBus(QObject):
     """
     全局信号总线（单例模式）
@@ -6,12 +8,15 @@ class SignalBus(QObject):
     _instance = None
 
     settings_changed = Signal() # 配置变更触发
+    setting_changed = Signal(str, object, object)  # (key, old, new)，单项设置修改时立即触发
     message_sent = Signal(str)
     status_updated = Signal(str)
     execute_command = Signal(str)
-    output_received = Signal(str, str)  # (text, type)
-    process_finished = Signal(int)  # exit_code
-    stop_command = Signal()
+    output_received = Signal(str, str, str)  # (text, type, job_id)，job_id 为空表示非任务消息
+    job_started = Signal(str, str)  # (job_id, label)
+    process_finished = Signal(str, int)  # (job_id, exit_code)
+    stop_command = Signal(str)  # job_id，为空表示终止全部任务
+    run_recorded = Signal(str)  # 脚本名，运行历史新增了一条记录
 
 
 
@@ -20,6 +25,17 @@ class SignalBus(QObject):
         if not isinstance(cls._instance, cls):
             cls._instance = super().__new__(cls)
         return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        bus_tracer.attach(self)
+
+    def subscribe(self, signal, slot):
+        """
+        连接总线信号，例如 signal_bus.subscribe("output_received", self._append_console)
+        通过这里连接的槽函数会被 bus_tracer 统计耗时（开启追踪时）
+        """
+        return bus_tracer.subscribe(self, signal, slot)
     @classmethod
     def get_instance(cls):
         """静态方法获取单例实例"""
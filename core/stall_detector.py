@@ -0,0 +1,197 @@
+# 界面卡顿检测：看门狗线程监视 Qt 主线程的心跳，超过阈值未响应时采集主线程的 Python 调用栈
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from collections import Counter
+
+from PySide6.QtCore import QTimer
+
+from .utils import user_config_dir
+
+# 日志文件（配置目录下）超过该大小时改名为 .1 重新开始
+MAX_LOG_BYTES = 1024 * 1024
+# 卡顿期间最多保留的调用栈采样数
+MAX_SAMPLES = 200
+# 归因时跳过的目录：标准库与第三方包
+_LIBRARY_DIRS = tuple({sysconfig.get_paths()[name] for name in ("stdlib", "platstdlib", "purelib", "platlib")})
+
+
+def _is_library(filename):
+    return filename.startswith(_LIBRARY_DIRS) or filename.startswith("<")
+
+
+def capture_stack(frame):
+    """调用栈，每一帧为 (文件, 行号, 函数, 源码) 元组，可作为字典键"""
+    return tuple((item.filename, item.lineno, item.name, item.line) for item in traceback.extract_stack(frame))
+
+
+def offender(stack):
+    """卡顿归因：调用栈中最内层的项目代码（不是标准库或第三方包）的函数"""
+    for filename, lineno, name, _ in reversed(stack):
+        if not _is_library(filename):
+            return f"{os.path.basename(filename)}:{lineno} {name}"
+    if stack:
+        filename, lineno, name, _ = stack[-1]
+        return f"{os.path.basename(filename)}:{lineno} {name}"
+    return "<未知>"
+
+
+class Stall:
+    __slots__ = ("started", "wall_time", "duration", "samples")
+
+    def __init__(self, started):
+        self.started = started
+        self.wall_time = time.time() - (time.monotonic() - started)
+        self.duration = 0.0
+        self.samples = Counter()  # 调用栈 -> 采样次数
+
+    def add_sample(self, stack):
+        if len(self.samples) < MAX_SAMPLES or stack in self.samples:
+            self.samples[stack] += 1
+
+    def main_stack(self):
+        """采样最多的调用栈，即卡顿期间主线程大部分时间所在的位置"""
+        return self.samples.most_common(1)[0][0] if self.samples else ()
+
+
+class OffenderStats:
+    __slots__ = ("count", "total", "max", "stack")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.stack = ()
+
+    def add(self, stall, stack):
+        self.count += 1
+        self.total += stall.duration
+        if stall.duration >= self.max:
+            self.max = stall.duration
+            self.stack = stack
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+            "stack": traceback.format_list(list(self.stack)),
+        }
+
+
+class StallDetector:
+    """
+    卡顿检测器（全局唯一 stall_detector）
+    主线程的 QTimer 定时更新心跳；看门狗线程发现心跳超过阈值未更新时，
+    通过 sys._current_frames() 采集主线程调用栈，卡顿期间持续采样，恢复后记录耗时、写入日志并按位置汇总
+    """
+
+    def __init__(self):
+        self.threshold = 0.0
+        self.lock = threading.Lock()
+        self.offenders = {}  # 位置 -> OffenderStats
+        self.recent = []  # 最近的卡顿 [(wall_time, duration, offender)]
+        self.log_path = None
+        self._timer = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._beat = time.monotonic()
+        self._main_thread_id = threading.main_thread().ident
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, threshold_ms):
+        """在主线程调用；threshold_ms 为 0 时关闭检测"""
+        self.stop()
+        if threshold_ms <= 0:
+            return
+        self.threshold = threshold_ms / 1000
+        # 心跳间隔远小于阈值，保证空闲的事件循环不会被误判
+        interval = max(10, min(100, threshold_ms // 5))
+        self._beat = time.monotonic()
+        self._timer = QTimer()
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._heartbeat)
+        self._timer.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, args=(interval / 1000,), name="StallDetector",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._timer.stop()
+        self._timer.deleteLater()
+        self._timer = None
+
+    def _heartbeat(self):
+        self._beat = time.monotonic()
+
+    def _watch(self, interval):
+        stall = None
+        while not self._stop.wait(interval):
+            beat = self._beat
+            if stall is not None and beat > stall.started:
+                # 事件循环恢复：卡顿时长为两次心跳之间的间隔
+                stall.duration = beat - stall.started
+                self._record(stall)
+                stall = None
+                continue
+            if time.monotonic() - beat < self.threshold:
+                continue
+            if stall is None:
+                stall = Stall(beat)
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is not None:
+                stall.add_sample(capture_stack(frame))
+            del frame
+
+    def _record(self, stall):
+        stack = stall.main_stack()
+        where = offender(stack)
+        with self.lock:
+            stats = self.offenders.get(where)
+            if stats is None:
+                stats = self.offenders[where] = OffenderStats()
+            stats.add(stall, stack)
+            self.recent.append((stall.wall_time, stall.duration, where))
+            del self.recent[:-100]
+        self._write_log(stall, where, stack)
+
+    def _write_log(self, stall, where, stack):
+        try:
+            path = self.log_path or os.path.join(user_config_dir(), "stalls.log")
+            if os.path.exists(path) and os.path.getsize(path) > MAX_LOG_BYTES:
+                os.replace(path, f"{path}.1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stall.wall_time))} "
+                        f"界面卡顿 {stall.duration * 1000:.0f} ms @ {where}"
+                        f"（采样 {sum(stall.samples.values())} 次）\n")
+                f.writelines(traceback.format_list(list(stack)))
+                f.write("\n")
+        except OSError:
+            pass
+
+    def worst(self, limit=20):
+        """按累计卡顿时长排序的位置"""
+        with self.lock:
+            items = [(where, stats.to_dict()) for where, stats in self.offenders.items()]
+        items.sort(key=lambda item: -item[1]["total_ms"])
+        return items[:limit]
+
+    def reset(self):
+        with self.lock:
+            self.offenders = {}
+            self.recent = []
+
+
+stall_detector = StallDetector()
@@ -0,0 +1,79 @@
+# 文章模板：$变量$ 占位符只编译一次为片段列表，每次渲染只做查表与拼接
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# 变量名为字母、数字、下划线或连字符（不以数字开头），不区分大小写，如 $TITLE$、$tags$、$作者$
+PLACEHOLDER = re.compile(r"\$([^\W\d][\w-]*)\$")
+# 不需要加引号的 YAML 标量
+_PLAIN_SCALAR = re.compile(r"[^\s\-?:,\[\]{}#&*!|>'\"%@`][^:#\[\]{},]*(?<!\s)")
+
+
+def format_value(value):
+    """变量值转为文本：列表写为 [a, b]，None 为空"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_yaml_scalar(item) for item in value) + "]"
+    return str(value)
+
+
+def _yaml_scalar(value):
+    if isinstance(value, (bool, int, float)) or value is None:
+        return json.dumps(value)
+    if isinstance(value, (list, tuple)):
+        return format_value(value)
+    text = str(value)
+    return text if _PLAIN_SCALAR.fullmatch(text) else json.dumps(text, ensure_ascii=False)
+
+
+def front_matter_line(key, value):
+    return f"{key}: {_yaml_scalar(value)}"
+
+
+class PostTemplate:
+    """
+    编译后的模板：literals 为占位符之间的原文（比占位符多一个），names 为小写的变量名
+    渲染时未提供的变量原样保留（正文中的 $...$ 公式等不受影响）
+    """
+
+    def __init__(self, text):
+        self.text = text
+        pieces = PLACEHOLDER.split(text)
+        self.literals = pieces[::2]
+        self.names = [name.lower() for name in pieces[1::2]]
+        self._raw = [f"${name}$" for name in pieces[1::2]]
+        self.variables = frozenset(self.names)
+
+    def render(self, values, extra_front_matter=None):
+        """
+        values 的键为小写变量名；extra_front_matter 中的键值追加到 front matter 末尾
+        （模板没有 front matter 时新建一个）
+        """
+        chunks = [self.literals[0]]
+        for name, raw, literal in zip(self.names, self._raw, self.literals[1:]):
+            value = values.get(name)
+            chunks.append(raw if value is None else format_value(value))
+            chunks.append(literal)
+        text = "".join(chunks)
+        if extra_front_matter:
+            lines = "\n".join(front_matter_line(key, value) for key, value in extra_front_matter.items())
+            end = text.find("\n---", 3) if text.startswith("---") else -1
+            if end >= 0:
+                text = f"{text[:end]}\n{lines}{text[end:]}"
+            else:
+                text = f"---\n{lines}\n---\n{text}"
+        return text
+
+
+@lru_cache(maxsize=32)
+def compile_template(text):
+    """同一模板文本只编译一次"""
+    return PostTemplate(text)
+
+
+def default_values(title, now=None):
+    """内置变量：$TITLE$ 为标题，$TIME$ 为当前时间"""
+    now = now or datetime.now()
+    return {"title": title, "time": now.strftime("%Y-%m-%d %H:%M:%S")}
@@ -1,4 +1,9 @@
-from datetime import datetime
+import codecs
+import os
+import sys
+
+organization = "57Darling02"
+application = "StaticBlogAssistant"
 
 
 def decode(raw_data):
@@ -20,9 +25,87 @@ def decode(raw_data):
     finally:
         return data
 
-def lord_model(title='hello world!' , model_content=''):
+def detect_encoding(raw_data):
+    """检测字节流编码：优先严格 UTF-8，其次 chardet，最后常见中文编码"""
+    try:
+        codecs.getincrementaldecoder("utf-8")("strict").decode(raw_data)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        import chardet
+        detection = chardet.detect(raw_data)
+        if detection["encoding"] and detection["confidence"] > 0.7:
+            return detection["encoding"]
+    except ImportError:
+        pass
+    for codec in ("gb18030", "big5"):
+        try:
+            codecs.getincrementaldecoder(codec)("strict").decode(raw_data)
+            return codec
+        except UnicodeDecodeError:
+            continue
+    return "utf-8"
+
+class StreamDecoder:
+    """
+    单个输出流的增量解码器
+    遇到第一段非 ASCII 数据时检测一次编码并锁定，之后使用 codecs 增量解码器，
+    跨块截断的多字节字符会保留到下一次读取再解码
+    """
+
+    def __init__(self, encoding=None):
+        self.encoding = None
+        self._decoder = None
+        if encoding:
+            self._lock(encoding)
+
+    def _lock(self, encoding):
+        self.encoding = encoding
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def decode(self, raw_data, final=False):
+        if self._decoder is None:
+            # 编码尚未确定时，纯 ASCII 数据可直接解码
+            if raw_data.isascii():
+                return raw_data.decode("ascii")
+            self._lock(detect_encoding(raw_data))
+        return self._decoder.decode(raw_data, final)
+
+    def flush(self):
+        """进程结束时输出残留的不完整字节"""
+        if self._decoder is None:
+            return ""
+        return self._decoder.decode(b"", True)
+
+def normalize_path(path):
+    """统一路径格式（分隔符、大小写），用于索引的键"""
+    return os.path.normcase(os.path.normpath(path))
+
+def user_config_dir():
+    """用户配置目录（与 QSettings 的存放位置一致），不存在时自动创建"""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Preferences")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    path = os.path.join(base, organization, application)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def lord_model(title='hello world!' , model_content='', values=None):
+    """按模板生成文章内容：$TITLE$、$TIME$ 与 values 中的其他变量（模板只编译一次）"""
+    from .template import compile_template, default_values
     if model_content:
-        source_code = model_content
-        model_content = source_code.replace('$TIME$', datetime.now().strftime("%Y-%m-%d %H:%M:%S")).replace(
-            '$TITLE$', title)
-    return model_content
\ No newline at end of file
+        model_content = compile_template(model_content).render({**default_values(title), **(values or {})})
+    return model_content
+
+def create_post(target_dir, title, model_content):
+    """在目录中按模板新建文章，文件名去除非法字符并避免重名，返回文件路径"""
+    from .post_import import NameAllocator, safe_filename, write_new_file
+    allocator = NameAllocator()
+    base = safe_filename(title)
+    # 以独占模式创建，避免与同时运行的另一实例覆盖同名文件
+    return write_new_file(allocator.allocate(target_dir, base), lord_model(title, model_content),
+                          allocator, target_dir, base)
@@ -0,0 +1,281 @@
+# 工作区的常驻索引：每个博客根目录一份目录索引、文章元数据与文件监听,按最近使用保留有限个
+from collections import OrderedDict
+
+from functools import partial
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from .fs_watcher import FileChangeTracker
+from .markdown_filter_proxy import MarkdownIndexScanner
+from .markdown_index import exclude_dirs
+from .post_workers import PostIndexUpdater
+from .utils import normalize_path
+
+
+class RootIndex(QObject):
+    """
+    一个博客根目录的索引状态：
+    先用扫描缓存发出 index_ready，后台扫描完成后发出 index_ready（附带与缓存相比状态翻转的目录）与 scan_finished，
+    之后监听文件变化增量更新
+    （目录状态翻转时发出 paths_changed），文章元数据更新后发出 metadata_ready
+    切换到其他工作区后仍在后台保持最新，切回时无需重新扫描
+    """
+    index_ready = Signal(object, object)  # MarkdownIndex, 状态翻转的目录集合（None 表示需要全部重新过滤）
+    scan_finished = Signal(object)  # MarkdownIndex
+    paths_changed = Signal(object)  # 状态翻转的目录集合
+    metadata_ready = Signal(object)  # dict[path, PostMeta]
+
+    def __init__(self, root_path, exclude_dirs=exclude_dirs, parent=None):
+        super().__init__(parent)
+        self.root_path = root_path
+        self.exclude_dirs = exclude_dirs
+        self.markdown_index = None  # 扫描完成前为 None
+        self.cached_index = None  # 扫描缓存中的索引，扫描完成前用于展示
+        self.post_metadata = {}
+        self.scanner = None
+        self.change_tracker = None
+        self.post_updaters = []  # 同一时间最多一个，保证 metadata_ready 按顺序到达
+        self._pending_posts = None  # 更新进行中时排队的 (路径集合, 是否完整同步)
+        self._held_changes = None  # hold_changes 期间暂存的文件变化
+        self._holds = 0
+        self._detached = False  # detach 之后不再启动新的后台任务
+
+    @property
+    def current_index(self):
+        """可用于展示的索引：扫描结果，其次是缓存"""
+        return self.markdown_index or self.cached_index
+
+    def start(self):
+        """在后台线程中扫描包含.md文件的目录"""
+        if self.scanner is not None:
+            self.scanner.requestInterruption()
+        self.scanner = MarkdownIndexScanner(self.root_path, self.exclude_dirs, self)
+        self.scanner.cache_loaded.connect(self._on_cache_loaded)
+        self.scanner.scan_finished.connect(self._on_scan_finished)
+        self.scanner.finished.connect(self._release_scanner)
+        self.scanner.start()
+
+    def reload(self):
+        """丢弃索引并重新扫描"""
+        self._stop_change_tracker()
+        self._cancel_post_updates()
+        self.markdown_index = self.cached_index = None
+        self.post_metadata = {}
+        self.start()
+
+    def _release_scanner(self):
+        """扫描线程结束后释放，避免之后访问已删除的线程对象"""
+        scanner = self.sender()
+        if scanner is self.scanner:
+            self.scanner = None
+        scanner.deleteLater()
+        self._delete_when_idle()
+
+    def _on_cache_loaded(self, index):
+        """先用缓存的索引展示文件树，等待后台校验"""
+        if self.sender() is not self.scanner or self.markdown_index is not None:
+            return
+        self.cached_index = index
+        self.index_ready.emit(index, None)
+
+    def _on_scan_finished(self, index):
+        if self.sender() is not self.scanner or self._detached:
+            return  # 过期的扫描结果
+        cached, self.cached_index = self.cached_index, None
+        self.markdown_index = index
+        flipped = None if cached is None else cached.markdown_dirs() ^ index.markdown_dirs()
+        self.index_ready.emit(index, flipped)
+        self.scan_finished.emit(index)
+        self._start_change_tracker()
+        self.update_posts(list(index.markdown_files()), full_sync=True)
+
+    def update_posts(self, paths, full_sync=False):
+        """
+        在后台更新文章元数据库（只解析变化的文件）
+        已有更新在进行时合并到排队的请求中，结束后再启动，较早的结果不会覆盖较新的结果
+        """
+        if self._detached:
+            return
+        if self.post_updaters:
+            queued_paths, queued_full = self._pending_posts or (set(), False)
+            if full_sync and not queued_full:
+                queued_paths = set()  # 完整同步的文件列表已包含之前排队的增量路径
+            self._pending_posts = (queued_paths | set(paths), queued_full or full_sync)
+            return
+        updater = PostIndexUpdater(self.root_path, paths, full_sync, self)
+        updater.metadata_ready.connect(self._on_metadata_ready)
+        updater.finished.connect(lambda: self._on_updater_finished(updater))
+        updater.finished.connect(updater.deleteLater)
+        self.post_updaters.append(updater)
+        updater.start()
+
+    def _on_updater_finished(self, updater):
+        self.post_updaters.remove(updater)
+        self._delete_when_idle()
+        if self._pending_posts is not None:
+            paths, full_sync = self._pending_posts
+            self._pending_posts = None
+            self.update_posts(list(paths), full_sync)
+
+    def _on_metadata_ready(self, metadata):
+        self.post_metadata = metadata
+        self.metadata_ready.emit(metadata)
+
+    def _start_change_tracker(self):
+        """扫描完成后开始监听文件变化"""
+        self._stop_change_tracker()
+        self.change_tracker = FileChangeTracker(self.root_path, self.exclude_dirs, parent=self)
+        self.change_tracker.changes_detected.connect(self.apply_changes)
+        self.change_tracker.start()
+
+    def _stop_change_tracker(self):
+        if self.change_tracker is not None:
+            self.change_tracker.requestInterruption()
+            self.change_tracker.wait()
+            self.change_tracker.deleteLater()
+            self.change_tracker = None
+
+    def _release_change_tracker(self):
+        """detach 之后监听线程结束时释放（退出时 close 可能已经释放）"""
+        if self.change_tracker is not None:
+            self.change_tracker.deleteLater()
+            self.change_tracker = None
+        self._delete_when_idle()
+
+    def _cancel_post_updates(self):
+        self._pending_posts = None
+        for updater in self.post_updaters:
+            updater.requestInterruption()
+
+    def hold_changes(self):
+        """暂存之后的文件变化（如批量文件操作期间监听线程的事件），release_changes 时一次性应用"""
+        self._holds += 1
+        if self._held_changes is None:
+            self._held_changes = []
+
+    def release_changes(self, changes=()):
+        """结束一次 hold_changes，所有暂存都结束后把暂存的变化与 changes 合并应用"""
+        self._holds = max(0, self._holds - 1)
+        if self._held_changes is None:
+            self.apply_changes(list(changes))
+            return
+        self._held_changes.extend(changes)
+        if not self._holds:
+            held, self._held_changes = self._held_changes, None
+            self.apply_changes(held)
+
+    def apply_changes(self, changes):
+        """将文件变化增量应用到索引，只通知状态发生变化的目录"""
+        if self._detached:
+            return
+        if self._held_changes is not None:
+            self._held_changes.extend(changes)
+            return
+        index = self.markdown_index
+        if index is None:
+            return
+        flipped = set()
+        changed_posts = []
+        for kind, path, destination, is_dir in changes:
+            if kind == "rescan":
+                self.reload()
+                return
+            if kind == "created":
+                flipped |= index.add_dir(path) if is_dir else index.add_file(path)
+            elif kind == "deleted":
+                flipped |= index.remove_dir(path) if is_dir else index.remove_file(path)
+            elif kind == "moved":
+                flipped |= index.move(path, destination, is_dir)
+            if is_dir:
+                changed_posts = None  # 目录变化时做一次完整同步
+            elif changed_posts is not None:
+                changed_posts.extend(p for p in (path, destination) if p and p.lower().endswith(".md"))
+        if flipped:
+            self.paths_changed.emit(flipped)
+        if changed_posts is None:
+            self.update_posts(list(index.markdown_files()), full_sync=True)
+        elif changed_posts:
+            self.update_posts(changed_posts)
+
+    def close(self):
+        """停止所有后台线程"""
+        if self.scanner is not None:
+            self.scanner.requestInterruption()
+            self.scanner.wait()
+        self._stop_change_tracker()
+        self._cancel_post_updates()
+        for updater in list(self.post_updaters):
+            updater.wait()
+
+    def detach(self):
+        """
+        停止后台线程但不等待（工作区切换时在 GUI 线程调用，不会被大目录的扫描或解析卡住），
+        所有线程结束后自行删除
+        """
+        self._detached = True
+        self._cancel_post_updates()
+        if self.scanner is not None:
+            self.scanner.requestInterruption()
+        if self.change_tracker is not None:
+            self.change_tracker.finished.connect(self._release_change_tracker)
+            self.change_tracker.requestInterruption()
+        self._delete_when_idle()
+
+    def _delete_when_idle(self):
+        if not self._detached or self.scanner or self.change_tracker or self.post_updaters:
+            return
+        # 线程已发出 finished，这里的等待是瞬时的，保证删除时线程已完全退出
+        for thread in self.findChildren(QThread):
+            thread.wait()
+        self.deleteLater()
+
+
+class RootIndexPool(QObject):
+    """
+    按根目录保存 RootIndex，最多常驻 capacity 个，超出时关闭最久未使用的
+    被淘汰的根目录再次使用时从扫描缓存与文章数据库（均已持久化）重新加载
+    created(RootIndex) 在新建索引时发出，供调用方连接信号
+    """
+    created = Signal(object)
+
+    def __init__(self, capacity=3, exclude_dirs=exclude_dirs, parent=None):
+        super().__init__(parent)
+        self.capacity = max(1, capacity)
+        self.exclude_dirs = exclude_dirs
+        self._indexes = OrderedDict()  # 规范化的根目录 -> RootIndex，最近使用的在末尾
+        self._detached = set()  # 已淘汰、后台线程尚未结束的索引
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __contains__(self, root_path):
+        return normalize_path(root_path) in self._indexes
+
+    def acquire(self, root_path):
+        """返回根目录的索引（不存在时新建并开始扫描），并标记为最近使用"""
+        key = normalize_path(root_path)
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+            return index
+        index = self._indexes[key] = RootIndex(root_path, self.exclude_dirs, self)
+        self.created.emit(index)
+        index.start()
+        self._evict()
+        return index
+
+    def resize(self, capacity):
+        self.capacity = max(1, capacity)
+        self._evict()
+
+    def _evict(self):
+        while len(self._indexes) > self.capacity:
+            _, index = self._indexes.popitem(last=False)
+            self._detached.add(index)
+            index.destroyed.connect(partial(self._detached.discard, index))
+            index.detach()
+
+    def close(self):
+        """退出时等待所有索引（包括已淘汰的）的后台线程结束"""
+        for index in list(self._indexes.values()) + list(self._detached):
+            index.close()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+from core.post_import import import_posts
+
+TEMPLATE = "---\ntitle: $TITLE$\ntags: $TAGS$\n---\n$x$ 是正文中的公式\n"
+
+
+class ImportPostsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _import(self, rows):
+        result = import_posts(rows, self.directory.name, TEMPLATE, workers=1)
+        self.assertEqual(result.errors, [])
+        contents = {}
+        for path in result.created:
+            with open(path, "r", encoding="utf-8") as f:
+                contents[os.path.basename(path)] = f.read()
+        return contents
+
+    def test_empty_cell_of_known_column_renders_empty(self):
+        contents = self._import([{"title": "有标签", "tags": "python"}, {"title": "无标签", "tags": ""}])
+        self.assertIn("tags: python\n", contents["有标签.md"])
+        self.assertIn("tags: \n", contents["无标签.md"])
+        self.assertNotIn("$TAGS$", contents["无标签.md"])
+
+    def test_column_missing_from_row_renders_empty(self):
+        contents = self._import([{"title": "有标签", "tags": "python"}, {"title": "缺少列"}])
+        self.assertIn("tags: \n", contents["缺少列.md"])
+
+    def test_unknown_placeholder_is_kept(self):
+        contents = self._import([{"title": "公式"}])
+        self.assertIn("$x$ 是正文中的公式", contents["公式.md"])
+        self.assertIn("tags: $TAGS$", contents["公式.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()